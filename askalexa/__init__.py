@@ -7,7 +7,15 @@ Example::
     import askalexa
 
     mySkill = askalexa.Skill('my_ap_id')
+
+Submodules and the names below are imported on first use, so importing the
+package itself is cheap.
 '''
-from askalexa.skill import Skill
-from askalexa.response import ResponseBuilder, ProgressiveResponseBuilder
-from askalexa.handler import RequestEventHandler
\ No newline at end of file
+from askalexa.lazy import make_lazy
+
+make_lazy(__name__, {
+    'Skill': 'askalexa.skill',
+    'ResponseBuilder': 'askalexa.response.builder',
+    'ProgressiveResponseBuilder': 'askalexa.response.progressive',
+    'RequestEventHandler': 'askalexa.handler',
+})
\ No newline at end of file
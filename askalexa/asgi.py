@@ -0,0 +1,216 @@
+'''
+Alexa ASGI Application Module
+=============================
+
+An ASGI application that serves Alexa requests with the registered skills
+from async servers such as uvicorn or hypercorn. This module needs python
+3.5 or later.
+
+Example::
+
+    import askalexa
+    from askalexa.asgi import ASGIApplication
+
+    mySkill = askalexa.Skill('my-app-id')
+
+    @mySkill.on_intent('WeatherIntent')
+    async def weather(event):
+        forecast = await fetch_forecast()
+        return askalexa.ResponseBuilder().add_speech(forecast)
+
+    application = ASGIApplication()
+
+The request body is streamed and rejected as soon as it grows larger than
+max_body_size. Certificate verification runs in the executor, because the
+first request for a certificate downloads it, so the event loop is never
+blocked by it. Skill handlers can be plain functions or coroutine functions.
+Handlers are called in the executor, so a plain handler that blocks does
+not stall the other connections; coroutine handlers are awaited on the
+event loop. Set threaded to False to call them on the event loop, which
+saves the hand off to the executor when every handler is a coroutine
+function or never blocks.
+'''
+import asyncio
+import threading
+
+from askalexa.handler import RequestEventHandler
+from askalexa.wsgi import MAX_BODY_SIZE, REQUEST_ERRORS, check_request, error_response, \
+    exception_response, internal_error_response, invalid_signature_response, \
+    encode_response_text, get_response_headers
+
+_SIGNATURE_CERT_CHAIN_URL_HEADER = b'signaturecertchainurl'
+_SIGNATURE_HEADER = b'signature'
+_CONTENT_LENGTH_HEADER = b'content-length'
+
+class ASGIApplication(object):
+    '''
+    ASGI application that handles Alexa requests. executor is the
+    concurrent.futures executor for certificate verification and threaded
+    handlers, None uses the default executor of the event loop.
+    '''
+
+    def __init__(self, validate=True, max_body_size=MAX_BODY_SIZE, executor=None,
+                 threaded=True):
+        self.validate = validate
+        self.max_body_size = max_body_size
+        self.executor = executor
+        self.threaded = threaded
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            raise ValueError('Unsupported ASGI scope type: {0}'.format(scope['type']))
+
+        status, body = await self.handle(scope, receive)
+        headers = [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                   for name, value in get_response_headers(status, body)]
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': body})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def handle(self, scope, receive):
+        '''
+        Handle the HTTP request of the scope. Returns a tuple of the status
+        code and the response body.
+        '''
+        if scope['method'] != 'POST':
+            return error_response(405, 'Only POST requests are accepted')
+
+        headers = dict(scope['headers'])
+        content_length = headers.get(_CONTENT_LENGTH_HEADER)
+        if content_length is not None:
+            try:
+                content_length = int(content_length)
+            except ValueError:
+                return error_response(400, 'The request has an invalid Content-Length')
+            if content_length > self.max_body_size:
+                return self._body_too_large()
+
+        body = await read_body(receive, self.max_body_size)
+        if body is None:
+            return self._body_too_large()
+
+        certificate_url = _header_text(headers, _SIGNATURE_CERT_CHAIN_URL_HEADER)
+        signature = _header_text(headers, _SIGNATURE_HEADER)
+        error = check_request(body, certificate_url, signature, self.validate)
+        if error is not None:
+            return error
+
+        loop = asyncio.get_event_loop()
+        handler = RequestEventHandler(body)
+        try:
+            if self.validate:
+                valid = await loop.run_in_executor(self.executor, handler.is_request_valid,
+                                                   certificate_url, signature)
+                if not valid:
+                    return invalid_signature_response()
+
+            alexa_event, skill = handler.dispatch()
+        except REQUEST_ERRORS as e:
+            return exception_response(e)
+        except Exception as e:
+            return internal_error_response(e)
+
+        try:
+            if self.threaded:
+                call = _ExecutorCall(skill, alexa_event)
+                try:
+                    alexa_response = await loop.run_in_executor(self.executor, call)
+                except asyncio.CancelledError:
+                    call.cancel()
+                    raise
+            else:
+                alexa_response = skill.get_response(alexa_event, allow_coroutines=True)
+
+            if hasattr(alexa_response, '__await__'):
+                alexa_response = await alexa_response
+
+            response_text = handler.encode_response(alexa_event, alexa_response)
+        except Exception as e:
+            return internal_error_response(e)
+
+        return 200, encode_response_text(response_text)
+
+    def _body_too_large(self):
+        return error_response(413, 'The request body is larger than {0} bytes'.format(
+            self.max_body_size))
+
+class _ExecutorCall(object):
+    '''
+    Gets the response of the skill in the executor. If the request is
+    cancelled while it waits for the response, an awaitable response is
+    closed so it gives back its bulkhead slot and profile session.
+    '''
+
+    def __init__(self, skill, event):
+        self._skill = skill
+        self._event = event
+        self._lock = threading.Lock()
+        self._cancelled = False
+        self._response = None
+
+    def __call__(self):
+        response = self._skill.get_response(self._event, allow_coroutines=True)
+        with self._lock:
+            if not self._cancelled:
+                self._response = response
+                return response
+
+        _close_response(response)
+
+    def cancel(self):
+        '''
+        Close the response if it was already returned, or as soon as it is.
+        '''
+        with self._lock:
+            self._cancelled = True
+            response, self._response = self._response, None
+
+        _close_response(response)
+
+def _close_response(response):
+    if hasattr(response, '__await__'):
+        response.close()
+
+async def read_body(receive, max_body_size):
+    '''
+    Receive the whole request body. Returns None if it is larger than
+    max_body_size. A body sent in a single message is returned without
+    being copied.
+    '''
+    chunks = []
+    size = 0
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            break
+
+        chunk = message.get('body', b'')
+        if chunk:
+            size += len(chunk)
+            if size > max_body_size:
+                return None
+            chunks.append(chunk)
+
+        if not message.get('more_body', False):
+            break
+
+    if len(chunks) == 1:
+        return chunks[0]
+    return b''.join(chunks)
+
+def _header_text(headers, name):
+    value = headers.get(name)
+    if value is None:
+        return None
+    return value.decode('latin-1')
@@ -0,0 +1,126 @@
+'''
+Alexa Skill Bulkhead Module
+===========================
+
+Limits how many requests of a skill are handled at the same time, so a skill
+with a slow backend cannot take every worker thread from the other skills in
+the process.
+
+Example::
+
+    mySkill = askalexa.Skill('my-app-id', bulkhead=Bulkhead(max_concurrent=8,
+                                                            max_queue=4,
+                                                            queue_timeout=0.05))
+
+    @mySkill.on_shed
+    def busy(event):
+        return askalexa.ResponseBuilder().add_speech('Sorry, I am busy. Try again soon.')
+
+A request that finds the skill at its limit waits in the queue for up to
+queue_timeout seconds. Waiting requests are given the free slots in the
+order they arrived. When the queue is also full, or the wait times out, the
+request is shed: it is answered at once with the on_shed response of the
+skill, or its failsafe response if there is none.
+
+A coroutine handler served by the ASGI application holds its slot until the
+coroutine finishes.
+'''
+import threading
+from collections import deque
+
+class Bulkhead(object):
+    '''
+    A concurrency limit with a bounded wait queue. max_queue is the number of
+    requests that may wait for a slot, 0 sheds as soon as the limit is
+    reached. queue_timeout is the longest a request waits, None waits until
+    a slot is free.
+    '''
+
+    def __init__(self, max_concurrent, max_queue=0, queue_timeout=None):
+        if max_concurrent < 1:
+            raise ValueError('max_concurrent must be at least 1')
+
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+
+        self._lock = threading.Lock()
+        # one event per waiting request, set when a slot is handed to it
+        self._waiters = deque()
+        self._in_flight = 0
+        self._accepted_count = 0
+        self._shed_count = 0
+
+    def acquire(self):
+        '''
+        Take a slot for a request. Returns True if the request may be handled
+        and release must be called when it is done, or False if it is shed.
+        '''
+        with self._lock:
+            if self._in_flight < self.max_concurrent and not self._waiters:
+                self._in_flight += 1
+                self._accepted_count += 1
+                return True
+
+            if len(self._waiters) >= self.max_queue:
+                self._shed_count += 1
+                return False
+
+            waiter = threading.Event()
+            self._waiters.append(waiter)
+
+        waiter.wait(self.queue_timeout)
+
+        with self._lock:
+            if waiter.is_set():
+                # release handed the slot over before the wait timed out
+                return True
+
+            self._waiters.remove(waiter)
+            self._shed_count += 1
+            return False
+
+    def release(self):
+        '''
+        Give back the slot of a finished request, or hand it to the request
+        that has waited the longest.
+        '''
+        with self._lock:
+            if self._waiters:
+                self._accepted_count += 1
+                self._waiters.popleft().set()
+            else:
+                self._in_flight -= 1
+
+    @property
+    def in_flight(self):
+        '''
+        The number of requests being handled.
+        '''
+        return self._in_flight
+
+    @property
+    def waiting(self):
+        '''
+        The number of requests waiting for a slot.
+        '''
+        return len(self._waiters)
+
+    @property
+    def accepted_count(self):
+        '''
+        The total number of requests that were given a slot.
+        '''
+        return self._accepted_count
+
+    @property
+    def shed_count(self):
+        '''
+        The total number of requests that were shed.
+        '''
+        return self._shed_count
+
+    def get_stats(self):
+        return {'max_concurrent': self.max_concurrent, 'in_flight': self._in_flight,
+                'waiting': len(self._waiters), 'accepted': self._accepted_count,
+                'shed': self._shed_count}
@@ -0,0 +1,392 @@
+'''
+Ask Alexa Cache Module
+======================
+
+Small in-process caches shared by the framework.
+'''
+import sys
+import logging
+import threading
+from collections import OrderedDict
+
+from askalexa.instrumentation import clock
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+class LRUCache(object):
+    '''
+    A thread safe mapping that holds at most max_size items. When the cache
+    is full, the least recently used item is evicted.
+    '''
+
+    def __init__(self, max_size=1000):
+        self.max_size = max_size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def get(self, key, default=None):
+        '''
+        Return the value for the key and mark it as the most recently used.
+        '''
+        with self._lock:
+            try:
+                value = self._items.pop(key)
+            except KeyError:
+                return default
+
+            self._items[key] = value
+            return value
+
+    def set(self, key, value):
+        '''
+        Set the value for the key. Returns a list of (key, value) tuples for
+        the items that were evicted to make room.
+        '''
+        evicted = []
+        with self._lock:
+            self._items.pop(key, None)
+            self._items[key] = value
+            while len(self._items) > self.max_size:
+                evicted.append(self._items.popitem(last=False))
+
+        return evicted
+
+    def pop(self, key, default=None):
+        '''
+        Remove the key from the cache and return its value.
+        '''
+        with self._lock:
+            return self._items.pop(key, default)
+
+    def clear(self):
+        '''
+        Remove all items from the cache.
+        '''
+        with self._lock:
+            self._items.clear()
+
+class TTLCache(LRUCache):
+    '''
+    An LRUCache whose items expire ttl seconds after they are set. Use
+    get_or_fill to fill a missing item only once however many threads ask
+    for it at the same time.
+    '''
+
+    def __init__(self, max_size=1000, ttl=60.0):
+        super(TTLCache, self).__init__(max_size)
+        self.ttl = ttl
+        self._fills = {}
+
+    def __contains__(self, key):
+        with self._lock:
+            return self._get(key) is not _MISSING
+
+    def _get(self, key):
+        # the lock must be held
+        try:
+            value, expires = self._items.pop(key)
+        except KeyError:
+            return _MISSING
+
+        if expires <= clock():
+            return _MISSING
+
+        self._items[key] = (value, expires)
+        return value
+
+    def get(self, key, default=None):
+        '''
+        Return the value for the key if it has not expired and mark it as
+        the most recently used.
+        '''
+        with self._lock:
+            value = self._get(key)
+
+        return default if value is _MISSING else value
+
+    def set(self, key, value, ttl=None):
+        '''
+        Set the value for the key to expire after ttl seconds, or the ttl of
+        the cache if it is None. Returns a list of (key, value) tuples for
+        the items that were evicted to make room.
+        '''
+        if ttl is None:
+            ttl = self.ttl
+
+        evicted = super(TTLCache, self).set(key, (value, clock() + ttl))
+        return [(k, v[0]) for k, v in evicted]
+
+    def pop(self, key, default=None):
+        '''
+        Remove the key from the cache and return its value.
+        '''
+        with self._lock:
+            item = self._items.pop(key, None)
+
+        return default if item is None else item[0]
+
+    def get_or_fill(self, key, fill_func, ttl=None):
+        '''
+        Return the value for the key. If it is missing or expired, fill_func
+        is called without arguments to get the value to set. Only one thread
+        calls fill_func for a key at a time, the others wait for its value.
+        If fill_func raises an exception, it is raised in the waiting threads
+        too and nothing is set.
+        '''
+        with self._lock:
+            value = self._get(key)
+            if value is not _MISSING:
+                return value
+
+            fill = self._fills.get(key)
+            if fill is None:
+                fill = self._fills[key] = _Fill()
+                leader = True
+            else:
+                leader = False
+
+        if not leader:
+            return fill.wait()
+
+        try:
+            value = fill_func()
+        except Exception as e:
+            fill.set_exception(e)
+            raise
+        else:
+            self.set(key, value, ttl)
+            fill.set_value(value)
+            return value
+        finally:
+            with self._lock:
+                self._fills.pop(key, None)
+
+class _Fill(object):
+    '''
+    The value of a key that is being filled by another thread.
+    '''
+
+    __slots__ = ('_event', '_value', '_exception')
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._value = None
+        self._exception = None
+
+    def set_value(self, value):
+        self._value = value
+        self._event.set()
+
+    def set_exception(self, exception):
+        self._exception = exception
+        self._event.set()
+
+    def wait(self):
+        self._event.wait()
+        if self._exception is not None:
+            raise self._exception
+        return self._value
+
+class DataCache(object):
+    '''
+    A cache for data that handlers load from other services, used by the
+    Skill.cached decorator. Items expire ttl seconds after they are set and
+    the least recently used items are evicted when there are more than
+    max_size items, or when their estimated size is over max_memory bytes.
+
+    With stale_ttl an expired item is still returned for that many seconds
+    while it is filled again in a background thread, so only the first
+    request after the ttl waits for the service when the item is never
+    used for that long.
+    '''
+
+    def __init__(self, max_size=1000, ttl=300.0, max_memory=None, stale_ttl=0.0,
+                 size_func=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_memory = max_memory
+        self.stale_ttl = stale_ttl
+        self.size_func = size_func or estimate_size
+
+        self._items = OrderedDict()
+        self._memory = 0
+        self._lock = threading.Lock()
+        self._fills = {}
+        self._refreshing = set()
+
+        self._hit_count = 0
+        self._stale_count = 0
+        self._miss_count = 0
+        self._eviction_count = 0
+        self._refresh_error_count = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    @property
+    def memory(self):
+        '''
+        The estimated size of the items in bytes, or 0 without max_memory.
+        '''
+        return self._memory
+
+    def get_or_fill(self, key, fill_func):
+        '''
+        Return the value for the key. If it is missing or expired, fill_func
+        is called without arguments to get the value to set. Only one thread
+        calls fill_func for a key at a time, the others wait for its value.
+        A stale value is returned at once and filled in the background.
+        '''
+        refresh = False
+        with self._lock:
+            entry = self._items.pop(key, None)
+            if entry is not None:
+                now = clock()
+                if entry.expires > now:
+                    self._hit_count += 1
+                elif entry.stale_expires > now:
+                    self._stale_count += 1
+                    if key not in self._refreshing:
+                        self._refreshing.add(key)
+                        refresh = True
+                else:
+                    self._memory -= entry.size
+                    entry = None
+
+            if entry is not None:
+                self._items[key] = entry
+            else:
+                self._miss_count += 1
+                fill = self._fills.get(key)
+                leader = fill is None
+                if leader:
+                    fill = self._fills[key] = _Fill()
+
+        if entry is not None:
+            if refresh:
+                refresher = threading.Thread(target=self._refresh, args=(key, fill_func),
+                                             name='DataCache')
+                refresher.daemon = True
+                refresher.start()
+            return entry.value
+
+        if not leader:
+            return fill.wait()
+
+        try:
+            value = fill_func()
+        except Exception as e:
+            fill.set_exception(e)
+            raise
+        else:
+            self.set(key, value)
+            fill.set_value(value)
+            return value
+        finally:
+            with self._lock:
+                self._fills.pop(key, None)
+
+    def _refresh(self, key, fill_func):
+        try:
+            self.set(key, fill_func())
+        except Exception:
+            with self._lock:
+                self._refresh_error_count += 1
+            logger.exception('Unable to refresh the cached value for %r', key)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def set(self, key, value):
+        '''
+        Set the value for the key. A value that is larger than max_memory on
+        its own is not cached.
+        '''
+        size = 0
+        if self.max_memory is not None:
+            size = self.size_func(value)
+            if size > self.max_memory:
+                self.pop(key)
+                return
+
+        now = clock()
+        entry = _Entry(value, size, now + self.ttl, now + self.ttl + self.stale_ttl)
+        with self._lock:
+            old_entry = self._items.pop(key, None)
+            if old_entry is not None:
+                self._memory -= old_entry.size
+
+            self._items[key] = entry
+            self._memory += size
+            while len(self._items) > self.max_size or \
+                    (self.max_memory is not None and self._memory > self.max_memory):
+                _, evicted = self._items.popitem(last=False)
+                self._memory -= evicted.size
+                self._eviction_count += 1
+
+    def pop(self, key, default=None):
+        '''
+        Remove the key from the cache and return its value.
+        '''
+        with self._lock:
+            entry = self._items.pop(key, None)
+            if entry is None:
+                return default
+
+            self._memory -= entry.size
+            return entry.value
+
+    def clear(self):
+        '''
+        Remove all items from the cache.
+        '''
+        with self._lock:
+            self._items.clear()
+            self._memory = 0
+
+    def get_stats(self):
+        with self._lock:
+            return {'size': len(self._items), 'memory': self._memory, 'hits': self._hit_count,
+                    'stale_hits': self._stale_count, 'misses': self._miss_count,
+                    'evictions': self._eviction_count,
+                    'refresh_errors': self._refresh_error_count}
+
+class _Entry(object):
+    __slots__ = ('value', 'size', 'expires', 'stale_expires')
+
+    def __init__(self, value, size, expires, stale_expires):
+        self.value = value
+        self.size = size
+        self.expires = expires
+        self.stale_expires = stale_expires
+
+def estimate_size(value):
+    '''
+    Estimate the memory used by the value in bytes, including the items of
+    lists, tuples, sets and dictionaries. Other objects are counted without
+    the objects they refer to, give DataCache a size_func to count those.
+    '''
+    seen = set()
+    size = 0
+    stack = [value]
+    while stack:
+        value = stack.pop()
+        if id(value) in seen:
+            continue
+        seen.add(id(value))
+
+        size += sys.getsizeof(value)
+        if isinstance(value, dict):
+            stack.extend(value.keys())
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            stack.extend(value)
+    return size
@@ -0,0 +1,232 @@
+'''
+Alexa Request Capture Module
+============================
+
+Captures a sample of raw requests, their encoded responses and the stage
+timings into a fixed size ring buffer file that is memory mapped. The
+captures can later be exported as JSON lines to replay production traffic.
+
+Example::
+
+    RequestEventHandler.capture = CaptureBuffer('/var/tmp/alexa.capture', rate=0.01)
+    ...
+    CaptureReader('/var/tmp/alexa.capture').export_jsonl('captures.jsonl')
+
+The file is divided into equally sized slots. Each capture is written into
+the next slot, overwriting the oldest capture once the buffer is full.
+Requests and responses that do not fit into a slot are truncated. A capture
+file should only be written by a single process.
+'''
+import os
+import json
+import mmap
+import time
+import random
+import struct
+import threading
+from askalexa import instrumentation
+from askalexa.compat import string_types, text_type
+
+MAGIC = b'AACAP'
+VERSION = 1
+
+#: stages that are stored with each capture, in the order of their code
+STAGES = (instrumentation.PARSE, instrumentation.VALIDATE_TIMESTAMP,
+          instrumentation.VALIDATE_CERTIFICATE, instrumentation.VALIDATE_SIGNATURE,
+          instrumentation.CREATE_EVENT, instrumentation.DISPATCH, instrumentation.HANDLER,
+          instrumentation.ENCODE)
+_STAGE_CODES = dict((stage, code) for code, stage in enumerate(STAGES))
+
+#: magic, version, slot size, slot count, next sequence
+_FILE_HEADER = struct.Struct('>5sHIIQ')
+#: sequence, timestamp, request size, response size, timing count, truncated
+_RECORD_HEADER = struct.Struct('>QdIIBB')
+#: stage code, duration in seconds
+_TIMING = struct.Struct('>Bd')
+
+class CaptureBuffer(object):
+    '''
+    Writes captures into a memory mapped ring buffer file. A fraction of
+    requests given by rate are captured.
+    '''
+
+    def __init__(self, path, rate=1.0, slot_size=16384, slot_count=4096):
+        self.rate = rate
+        self._random = random.Random()
+        self._lock = threading.Lock()
+
+        file_size = _FILE_HEADER.size + slot_size * slot_count
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            existing_size = os.fstat(fd).st_size
+            if existing_size != file_size:
+                os.ftruncate(fd, file_size)
+            self._mmap = mmap.mmap(fd, file_size)
+        finally:
+            os.close(fd)
+
+        magic, version, existing_slot_size, existing_slot_count, next_sequence = \
+            _FILE_HEADER.unpack_from(self._mmap, 0)
+
+        if (magic, version, existing_slot_size, existing_slot_count) != \
+                (MAGIC, VERSION, slot_size, slot_count):
+            # new file or a different layout, start over
+            self._mmap[:] = b'\0' * file_size
+            next_sequence = 1
+
+        self._slot_size = slot_size
+        self._slot_count = slot_count
+        self._data_size = slot_size - _RECORD_HEADER.size - _TIMING.size * len(STAGES)
+        if self._data_size <= 0:
+            raise ValueError('Slot size is too small: {0}'.format(slot_size))
+
+        self._next_sequence = next_sequence
+        _FILE_HEADER.pack_into(self._mmap, 0, MAGIC, VERSION, slot_size, slot_count, next_sequence)
+
+    def should_capture(self):
+        '''
+        Returns True/False if the next request should be captured.
+        '''
+        return self.rate >= 1.0 or self._random.random() < self.rate
+
+    def write(self, request_data, response_data, timer=None):
+        '''
+        Write a capture of the request, the response, and the durations of
+        the timer into the next slot.
+        '''
+        if isinstance(request_data, text_type):
+            request_data = request_data.encode('utf-8')
+        if isinstance(response_data, text_type):
+            response_data = response_data.encode('utf-8')
+
+        buf = self._mmap
+        request_size = min(len(request_data), self._data_size)
+        response_size = min(len(response_data), self._data_size - request_size)
+        truncated = request_size < len(request_data) or response_size < len(response_data)
+        durations = timer.durations if timer is not None else ()
+
+        with self._lock:
+            sequence = self._next_sequence
+            self._next_sequence += 1
+
+            offset = _FILE_HEADER.size + ((sequence - 1) % self._slot_count) * self._slot_size
+
+            # clear the sequence first so a partly written slot is never read
+            struct.pack_into('>Q', buf, offset, 0)
+
+            position = offset + _RECORD_HEADER.size
+            timing_count = 0
+            for stage, duration in durations:
+                code = _STAGE_CODES.get(stage)
+                if code is None or timing_count == len(STAGES):
+                    continue
+                _TIMING.pack_into(buf, position, code, duration)
+                position += _TIMING.size
+                timing_count += 1
+
+            if request_size == len(request_data):
+                buf[position:position + request_size] = request_data
+            else:
+                buf[position:position + request_size] = request_data[:request_size]
+            position += request_size
+
+            if response_size == len(response_data):
+                buf[position:position + response_size] = response_data
+            else:
+                buf[position:position + response_size] = response_data[:response_size]
+
+            _RECORD_HEADER.pack_into(buf, offset, sequence, time.time(), request_size,
+                                     response_size, timing_count, truncated)
+            struct.pack_into('>Q', buf, _FILE_HEADER.size - 8, self._next_sequence)
+
+    def flush(self):
+        '''
+        Flush the captures to disk.
+        '''
+        self._mmap.flush()
+
+    def close(self):
+        self._mmap.flush()
+        self._mmap.close()
+
+class CaptureRecord(object):
+    '''
+    A single capture read from a capture file.
+    '''
+
+    __slots__ = ('sequence', 'timestamp', 'request_data', 'response_data', 'durations',
+                 'truncated')
+
+    def __init__(self, sequence, timestamp, request_data, response_data, durations, truncated):
+        self.sequence = sequence
+        self.timestamp = timestamp
+        self.request_data = request_data
+        self.response_data = response_data
+        self.durations = durations
+        self.truncated = truncated
+
+    def get_json_data(self):
+        return {'sequence': self.sequence, 'timestamp': self.timestamp,
+                'request': self.request_data.decode('utf-8', 'replace'),
+                'response': self.response_data.decode('utf-8', 'replace'),
+                'timings': dict(self.durations), 'truncated': self.truncated}
+
+class CaptureReader(object):
+    '''
+    Reads the captures from a capture file.
+    '''
+
+    def __init__(self, path):
+        self.path = path
+
+    def __iter__(self):
+        '''
+        Iterate over the captures from the oldest to the newest.
+        '''
+        with open(self.path, 'rb') as capture_file:
+            data = capture_file.read()
+
+        magic, version, slot_size, slot_count, _ = _FILE_HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError('Not a capture file: {0}'.format(self.path))
+
+        records = []
+        for slot in range(slot_count):
+            offset = _FILE_HEADER.size + slot * slot_size
+            sequence, timestamp, request_size, response_size, timing_count, truncated = \
+                _RECORD_HEADER.unpack_from(data, offset)
+            if sequence == 0:
+                continue
+
+            position = offset + _RECORD_HEADER.size
+            durations = []
+            for _ in range(timing_count):
+                code, duration = _TIMING.unpack_from(data, position)
+                durations.append((STAGES[code], duration))
+                position += _TIMING.size
+
+            request_data = data[position:position + request_size]
+            position += request_size
+            response_data = data[position:position + response_size]
+
+            records.append(CaptureRecord(sequence, timestamp, request_data, response_data,
+                                         durations, bool(truncated)))
+
+        records.sort(key=lambda record: record.sequence)
+        return iter(records)
+
+    def export_jsonl(self, output):
+        '''
+        Write every capture as a line of JSON to the output, which is a file
+        path or a file object. Returns the number of captures written.
+        '''
+        if isinstance(output, string_types):
+            with open(output, 'w') as output_file:
+                return self.export_jsonl(output_file)
+
+        count = 0
+        for record in self:
+            output.write(json.dumps(record.get_json_data()))
+            output.write('\n')
+            count += 1
+        return count
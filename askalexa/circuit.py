@@ -0,0 +1,306 @@
+'''
+Alexa Circuit Breaker Module
+============================
+
+Circuit breakers for the backend services that the handlers of a skill
+depend on. While a backend is down every request would still wait for its
+full timeout; an open circuit answers at once with a degraded response
+instead, without calling the backend.
+
+Example::
+
+    mySkill = askalexa.Skill('my-app-id')
+    mySkill.add_dependency('weather', failure_threshold=5, reset_timeout=30.0, timeout=1.0,
+                           exceptions=(IOError,))
+
+    @mySkill.on_intent('ForecastIntent')
+    @mySkill.depends_on('weather')
+    def forecast(event):
+        return askalexa.ResponseBuilder().add_speech(weather_api.get_forecast())
+
+    @mySkill.on_degraded('weather')
+    def no_forecast(event):
+        return askalexa.ResponseBuilder().add_speech('The forecast is not available right now.')
+
+A circuit is closed while its backend works. It opens after
+failure_threshold failures in a row, where a failure is a call that raises
+one of the exceptions of the breaker or takes longer than timeout seconds.
+No exception is a failure unless its type is given, so a bug in a handler
+is raised as before instead of opening the circuit. While it is open the
+handlers that depend on it are not called. After reset_timeout seconds it
+is half open and lets a single trial request call the backend while the
+others are still rejected: a success closes the circuit and a failure
+opens it again.
+
+A handler that raises one of the exceptions counts as a failure of every
+dependency it declares, and the exception is logged.
+A handler that calls more than one backend can wrap each call in the
+circuit of its dependency, so the failure is counted for that dependency
+only::
+
+    with mySkill.circuit('weather'):
+        forecast = weather_api.get_forecast()
+
+Either way the request is answered with the degraded response of the
+dependency, or the failsafe response of the skill if there is none.
+Exceptions that are not failures are raised as before. Coroutine handlers
+are not called while a circuit is open, but only the calls they make in a
+circuit are counted.
+'''
+import logging
+import threading
+
+from askalexa.exceptions import CircuitOpenError
+from askalexa.instrumentation import clock
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+logger = logging.getLogger(__name__)
+
+#: names of the circuits entered by the handler running on this thread, and
+#: of those it was admitted to before it was called
+_local = threading.local()
+
+class CircuitBreaker(object):
+    '''
+    Tracks the failures of one backend dependency. exceptions is the tuple
+    of exception types that count as failures, without it only calls that
+    time out are failures.
+    '''
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30.0, timeout=None,
+                 exceptions=()):
+        if failure_threshold < 1:
+            raise ValueError('failure_threshold must be at least 1')
+
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.timeout = timeout
+        self.exceptions = exceptions
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = None
+        # the id of the trial call while the circuit is half open
+        self._trial = None
+        self._trial_ids = 0
+        self._success_count = 0
+        self._failure_count = 0
+        self._timeout_count = 0
+        self._rejected_count = 0
+
+    @property
+    def state(self):
+        '''
+        The state of the circuit: CLOSED, OPEN or HALF_OPEN.
+        '''
+        with self._lock:
+            return self._get_state()
+
+    def _get_state(self):
+        if self._state == OPEN and clock() - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+        return self._state
+
+    def _set_state(self, state):
+        self._state = state
+        self._trial = None
+        if state == OPEN:
+            self._opened_at = clock()
+
+    def allow(self):
+        '''
+        Returns True if the backend may be called, or False if the circuit is
+        open and the call is rejected. While the circuit is half open only one
+        call is allowed until its outcome is recorded.
+        '''
+        return self._admit()[0]
+
+    def _admit(self):
+        '''
+        Returns True/False if the call is allowed, and the id of the trial
+        call if it was allowed as one.
+        '''
+        with self._lock:
+            state = self._get_state()
+            if state == CLOSED:
+                return True, None
+
+            if state == HALF_OPEN and self._trial is None:
+                self._trial_ids += 1
+                self._trial = self._trial_ids
+                return True, self._trial
+
+            self._rejected_count += 1
+            return False, None
+
+    def _end_trial(self, trial):
+        '''
+        Let another call try the backend if the trial call was not recorded.
+        '''
+        with self._lock:
+            if self._trial == trial:
+                self._trial = None
+
+    def record_success(self, elapsed=None):
+        '''
+        Record a call that returned after elapsed seconds. A call that took
+        longer than the timeout is recorded as a failure.
+        '''
+        if self.timeout is not None and elapsed is not None and elapsed > self.timeout:
+            self.record_failure(timed_out=True)
+            return
+
+        with self._lock:
+            self._success_count += 1
+            self._failures = 0
+            if self._state == HALF_OPEN:
+                self._set_state(CLOSED)
+
+    def record_failure(self, timed_out=False):
+        '''
+        Record a failed call, which opens the circuit after failure_threshold
+        failures in a row or at once when it is half open.
+        '''
+        with self._lock:
+            self._failure_count += 1
+            if timed_out:
+                self._timeout_count += 1
+
+            self._failures += 1
+            state = self._get_state()
+            if state == HALF_OPEN or (state == CLOSED and
+                                      self._failures >= self.failure_threshold):
+                self._set_state(OPEN)
+
+    def is_failure(self, exception):
+        return isinstance(exception, self.exceptions)
+
+    def guard(self):
+        '''
+        Return a context manager for one call to the backend. It raises
+        CircuitOpenError when the circuit is open and records the outcome of
+        the call otherwise.
+        '''
+        return _CircuitCall(self)
+
+    def call(self, func, *args, **kwargs):
+        '''
+        Call func with the arguments in the circuit and return its result.
+        '''
+        with self.guard():
+            return func(*args, **kwargs)
+
+    def reset(self):
+        '''
+        Close the circuit and forget the failures.
+        '''
+        with self._lock:
+            self._set_state(CLOSED)
+            self._failures = 0
+            self._opened_at = None
+
+    def get_stats(self):
+        with self._lock:
+            return {'state': self._get_state(), 'success': self._success_count,
+                    'failure': self._failure_count, 'timeout': self._timeout_count,
+                    'rejected': self._rejected_count}
+
+class _CircuitCall(object):
+    '''
+    Context manager that records the outcome of one call to a backend.
+    '''
+
+    __slots__ = ('breaker', 'start')
+
+    def __init__(self, breaker):
+        self.breaker = breaker
+        self.start = None
+
+    def __enter__(self):
+        breaker = self.breaker
+        entered = getattr(_local, 'entered', None)
+        if entered is not None:
+            entered.add(breaker.name)
+
+        admitted = getattr(_local, 'admitted', None)
+        if admitted is not None and breaker.name in admitted:
+            # the first call of the handler uses the admission of the handler
+            admitted.discard(breaker.name)
+        elif not breaker.allow():
+            raise CircuitOpenError(breaker.name)
+
+        self.start = clock()
+        return breaker
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        breaker = self.breaker
+        if exc_type is not None and issubclass(exc_type, breaker.exceptions):
+            breaker.record_failure()
+            try:
+                # let the skill answer with the degraded response of this circuit
+                exc_value.circuit_name = breaker.name
+            except AttributeError:
+                pass
+        else:
+            breaker.record_success(clock() - self.start)
+        return False
+
+def call_handler(func, event, breakers, degraded_func):
+    '''
+    Call the handler func for the event if none of the circuits it depends
+    on are open. breakers is the list of CircuitBreakers for the
+    dependencies of the handler in the order they were declared, and
+    degraded_func is called with the event and the name of a dependency to
+    get the degraded response when the handler cannot be used.
+    '''
+    trials = []
+    try:
+        for breaker in breakers:
+            allowed, trial = breaker._admit()
+            if not allowed:
+                return degraded_func(event, breaker.name)
+            if trial is not None:
+                trials.append((breaker, trial))
+
+        return _call_handler(func, event, breakers, degraded_func)
+    finally:
+        # the trials of circuits that were not called, or only called by a
+        # coroutine handler after it returned, are open to other requests
+        for breaker, trial in trials:
+            breaker._end_trial(trial)
+
+def _call_handler(func, event, breakers, degraded_func):
+    entered = _local.entered = set()
+    _local.admitted = set(breaker.name for breaker in breakers)
+    start = clock()
+    try:
+        response = func(event)
+    except CircuitOpenError as e:
+        return degraded_func(event, e.name)
+    except Exception as e:
+        name = getattr(e, 'circuit_name', None)
+        if name is None:
+            failed = [breaker for breaker in breakers
+                      if breaker.name not in entered and breaker.is_failure(e)]
+            if not failed:
+                raise
+            for breaker in failed:
+                breaker.record_failure()
+            name = failed[0].name
+        logger.exception('The dependency {0} failed'.format(name))
+        return degraded_func(event, name)
+    finally:
+        _local.entered = None
+        _local.admitted = None
+
+    if not hasattr(response, '__await__'):
+        elapsed = clock() - start
+        for breaker in breakers:
+            if breaker.name not in entered:
+                breaker.record_success(elapsed)
+    return response
@@ -0,0 +1,26 @@
+'''
+Python 2 and 3 Compatibility Module
+===================================
+
+Names that differ between python 2 and python 3.
+'''
+import sys
+
+PY2 = sys.version_info[0] == 2
+
+if PY2:
+    string_types = basestring
+    text_type = unicode
+    from urlparse import urlparse
+    from collections import MutableMapping, MutableSequence
+else:
+    string_types = str
+    text_type = str
+    from urllib.parse import urlparse
+    from collections.abc import MutableMapping, MutableSequence
+
+def with_metaclass(metaclass, *bases):
+    '''
+    Return a base class that creates its subclasses with the metaclass.
+    '''
+    return metaclass('{0}Base'.format(metaclass.__name__), bases or (object,), {})
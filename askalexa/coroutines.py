@@ -0,0 +1,93 @@
+'''
+Alexa Coroutine Module
+======================
+
+Helpers for skills with coroutine handlers. Skill uses them when a handler
+returns an awaitable, which only happens on python 3.5 or later, so this
+module is only imported then.
+'''
+
+class HandlerAwaitable(object):
+    '''
+    Awaits the awaitable of a handler. Each step of the awaitable runs with
+    the profile session resumed, if there is one, and finish is called with
+    True/False if the awaitable completed once it is done. A HandlerAwaitable
+    that is not going to be awaited must be closed so finish is called.
+    '''
+
+    def __init__(self, awaitable, session, finish):
+        self._awaitable = awaitable
+        self._session = session
+        self._finish = finish
+        self._started = False
+
+    def _done(self, completed):
+        finish = self._finish
+        if finish is not None:
+            self._finish = None
+            finish(completed)
+
+    def close(self):
+        '''
+        Close the awaitable of the handler if it was never awaited and call
+        finish with False.
+        '''
+        if self._started:
+            return
+
+        self._started = True
+        try:
+            close = getattr(self._awaitable, 'close', None)
+            if close is not None:
+                close()
+        finally:
+            self._done(False)
+
+    def __await__(self):
+        if self._started:
+            raise RuntimeError('The handler awaitable was already awaited or closed')
+        self._started = True
+
+        iterator = self._awaitable.__await__()
+        session = self._session
+        completed = False
+        value = None
+        error = None
+        try:
+            while True:
+                if session is not None:
+                    session.resume()
+                try:
+                    if error is None:
+                        signal = iterator.send(value)
+                    else:
+                        signal = iterator.throw(error)
+                except StopIteration as e:
+                    completed = True
+                    return e.value
+                finally:
+                    if session is not None:
+                        session.pause()
+
+                try:
+                    value = yield signal
+                    error = None
+                except GeneratorExit:
+                    iterator.close()
+                    raise
+                except BaseException as e:
+                    value = None
+                    error = e
+        finally:
+            self._done(completed)
+
+async def call_after(awaitable, func, event):
+    '''
+    Await the awaitable, then call func with the event and await its result
+    if it is awaitable too.
+    '''
+    await awaitable
+    response = func(event)
+    if hasattr(response, '__await__'):
+        response = await response
+    return response
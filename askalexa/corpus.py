@@ -0,0 +1,301 @@
+'''
+Alexa Request Corpus Module
+===========================
+
+Generates realistic request bodies from an interaction model for
+benchmarks and load tests. The output is deterministic for a given seed.
+
+Usage::
+
+    python -m askalexa.corpus model.json --count 10000 --seed 1 \\
+        --mix IntentRequest=6,LaunchRequest=1,AudioPlayer.PlaybackNearlyFinished=2 \\
+        --attribute-size 2048 --users 500 --output corpus.jsonl
+
+Every request type registered with RequestRegister that has a generator
+can be part of the mix. The default mix includes all of them.
+'''
+import sys
+import json
+import uuid
+import random
+import string
+import argparse
+from datetime import datetime, timedelta
+
+from askalexa.model import InteractionModel
+from askalexa.request import standard, audio, playback
+from askalexa.request.register import RequestRegister
+
+DEFAULT_APPLICATION_ID = 'amzn1.ask.skill.00000000-0000-0000-0000-000000000000'
+DEFAULT_START_TIME = datetime(2018, 1, 1)
+
+#: default weight of each request type in the mix
+DEFAULT_MIX = {
+    standard.INTENT_REQUEST_TYPE: 10,
+    standard.LAUNCH_REQUEST_TYPE: 3,
+    standard.SESSION_ENDED_REQUEST_TYPE: 2,
+    audio.PLAYBACK_STARTED_REQUEST_TYPE: 1,
+    audio.PLAYBACK_NEARLY_FINISHED_REQUEST_TYPE: 1,
+    audio.PLAYBACK_FINISHED_REQUEST_TYPE: 1,
+    audio.PLAYBACK_STOPPED_REQUEST_TYPE: 1,
+    audio.PLAYBACK_FAILED_REQUEST_TYPE: 1,
+    audio.SYSTEM_EXCEPTION_ENCOUNTERED: 1,
+    playback.NEXT_COMMAND_REQUEST_TYPE: 1,
+    playback.PREVIOUS_COMMAND_REQUEST_TYPE: 1,
+    playback.PLAY_COMMAND_REQUEST_TYPE: 1,
+    playback.PAUSE_COMMAND_REQUEST_TYPE: 1,
+}
+
+#: request types that are sent with a session
+SESSION_REQUEST_TYPES = (standard.LAUNCH_REQUEST_TYPE, standard.INTENT_REQUEST_TYPE,
+                         standard.SESSION_ENDED_REQUEST_TYPE)
+
+class CorpusGenerator(object):
+    '''
+    Generates request bodies from an InteractionModel. mix maps request
+    types to their relative weight, attribute_size is the approximate size
+    in bytes of the session attributes, and user_count is the number of
+    distinct users the requests come from.
+    '''
+
+    def __init__(self, model, seed=0, mix=None, attribute_size=0, user_count=100,
+                 application_id=DEFAULT_APPLICATION_ID, start_time=DEFAULT_START_TIME):
+        self.model = model
+        self.attribute_size = attribute_size
+        self.application_id = application_id
+
+        self._random = random.Random(seed)
+        self._time = start_time
+
+        mix = mix if mix is not None else DEFAULT_MIX
+        self._types = []
+        self._weights = []
+        for request_type in sorted(mix):
+            if request_type not in RequestRegister.registered_request_classes:
+                raise ValueError('Request type is not registered: {0}'.format(request_type))
+            if not hasattr(self, '_build_' + _method_name(request_type)):
+                raise ValueError('No generator for request type: {0}'.format(request_type))
+            if mix[request_type] > 0:
+                self._types.append(request_type)
+                self._weights.append(mix[request_type])
+
+        if not self._types:
+            raise ValueError('The request mix is empty')
+
+        self._users = ['amzn1.ask.account.' + self._random_id(96) for _ in range(user_count)]
+        self._devices = ['amzn1.ask.device.' + self._random_id(64) for _ in range(user_count)]
+        self._sessions = {}
+        self._intent_names = sorted(model.intents) if model is not None else []
+
+    def _random_id(self, length):
+        return ''.join(self._random.choice(string.ascii_uppercase + string.digits)
+                       for _ in range(length))
+
+    def _uuid(self):
+        return str(uuid.UUID(int=self._random.getrandbits(128)))
+
+    def _choose_type(self):
+        point = self._random.uniform(0, sum(self._weights))
+        for request_type, weight in zip(self._types, self._weights):
+            point -= weight
+            if point <= 0:
+                return request_type
+        return self._types[-1]
+
+    def generate(self, count):
+        '''
+        Yield count request JSON objects.
+        '''
+        for _ in range(count):
+            yield self.generate_one()
+
+    def generate_one(self, request_type=None):
+        '''
+        Generate a single request JSON object of the given or a random type.
+        '''
+        if request_type is None:
+            request_type = self._choose_type()
+
+        user_index = self._random.randrange(len(self._users))
+        self._time += timedelta(milliseconds=self._random.randint(1, 2000))
+
+        request_json = {
+            'type': request_type,
+            'requestId': 'amzn1.echo-api.request.' + self._uuid(),
+            'timestamp': self._time.strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'locale': self.model.locale if self.model is not None else 'en-US',
+        }
+        getattr(self, '_build_' + _method_name(request_type))(request_json)
+
+        body = {'version': '1.0', 'context': self._context(user_index, request_type),
+                'request': request_json}
+        if request_type in SESSION_REQUEST_TYPES:
+            body['session'] = self._session(user_index, request_type)
+        return body
+
+    def _context(self, user_index, request_type):
+        context = {'System': {
+            'application': {'applicationId': self.application_id},
+            'user': {'userId': self._users[user_index]},
+            'device': {'deviceId': self._devices[user_index],
+                       'supportedInterfaces': {'AudioPlayer': {}}},
+            'apiEndpoint': 'https://api.amazonalexa.com',
+        }}
+        if request_type not in SESSION_REQUEST_TYPES or self._random.random() < 0.2:
+            context['AudioPlayer'] = self._playback_state()
+        return context
+
+    def _session(self, user_index, request_type):
+        session_id = self._sessions.get(user_index)
+        is_new = session_id is None or request_type == standard.LAUNCH_REQUEST_TYPE
+        if is_new:
+            session_id = self._sessions[user_index] = 'amzn1.echo-api.session.' + self._uuid()
+        if request_type == standard.SESSION_ENDED_REQUEST_TYPE:
+            self._sessions.pop(user_index, None)
+
+        return {'new': is_new, 'sessionId': session_id,
+                'application': {'applicationId': self.application_id},
+                'attributes': {} if is_new else self._attributes(),
+                'user': {'userId': self._users[user_index]}}
+
+    def _attributes(self):
+        attributes = {}
+        size = 2
+        index = 0
+        while size < self.attribute_size:
+            key = 'key{0}'.format(index)
+            value = self._random_id(self._random.randint(8, 64))
+            attributes[key] = value
+            size += len(key) + len(value) + 8
+            index += 1
+        return attributes
+
+    def _token(self):
+        return 'track-{0}'.format(self._random.randint(1, 10000))
+
+    def _playback_state(self):
+        return {'token': self._token(),
+                'offsetInMilliseconds': self._random.randint(0, 600000),
+                'playerActivity': self._random.choice(['PLAYING', 'PAUSED', 'STOPPED',
+                                                       'FINISHED', 'IDLE'])}
+
+    def _slot_value(self, slot_type):
+        values = self.model.slot_types.get(slot_type) if self.model is not None else None
+        if values:
+            value = self._random.choice(values)
+            return self._random.choice([value.value] + list(value.synonyms))
+        if slot_type == 'AMAZON.NUMBER':
+            return str(self._random.randint(0, 1000))
+        if slot_type == 'AMAZON.DATE':
+            return (DEFAULT_START_TIME + timedelta(days=self._random.randint(0, 365))).strftime('%Y-%m-%d')
+        if slot_type == 'AMAZON.DURATION':
+            return 'PT{0}M'.format(self._random.randint(1, 120))
+        return self._random_id(self._random.randint(3, 10)).lower()
+
+    def _build_launch_request(self, request_json):
+        pass
+
+    def _build_intent_request(self, request_json):
+        if self._intent_names:
+            name = self._random.choice(self._intent_names)
+            slot_types = self.model.intents[name]
+        else:
+            name = 'AMAZON.HelpIntent'
+            slot_types = {}
+
+        slots = {}
+        for slot_name in sorted(slot_types):
+            slot = {'name': slot_name, 'confirmationStatus': 'NONE'}
+            if self._random.random() < 0.9:
+                slot['value'] = self._slot_value(slot_types[slot_name])
+            slots[slot_name] = slot
+
+        request_json['dialogState'] = 'COMPLETED'
+        request_json['intent'] = {'name': name, 'confirmationStatus': 'NONE', 'slots': slots}
+
+    def _build_session_ended_request(self, request_json):
+        request_json['reason'] = self._random.choice(['USER_INITIATED', 'EXCEEDED_MAX_REPROMPTS'])
+
+    def _build_audio_player_request(self, request_json):
+        request_json['token'] = self._token()
+        request_json['offsetInMilliseconds'] = self._random.randint(0, 600000)
+
+    _build_playback_started = _build_audio_player_request
+    _build_playback_nearly_finished = _build_audio_player_request
+    _build_playback_finished = _build_audio_player_request
+    _build_playback_stopped = _build_audio_player_request
+
+    def _build_playback_failed(self, request_json):
+        request_json['token'] = self._token()
+        request_json['error'] = {'type': 'MEDIA_ERROR_SERVICE_UNAVAILABLE',
+                                 'message': 'The service is unavailable'}
+        request_json['currentPlaybackState'] = self._playback_state()
+
+    def _build_exception_encountered(self, request_json):
+        request_json['error'] = {'type': 'INVALID_RESPONSE', 'message': 'Invalid response'}
+        request_json['cause'] = {'requestId': 'amzn1.echo-api.request.' + self._uuid()}
+
+    def _build_playback_controller_request(self, request_json):
+        pass
+
+    _build_next_command_issued = _build_playback_controller_request
+    _build_previous_command_issued = _build_playback_controller_request
+    _build_play_command_issued = _build_playback_controller_request
+    _build_pause_command_issued = _build_playback_controller_request
+
+def _method_name(request_type):
+    '''
+    Convert a request type such as AudioPlayer.PlaybackStarted to the
+    generator method suffix playback_started.
+    '''
+    name = request_type.split('.')[-1]
+    words = []
+    for char in name:
+        if char.isupper() and words:
+            words.append('_')
+        words.append(char.lower())
+    return ''.join(words)
+
+def parse_mix(mix_text):
+    '''
+    Parse a mix such as "IntentRequest=6,LaunchRequest=1" into a dictionary.
+    '''
+    mix = {}
+    for part in mix_text.split(','):
+        request_type, _, weight = part.partition('=')
+        mix[request_type.strip()] = float(weight) if weight else 1.0
+    return mix
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m askalexa.corpus',
+                                     description='Generate Alexa request bodies.')
+    parser.add_argument('model', nargs='?', help='interaction model JSON file')
+    parser.add_argument('--locale', default='en-US')
+    parser.add_argument('--count', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--mix', help='request type weights, e.g. IntentRequest=6,LaunchRequest=1')
+    parser.add_argument('--attribute-size', type=int, default=0,
+                        help='approximate size of the session attributes in bytes')
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--application-id', default=DEFAULT_APPLICATION_ID)
+    parser.add_argument('--output', help='output file, defaults to stdout')
+    args = parser.parse_args(argv)
+
+    model = InteractionModel.load(args.model, args.locale) if args.model else None
+    generator = CorpusGenerator(model, seed=args.seed,
+                                mix=parse_mix(args.mix) if args.mix else None,
+                                attribute_size=args.attribute_size, user_count=args.users,
+                                application_id=args.application_id)
+
+    output = open(args.output, 'w') if args.output else sys.stdout
+    try:
+        for request_json in generator.generate(args.count):
+            output.write(json.dumps(request_json, sort_keys=True))
+            output.write('\n')
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
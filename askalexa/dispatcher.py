@@ -23,9 +23,9 @@ class RequestDispatcher(object):
         cls._skills.pop(skill.application_id, None)
 
     @classmethod
-    def dispatch_request(cls, request_event):
+    def get_skill(cls, request_event):
         '''
-        Dispatch the request to the appropriate skill.
+        Get the skill for the application ID of the request.
         '''
         if request_event.session is not None:
             application_id = request_event.session.application.application_id
@@ -38,7 +38,14 @@ class RequestDispatcher(object):
             raise SkillNotFoundError('No skill exists for appplication ID: ' \
                                      '{0}'.format(application_id))
 
-        return skill.get_response(request_event)
+        return skill
+
+    @classmethod
+    def dispatch_request(cls, request_event):
+        '''
+        Dispatch the request to the appropriate skill.
+        '''
+        return cls.get_skill(request_event).get_response(request_event)
 
     @classmethod
     def list_skills(cls):
@@ -47,6 +54,26 @@ class RequestDispatcher(object):
         '''
         return cls._skills.values()
 
+    @classmethod
+    def get_bulkhead_stats(cls):
+        '''
+        Return a dictionary of application IDs to the in flight and shed
+        counts of the skills that have a bulkhead.
+        '''
+        return dict((application_id, skill.bulkhead.get_stats())
+                    for application_id, skill in list(cls._skills.items())
+                    if skill.bulkhead is not None)
+
+    @classmethod
+    def get_circuit_stats(cls):
+        '''
+        Return a dictionary of application IDs to the circuit states and
+        counts of the skills that have dependencies.
+        '''
+        return dict((application_id, skill.get_circuit_stats())
+                    for application_id, skill in list(cls._skills.items())
+                    if skill.get_circuit_stats())
+
     @classmethod
     def clear_skills(cls):
         '''
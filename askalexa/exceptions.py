@@ -13,6 +13,9 @@ class RequestError(AskAlexaError):
 class UnknownRequestType(RequestError):
 	pass
 
+class InvalidTokenError(RequestError):
+	pass
+
 class InvalidResponseError(AskAlexaError):
 	pass
 
@@ -20,4 +23,9 @@ class ResponseSizeError(InvalidResponseError):
 	pass
 
 class SkillNotFoundError(AskAlexaError):
-	pass
\ No newline at end of file
+	pass
+
+class CircuitOpenError(AskAlexaError):
+	def __init__(self, name):
+		super(CircuitOpenError, self).__init__('Circuit {0} is open'.format(name))
+		self.name = name
\ No newline at end of file
@@ -2,19 +2,31 @@
 Alexa Request Event Handler Module
 ==================================
 '''
-import json
+from askalexa import instrumentation
 from askalexa.dispatcher import RequestDispatcher
 from askalexa.response.package import ResponsePackage
 from askalexa.response import ResponseBuilder
 from askalexa.request.event import AlexaEvent
+from askalexa.request.session import Session
 from askalexa.request import validation
+from askalexa.request.attributes import load_request_json
 from askalexa.exceptions import InvalidResponseError
+from askalexa.skill import reject_awaitable
 
 class RequestEventHandler(object):
     '''
     This class handles an incoming request event and processes it.
     '''
 
+    #: CaptureBuffer that a sample of requests and responses are written to
+    capture = None
+
+    #: MemoryProfiler that measures the memory of every request
+    memory_profiler = None
+
+    #: RateLimiter that is checked before a request is dispatched
+    rate_limiter = None
+
     def __init__(self, request_data):
         '''
         Initialize the event handler with the raw json request data.
@@ -22,6 +34,36 @@ class RequestEventHandler(object):
         self.request_data = request_data
         self.request_json = None
 
+        #: StageTimer for this request, None if instrumentation is disabled
+        self.timer = instrumentation.start_timer()
+
+        self._memory_profiler = self.memory_profiler
+        if self._memory_profiler is not None:
+            self.timer = self._memory_profiler.start_timer()
+
+        # decide up front if this request is captured so it gets timed, only
+        # the raw request data is captured
+        self._capture = None
+        capture = self.capture
+        if capture is not None and request_data is not None and capture.should_capture():
+            self._capture = capture
+            if self.timer is None:
+                self.timer = instrumentation.StageTimer()
+
+        #: size of the encoded session attributes in the last response
+        self.session_attributes_size = 0
+
+    @classmethod
+    def create_from_json(cls, request_json):
+        '''
+        Create an event handler for a request that is already decoded, such as
+        the event of a function platform. Without the raw request data the
+        request cannot be validated or captured.
+        '''
+        handler = cls(None)
+        handler.request_json = request_json
+        return handler
+
     def is_request_valid(self, certificate_url, signature):
         '''
         Returns True/False if the request is valid by checking the following:
@@ -32,29 +74,141 @@ class RequestEventHandler(object):
 
         :returns: bool
         '''
-        if self.request_json is None:
-            self.request_json = json.loads(self.request_data)
+        self._load_request_json()
+        timer = self.timer
 
         try:
             timestamp = self.request_json['request']['timestamp']
         except KeyError:
-            return False
+            return self._validation_failed()
+
+        valid = validation.is_timestamp_valid(timestamp)
+        if timer is not None:
+            timer.lap(instrumentation.VALIDATE_TIMESTAMP)
+        if not valid:
+            return self._validation_failed()
 
-        if not validation.is_timestamp_valid(timestamp):
-            return False
+        validator = validation.get_validator(certificate_url)
+        valid = validator.has_valid_certificate
+        if timer is not None:
+            timer.lap(instrumentation.VALIDATE_CERTIFICATE)
+        if not valid:
+            return self._validation_failed()
 
-        return validation.is_request_certified(certificate_url, self.request_data, signature)
+        valid = validator.is_valid(self.request_data, signature)
+        if timer is not None:
+            timer.lap(instrumentation.VALIDATE_SIGNATURE)
+        if not valid:
+            return self._validation_failed()
+
+        return True
+
+    def _validation_failed(self):
+        timer = self.timer
+        if timer is not None:
+            # the tags of a request that failed validation can not be trusted,
+            # so every failure is recorded under the same key
+            timer.tags[instrumentation.VALID] = False
+            self._record_timer()
+        return False
+
+    def _record_timer(self):
+        instrumentation.record(self.timer)
+        if self._memory_profiler is not None:
+            self._memory_profiler.record(self.timer)
+
+    def _load_request_json(self):
+        if self.request_json is not None:
+            return
+
+        timer = self.timer
+        if timer is not None:
+            timer.restart()
+
+        self.request_json = load_request_json(self.request_data)
+
+        if timer is not None:
+            timer.lap(instrumentation.PARSE)
 
     def get_response(self):
         '''
         Process the incoming request. Requests are decoded and dispatched to
         the appropriate skill. The return is the response from the skill.
         '''
-        if self.request_json is None:
-            self.request_json = json.loads(self.request_data)
+        alexa_event, skill = self.dispatch()
+        alexa_response = skill.get_response(alexa_event)
+        return self.encode_response(alexa_event, alexa_response)
+
+    def dispatch(self):
+        '''
+        Decode the request into an AlexaEvent and find the skill that handles
+        it. Returns a tuple of the event and the skill. A request over its
+        rate limit is handled by the rate limiter instead of the skill.
+        '''
+        self._load_request_json()
+        timer = self.timer
+        if timer is not None:
+            timer.restart()
 
         alexa_event = AlexaEvent.create_from_json(self.request_json)
-        alexa_response = RequestDispatcher.dispatch_request(alexa_event)
+        if timer is not None:
+            timer.lap(instrumentation.CREATE_EVENT)
+
+        rate_limiter = self.rate_limiter
+        if rate_limiter is not None and not rate_limiter.allow(alexa_event):
+            skill = rate_limiter
+        else:
+            skill = RequestDispatcher.get_skill(alexa_event)
+        if timer is not None:
+            timer.lap(instrumentation.DISPATCH)
+
+        return alexa_event, skill
+
+    def encode_response(self, alexa_event, alexa_response):
+        '''
+        Encode the ResponseBuilder the skill returned for the event into the
+        response text.
+        '''
+        if hasattr(alexa_response, '__await__'):
+            reject_awaitable(alexa_response)
+
+        response_package = self._create_package(alexa_event, alexa_response)
+        response_text = self._encode_response(response_package)
+
+        timer = self.timer
+        if timer is not None:
+            timer.lap(instrumentation.ENCODE)
+            timer.tags.update(_request_tags(self.request_json))
+            timer.response_size = len(response_text)
+            self._record_timer()
+
+        if self._capture is not None:
+            self._capture.write(self.request_data, response_text, timer)
+
+        return response_text
+
+    def get_response_data(self):
+        '''
+        Process the request like get_response, but return the response as a
+        dictionary for platforms that encode the response themselves.
+        '''
+        alexa_event, skill = self.dispatch()
+        alexa_response = skill.get_response(alexa_event)
+        response_data = self._create_package(alexa_event, alexa_response).get_plain_json_data()
+
+        timer = self.timer
+        if timer is not None:
+            timer.lap(instrumentation.ENCODE)
+            timer.tags.update(_request_tags(self.request_json))
+            self._record_timer()
+
+        return response_data
+
+    def _create_package(self, alexa_event, alexa_response):
+        timer = self.timer
+        if timer is not None:
+            timer.lap(instrumentation.HANDLER)
+
         if not isinstance(alexa_response, ResponseBuilder):
             raise InvalidResponseError('Response is not an instance of ResponseBuilder.')
 
@@ -62,11 +216,30 @@ class RequestEventHandler(object):
         if alexa_event.session is not None:
             session_attributes = alexa_event.session.attributes
             
-        response_package = ResponsePackage(alexa_response._response, session_attributes)
-        return self._encode_response(response_package)
+        return ResponsePackage(alexa_response._response, session_attributes,
+                               attributes_codec=Session.attributes_codec)
 
     def _encode_response(self, response_package):
         '''
         Process the response package back to a data type to be sent to Alexa.
         '''
-        return json.dumps(response_package.get_json_data())
\ No newline at end of file
+        response_text = response_package.get_json_text()
+        self.session_attributes_size = response_package.session_attributes_size
+        return response_text
+
+def _request_tags(request_json):
+    '''
+    Get the instrumentation tags from the request JSON data.
+    '''
+    request_json = request_json or {}
+    request = request_json.get('request') or {}
+    intent = request.get('intent') or {}
+
+    application = (request_json.get('session') or {}).get('application')
+    if application is None:
+        system = (request_json.get('context') or {}).get('System') or {}
+        application = system.get('application')
+
+    return {instrumentation.APPLICATION_ID: (application or {}).get('applicationId'),
+            instrumentation.REQUEST_TYPE: request.get('type'),
+            instrumentation.INTENT_NAME: intent.get('name')}
\ No newline at end of file
@@ -0,0 +1,218 @@
+'''
+Alexa Request Instrumentation Module
+====================================
+
+Records how long each stage of handling a request takes. Timing is disabled
+until a sink is added, and a disabled handler only pays for a single check
+per request.
+
+Example::
+
+    from askalexa import instrumentation
+
+    histograms = instrumentation.enable()
+    ...
+    for key, histogram in histograms.items():
+        print(key, histogram.percentile(0.99))
+
+Each recorded request is a StageTimer holding the duration of each stage
+in seconds and tags for the application ID, request type, and intent name.
+Requests that fail validation are recorded without those tags, since they
+come from unauthenticated request data.
+'''
+import bisect
+import threading
+
+try:
+    from time import monotonic as clock
+except ImportError:
+    # python 2 has no monotonic clock, use the best timer available
+    from timeit import default_timer as clock
+
+#: request stages
+PARSE = 'parse'
+VALIDATE_TIMESTAMP = 'validate_timestamp'
+VALIDATE_CERTIFICATE = 'validate_certificate'
+VALIDATE_SIGNATURE = 'validate_signature'
+CREATE_EVENT = 'create_event'
+DISPATCH = 'dispatch'
+HANDLER = 'handler'
+ENCODE = 'encode'
+
+#: tags
+APPLICATION_ID = 'application_id'
+REQUEST_TYPE = 'request_type'
+INTENT_NAME = 'intent_name'
+VALID = 'valid'
+
+_sinks = []
+
+class StageTimer(object):
+    '''
+    Times consecutive stages of a single request.
+    '''
+
+    __slots__ = ('durations', 'tags', 'response_size', '_last')
+
+    def __init__(self):
+        self.durations = []
+        self.tags = {}
+        self.response_size = None
+        self._last = clock()
+
+    def restart(self):
+        '''
+        Start timing the next stage from now.
+        '''
+        self._last = clock()
+
+    def lap(self, stage):
+        '''
+        Record the time since the last lap as the duration of the stage.
+        '''
+        now = clock()
+        self.durations.append((stage, now - self._last))
+        self._last = now
+
+    @property
+    def total(self):
+        '''
+        The sum of all the recorded stage durations.
+        '''
+        return sum(duration for _, duration in self.durations)
+
+class Histogram(object):
+    '''
+    A histogram of durations with logarithmic buckets. The bucket bounds
+    grow by a fixed factor starting at the given minimum.
+    '''
+
+    def __init__(self, minimum=1e-6, factor=1.25, bucket_count=96):
+        self.bounds = [minimum * factor ** i for i in range(bucket_count)]
+        self.buckets = [0] * (bucket_count + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        self.buckets[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    @property
+    def mean(self):
+        if not self.count:
+            return None
+        return self.sum / self.count
+
+    def percentile(self, fraction):
+        '''
+        Return the approximate value at the given fraction (0.0 - 1.0) of the
+        recorded values. This is the upper bound of the matching bucket.
+        '''
+        if not self.count:
+            return None
+
+        rank = fraction * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.buckets):
+            seen += bucket_count
+            if seen >= rank and bucket_count:
+                if i < len(self.bounds):
+                    return min(self.bounds[i], self.max)
+                return self.max
+        return self.max
+
+    def summary(self):
+        return {'count': self.count, 'mean': self.mean, 'min': self.min, 'max': self.max,
+                'p50': self.percentile(0.5), 'p95': self.percentile(0.95),
+                'p99': self.percentile(0.99)}
+
+class HistogramSink(object):
+    '''
+    The default sink. Keeps a Histogram for each stage and combination of
+    tags. Keys are tuples of (stage, application_id, request_type, intent_name).
+    '''
+
+    def __init__(self):
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def record(self, timer):
+        tags = timer.tags
+        application_id = tags.get(APPLICATION_ID)
+        request_type = tags.get(REQUEST_TYPE)
+        intent_name = tags.get(INTENT_NAME)
+
+        with self._lock:
+            for stage, duration in timer.durations:
+                key = (stage, application_id, request_type, intent_name)
+                histogram = self._histograms.get(key)
+                if histogram is None:
+                    histogram = self._histograms[key] = Histogram()
+                histogram.add(duration)
+
+    def items(self):
+        with self._lock:
+            return list(self._histograms.items())
+
+    def get(self, stage, application_id=None, request_type=None, intent_name=None):
+        return self._histograms.get((stage, application_id, request_type, intent_name))
+
+    def clear(self):
+        with self._lock:
+            self._histograms.clear()
+
+def add_sink(sink):
+    '''
+    Add a sink to receive request timings. A sink is any object with a
+    record method that accepts a StageTimer.
+    '''
+    if sink not in _sinks:
+        _sinks.append(sink)
+    return sink
+
+def remove_sink(sink):
+    '''
+    Stop sending request timings to the sink.
+    '''
+    if sink in _sinks:
+        _sinks.remove(sink)
+
+def clear_sinks():
+    '''
+    Remove all sinks which disables the instrumentation.
+    '''
+    del _sinks[:]
+
+def enable(sink=None):
+    '''
+    Enable the instrumentation with the given sink or a new HistogramSink.
+    Returns the sink.
+    '''
+    if sink is None:
+        sink = HistogramSink()
+    return add_sink(sink)
+
+def is_enabled():
+    return bool(_sinks)
+
+def start_timer():
+    '''
+    Return a new StageTimer if the instrumentation is enabled, otherwise None.
+    '''
+    if _sinks:
+        return StageTimer()
+    return None
+
+def record(timer):
+    '''
+    Send the timer to all sinks.
+    '''
+    for sink in _sinks:
+        sink.record(timer)
@@ -0,0 +1,81 @@
+'''
+Lazy Module Loading
+===================
+
+Lets a package export names from its submodules without importing them
+until the names are first used.
+
+Example::
+
+    from askalexa.lazy import make_lazy
+
+    make_lazy(__name__, {'ResponseBuilder': 'askalexa.response.builder'})
+'''
+import sys
+import importlib
+from types import ModuleType
+
+class LazyModule(ModuleType):
+    '''
+    A module that imports its exported names from their submodules on first
+    access. Submodules are imported when they are accessed as attributes,
+    the same as if the package had imported them.
+    '''
+
+    _lazy_attributes = {}
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+
+        module_name = self._lazy_attributes.get(name)
+        if module_name is None:
+            submodule_name = '{0}.{1}'.format(self.__name__, name)
+            try:
+                value = importlib.import_module(submodule_name)
+            except ImportError as e:
+                # only a missing submodule is a missing attribute, errors
+                # raised while importing an existing submodule are kept
+                if _is_missing_module(e, submodule_name):
+                    raise AttributeError("module '{0}' has no attribute '{1}'".format(
+                        self.__name__, name))
+                raise
+        else:
+            value = getattr(importlib.import_module(module_name), name)
+
+        setattr(self, name, value)
+        return value
+
+    def __dir__(self):
+        return sorted(set(self.__dict__) | set(self._lazy_attributes))
+
+def _is_missing_module(error, module_name):
+    '''
+    Returns True/False if the ImportError is for the module itself rather
+    than for something the module imports.
+    '''
+    if getattr(error, 'name', None) is not None:
+        return error.name == module_name
+
+    # python 2 import errors only have a message
+    return str(error) == 'No module named {0}'.format(module_name.rpartition('.')[2])
+
+def make_lazy(module_name, attributes):
+    '''
+    Turn the imported module into a LazyModule. attributes maps each exported
+    name to the module it is imported from. Returns the lazy module.
+    '''
+    module = sys.modules[module_name]
+    try:
+        module.__class__ = LazyModule
+    except TypeError:
+        # python 2 cannot change the class of a module, replace the module
+        # and keep a reference to the original so its globals stay alive
+        lazy_module = LazyModule(module_name)
+        lazy_module.__dict__.update(module.__dict__)
+        lazy_module._original_module = module
+        sys.modules[module_name] = module = lazy_module
+
+    module._lazy_attributes = attributes
+    module.__all__ = sorted(attributes)
+    return module
@@ -0,0 +1,279 @@
+'''
+Alexa Request Memory Profiling Module
+=====================================
+
+Measures the memory allocated while handling requests with tracemalloc. For
+each request type and intent it reports how much memory each stage retained
+and the peak it reached, and it can find allocations that survive a request.
+
+Example::
+
+    profiler = MemoryProfiler(track_survivors=True)
+    RequestEventHandler.memory_profiler = profiler
+    ...
+    print(profiler.format_report())
+    profiler.write_report('memory-1.2.0.json')
+
+tracemalloc measures the whole process, so requests should be handled one
+at a time while profiling. Tracking survivors takes a snapshot of every
+traced allocation between requests, which is slow. Objects that are still
+alive when the next request starts are counted as survivors of the previous
+request.
+
+tracemalloc is part of the standard library from python 3.4, python 2 needs
+the pytracemalloc package.
+'''
+import json
+import threading
+from collections import defaultdict
+
+from askalexa import instrumentation
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+class MemoryStageTimer(instrumentation.StageTimer):
+    '''
+    A StageTimer that also records the memory of each stage. allocations is
+    a list of (stage, retained bytes, peak bytes) relative to the memory in
+    use when the stage started.
+    '''
+
+    __slots__ = ('allocations', '_current')
+
+    def __init__(self):
+        self.allocations = []
+        self._current = _reset_traced_memory()
+        super(MemoryStageTimer, self).__init__()
+
+    def restart(self):
+        self._current = _reset_traced_memory()
+        super(MemoryStageTimer, self).restart()
+
+    def lap(self, stage):
+        super(MemoryStageTimer, self).lap(stage)
+        current, peak = tracemalloc.get_traced_memory()
+        self.allocations.append((stage, current - self._current,
+                                 max(peak, current) - self._current))
+        self._current = _reset_traced_memory()
+
+def _reset_traced_memory():
+    '''
+    Start measuring the peak from now and return the traced memory in use.
+    Without tracemalloc.reset_peak (before python 3.9) the peak of a stage
+    is the largest memory in use at its start or end.
+    '''
+    reset_peak = getattr(tracemalloc, 'reset_peak', None)
+    if reset_peak is not None:
+        reset_peak()
+    return tracemalloc.get_traced_memory()[0]
+
+class _RequestMemory(object):
+    '''
+    The memory recorded for a request type and intent.
+    '''
+
+    def __init__(self):
+        self.count = 0
+        self.retained = 0
+        self.stage_counts = defaultdict(int)
+        self.stage_retained = defaultdict(int)
+        self.stage_peak = defaultdict(int)
+        self.stage_peak_max = defaultdict(int)
+
+    def add(self, allocations):
+        self.count += 1
+        for stage, retained, peak in allocations:
+            self.retained += retained
+            self.stage_counts[stage] += 1
+            self.stage_retained[stage] += retained
+            self.stage_peak[stage] += peak
+            self.stage_peak_max[stage] = max(self.stage_peak_max[stage], peak)
+
+    def get_json_data(self):
+        stages = {}
+        for stage, count in self.stage_counts.items():
+            stages[stage] = {'retained_bytes_mean': self.stage_retained[stage] // count,
+                             'peak_bytes_mean': self.stage_peak[stage] // count,
+                             'peak_bytes_max': self.stage_peak_max[stage]}
+        return {'count': self.count, 'retained_bytes_mean': self.retained // self.count,
+                'stages': stages}
+
+class MemoryProfiler(object):
+    '''
+    Profiles the memory of requests handled by RequestEventHandler. frames
+    is the number of frames tracemalloc stores for each allocation, more
+    frames give better survivor locations but are slower.
+    '''
+
+    def __init__(self, frames=1, track_survivors=False, survivor_limit=50):
+        if tracemalloc is None:
+            raise ImportError('tracemalloc is not available, install pytracemalloc on python 2')
+
+        self.frames = frames
+        self.track_survivors = track_survivors
+        self.survivor_limit = survivor_limit
+
+        self._requests = defaultdict(_RequestMemory)
+        self._survivors = defaultdict(lambda: [0, 0])
+        self._snapshot = None
+        self._snapshot_key = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        '''
+        Start tracing allocations if they are not traced yet.
+        '''
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+
+    def stop(self):
+        '''
+        Stop tracing allocations. This clears the traces of tracemalloc.
+        '''
+        self._snapshot = None
+        tracemalloc.stop()
+
+    def start_timer(self):
+        '''
+        Return a MemoryStageTimer for a new request. When tracking survivors,
+        allocations since the previous request are counted against it.
+        '''
+        self.start()
+        if self.track_survivors:
+            self._collect_survivors()
+        return MemoryStageTimer()
+
+    def record(self, timer):
+        '''
+        Add the allocations of a finished request.
+        '''
+        allocations = getattr(timer, 'allocations', None)
+        if allocations is None:
+            return
+
+        key = (timer.tags.get(instrumentation.REQUEST_TYPE),
+               timer.tags.get(instrumentation.INTENT_NAME))
+        with self._lock:
+            self._requests[key].add(allocations)
+            self._snapshot_key = key
+
+    def _take_snapshot(self):
+        snapshot = tracemalloc.take_snapshot()
+        return snapshot.filter_traces((tracemalloc.Filter(False, tracemalloc.__file__),
+                                       tracemalloc.Filter(False, __file__)))
+
+    def _collect_survivors(self):
+        snapshot = self._take_snapshot()
+        with self._lock:
+            previous, key = self._snapshot, self._snapshot_key
+            self._snapshot, self._snapshot_key = snapshot, None
+
+            if previous is None or key is None:
+                return
+
+            for stat in snapshot.compare_to(previous, 'lineno'):
+                if stat.size_diff <= 0:
+                    continue
+                frame = stat.traceback[0]
+                location = '{0}:{1}'.format(frame.filename, frame.lineno)
+                survivor = self._survivors[key + (location,)]
+                survivor[0] += stat.size_diff
+                survivor[1] += max(stat.count_diff, 0)
+
+    def get_report(self):
+        '''
+        Return the report as a dictionary that can be written as JSON.
+        '''
+        with self._lock:
+            requests = []
+            for (request_type, intent_name), memory in self._requests.items():
+                data = memory.get_json_data()
+                data['request_type'] = request_type
+                data['intent'] = intent_name
+                requests.append(data)
+
+            survivors = [{'request_type': request_type, 'intent': intent_name,
+                          'location': location, 'size_bytes': size, 'count': count}
+                         for (request_type, intent_name, location), (size, count)
+                         in self._survivors.items()]
+
+        requests.sort(key=lambda data: (data['request_type'] or '', data['intent'] or ''))
+        survivors.sort(key=lambda data: -data['size_bytes'])
+        return {'requests': requests, 'survivors': survivors[:self.survivor_limit]}
+
+    def write_report(self, path):
+        '''
+        Write the report as JSON with sorted keys so reports of different
+        releases can be compared with compare_reports or a text diff.
+        '''
+        with open(path, 'w') as report_file:
+            json.dump(self.get_report(), report_file, indent=2, sort_keys=True)
+
+    def format_report(self):
+        return format_report(self.get_report())
+
+    def reset(self):
+        with self._lock:
+            self._requests.clear()
+            self._survivors.clear()
+            self._snapshot = None
+            self._snapshot_key = None
+
+def _request_name(data):
+    name = data['request_type'] or '-'
+    if data['intent']:
+        name += ' / ' + data['intent']
+    return name
+
+def format_report(report):
+    '''
+    Format a report from MemoryProfiler.get_report as text.
+    '''
+    lines = ['{0:<50} {1:<22} {2:>8} {3:>14} {4:>14} {5:>14}'.format(
+        'request type / intent', 'stage', 'count', 'retained mean', 'peak mean', 'peak max')]
+    for data in report['requests']:
+        name = _request_name(data)
+        lines.append('{0:<50} {1:<22} {2:>8} {3:>14}'.format(
+            name, 'total', data['count'], data['retained_bytes_mean']))
+        for stage in sorted(data['stages']):
+            stage_data = data['stages'][stage]
+            lines.append('{0:<50} {1:<22} {2:>8} {3:>14} {4:>14} {5:>14}'.format(
+                '', stage, '', stage_data['retained_bytes_mean'],
+                stage_data['peak_bytes_mean'], stage_data['peak_bytes_max']))
+
+    if report['survivors']:
+        lines.append('')
+        lines.append('{0:<50} {1:>12} {2:>8}  {3}'.format('surviving allocations', 'bytes',
+                                                          'count', 'location'))
+        for survivor in report['survivors']:
+            lines.append('{0:<50} {1:>12} {2:>8}  {3}'.format(
+                _request_name(survivor), survivor['size_bytes'], survivor['count'],
+                survivor['location']))
+    return '\n'.join(lines)
+
+def compare_reports(baseline, report, threshold=0.1):
+    '''
+    Compare two reports from MemoryProfiler.get_report. Returns a list of
+    (request name, stage, baseline peak mean, peak mean) for the stages whose
+    mean peak grew by more than the threshold.
+    '''
+    baseline_requests = dict(((data['request_type'], data['intent']), data)
+                             for data in baseline['requests'])
+    growth = []
+    for data in report['requests']:
+        previous = baseline_requests.get((data['request_type'], data['intent']))
+        if previous is None:
+            continue
+
+        for stage, stage_data in sorted(data['stages'].items()):
+            previous_stage = previous['stages'].get(stage)
+            if previous_stage is None:
+                continue
+            before = previous_stage['peak_bytes_mean']
+            after = stage_data['peak_bytes_mean']
+            if after > before * (1.0 + threshold):
+                growth.append((_request_name(data), stage, before, after))
+    return growth
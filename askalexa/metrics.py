@@ -0,0 +1,247 @@
+'''
+Alexa Metrics Module
+====================
+
+Counters and histograms that can be rendered in the Prometheus text
+exposition format. The MetricsSink collects request metrics from the
+instrumentation module.
+
+Example with flask::
+
+    from askalexa import metrics
+
+    metrics.enable()
+
+    @app.route('/metrics')
+    def serve_metrics():
+        return metrics.render(), 200, {'Content-Type': metrics.CONTENT_TYPE}
+'''
+import threading
+from askalexa import instrumentation
+from askalexa.compat import text_type
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+#: default latency buckets in seconds
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+                   2.5, 5.0, 10.0)
+
+#: default response size buckets in bytes
+SIZE_BUCKETS = (256, 512, 1024, 2048, 4096, 8192, 16384, 32768, 65536, 131072)
+
+#: default number of label value combinations kept for each metric
+MAX_SERIES = 1000
+
+#: label value used for every combination after the first max_series
+OTHER_LABEL = 'other'
+
+def _escape(value):
+    return text_type(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _format_labels(names, values, extra=None):
+    pairs = ['{0}="{1}"'.format(n, _escape(v)) for n, v in zip(names, values) if v is not None]
+    if extra is not None:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(pairs) + '}'
+
+def _sort_key(item):
+    # label values may be None, which can not be compared with strings
+    return tuple('' if v is None else v for v in item[0])
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Metric(object):
+    '''
+    Base class for metrics. A metric keeps a value for each combination of
+    label values. Once it has max_series combinations, new combinations are
+    counted with every label set to OTHER_LABEL.
+    '''
+
+    metric_type = None
+
+    def __init__(self, name, documentation, label_names=(), max_series=MAX_SERIES):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.max_series = max_series
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _get_label_values(self, label_values):
+        # the lock must be held
+        if label_values in self._values or len(self._values) < self.max_series:
+            return label_values
+        return (OTHER_LABEL,) * len(label_values)
+
+    def render(self):
+        lines = ['# HELP {0} {1}'.format(self.name, self.documentation),
+                 '# TYPE {0} {1}'.format(self.name, self.metric_type)]
+        with self._lock:
+            items = sorted(self._values.items(), key=_sort_key)
+        for label_values, value in items:
+            lines.extend(self._render_value(label_values, value))
+        return lines
+
+    def _render_value(self, label_values, value):
+        raise NotImplementedError
+
+class Counter(Metric):
+    '''
+    A value that only goes up.
+    '''
+
+    metric_type = 'counter'
+
+    def inc(self, *label_values, **kwargs):
+        '''
+        Increment the counter for the label values by the amount keyword
+        argument, which defaults to 1.
+        '''
+        amount = kwargs.get('amount', 1)
+        with self._lock:
+            label_values = self._get_label_values(label_values)
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def get(self, *label_values):
+        return self._values.get(label_values, 0)
+
+    def _render_value(self, label_values, value):
+        return ['{0}{1} {2}'.format(self.name, _format_labels(self.label_names, label_values),
+                                    _format_value(value))]
+
+class Histogram(Metric):
+    '''
+    Counts observed values in fixed buckets.
+    '''
+
+    metric_type = 'histogram'
+
+    def __init__(self, name, documentation, label_names=(), buckets=LATENCY_BUCKETS,
+                 max_series=MAX_SERIES):
+        super(Histogram, self).__init__(name, documentation, label_names, max_series)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            label_values = self._get_label_values(label_values)
+            state = self._values.get(label_values)
+            if state is None:
+                # counts for each bucket plus +Inf, then the sum of the values
+                state = self._values[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+                    break
+            else:
+                state[len(self.buckets)] += 1
+            state[-1] += value
+
+    def _render_value(self, label_values, state):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float('inf'),), state[:-1]):
+            cumulative += count
+            labels = _format_labels(self.label_names, label_values,
+                                    'le="{0}"'.format(_format_value(bound)))
+            lines.append('{0}_bucket{1} {2}'.format(self.name, labels, cumulative))
+
+        labels = _format_labels(self.label_names, label_values)
+        lines.append('{0}_sum{1} {2}'.format(self.name, labels, _format_value(state[-1])))
+        lines.append('{0}_count{1} {2}'.format(self.name, labels, cumulative))
+        return lines
+
+class MetricsRegistry(object):
+    '''
+    A collection of metrics that are rendered together.
+    '''
+
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, label_names=(), max_series=MAX_SERIES):
+        return self.register(Counter(name, documentation, label_names, max_series))
+
+    def histogram(self, name, documentation, label_names=(), buckets=LATENCY_BUCKETS,
+                  max_series=MAX_SERIES):
+        return self.register(Histogram(name, documentation, label_names, buckets, max_series))
+
+    def render(self):
+        '''
+        Render all metrics in the Prometheus text format.
+        '''
+        lines = []
+        for metric in list(self._metrics):
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+class MetricsSink(object):
+    '''
+    An instrumentation sink that records request metrics into a registry.
+    '''
+
+    def __init__(self, registry):
+        self.requests = registry.counter(
+            'askalexa_requests_total', 'Number of handled requests.',
+            ('application_id', 'request_type', 'intent'))
+        self.validation_failures = registry.counter(
+            'askalexa_validation_failures_total', 'Number of requests that failed validation.')
+        self.request_duration = registry.histogram(
+            'askalexa_request_duration_seconds', 'Time spent handling a request.',
+            ('application_id', 'request_type', 'intent'))
+        self.stage_duration = registry.histogram(
+            'askalexa_stage_duration_seconds', 'Time spent in each request stage.',
+            ('stage', 'application_id', 'request_type'))
+        self.response_size = registry.histogram(
+            'askalexa_response_size_bytes', 'Size of the encoded responses.',
+            ('application_id', 'request_type'), SIZE_BUCKETS)
+
+    def record(self, timer):
+        tags = timer.tags
+        if tags.get(instrumentation.VALID) is False:
+            # the request data is not trusted, so it is not used for labels
+            self.validation_failures.inc()
+            return
+
+        application_id = tags.get(instrumentation.APPLICATION_ID)
+        request_type = tags.get(instrumentation.REQUEST_TYPE)
+
+        intent_name = tags.get(instrumentation.INTENT_NAME)
+        self.requests.inc(application_id, request_type, intent_name)
+        self.request_duration.observe(timer.total, application_id, request_type, intent_name)
+        for stage, duration in timer.durations:
+            self.stage_duration.observe(duration, stage, application_id, request_type)
+
+        if timer.response_size is not None:
+            self.response_size.observe(timer.response_size, application_id, request_type)
+
+#: the registry used by enable and render
+default_registry = MetricsRegistry()
+
+_default_sink = None
+
+def enable():
+    '''
+    Start collecting request metrics into the default registry.
+    '''
+    global _default_sink
+    if _default_sink is None:
+        _default_sink = MetricsSink(default_registry)
+    return instrumentation.add_sink(_default_sink)
+
+def render():
+    '''
+    Render the default registry in the Prometheus text format.
+    '''
+    return default_registry.render()
@@ -0,0 +1,109 @@
+'''
+Alexa Interaction Model Module
+==============================
+
+Loads the intents, slots and slot types of an Alexa interaction model from
+the JSON that is edited in the Alexa developer console or the ASK CLI.
+'''
+import json
+
+class SlotTypeValue(object):
+    '''
+    A value of a custom slot type with its optional ID and synonyms.
+    '''
+
+    def __init__(self, value, value_id=None, synonyms=None):
+        self._value = value
+        self._value_id = value_id
+        self._synonyms = synonyms or []
+
+    @classmethod
+    def create_from_json(cls, value_json):
+        name_json = value_json['name']
+        return cls(value=name_json['value'], value_id=value_json.get('id'),
+                   synonyms=name_json.get('synonyms'))
+
+    @property
+    def value(self):
+        '''
+        The canonical value.
+        '''
+        return self._value
+
+    @property
+    def value_id(self):
+        '''
+        The ID of the value, this is None if the model did not give one.
+        '''
+        return self._value_id
+
+    @property
+    def synonyms(self):
+        '''
+        A list of other words that mean the same as this value.
+        '''
+        return self._synonyms
+
+class InteractionModel(object):
+    '''
+    The language model for a single locale.
+    '''
+
+    def __init__(self, locale, invocation_name, intents, slot_types):
+        '''
+        intents maps each intent name to a dictionary of slot names to slot
+        type names. slot_types maps each custom slot type name to a list of
+        SlotTypeValue.
+        '''
+        self._locale = locale
+        self._invocation_name = invocation_name
+        self._intents = intents
+        self._slot_types = slot_types
+
+    @classmethod
+    def create_from_json(cls, model_json, locale='en-US'):
+        language_json = model_json.get('interactionModel', model_json).get('languageModel', model_json)
+
+        intents = {}
+        for intent_json in language_json.get('intents', []):
+            intents[intent_json['name']] = dict((slot['name'], slot['type'])
+                                                for slot in intent_json.get('slots', []))
+
+        slot_types = {}
+        for type_json in language_json.get('types', []):
+            slot_types[type_json['name']] = [SlotTypeValue.create_from_json(value)
+                                             for value in type_json.get('values', [])]
+
+        return cls(locale=locale, invocation_name=language_json.get('invocationName'),
+                   intents=intents, slot_types=slot_types)
+
+    @classmethod
+    def load(cls, path, locale='en-US'):
+        '''
+        Load the interaction model JSON file for the locale.
+        '''
+        with open(path) as model_file:
+            return cls.create_from_json(json.load(model_file), locale=locale)
+
+    @property
+    def locale(self):
+        return self._locale
+
+    @property
+    def invocation_name(self):
+        return self._invocation_name
+
+    @property
+    def intents(self):
+        '''
+        A dictionary of intent names to a dictionary of slot names and their
+        slot type names.
+        '''
+        return self._intents
+
+    @property
+    def slot_types(self):
+        '''
+        A dictionary of custom slot type names to a list of SlotTypeValue.
+        '''
+        return self._slot_types
@@ -0,0 +1,147 @@
+'''
+Alexa Playback State Module
+===========================
+
+Keeps the last known AudioPlayer state for each user in memory. The cache is
+updated from the AudioPlayer requests and the AudioPlayer context sent with
+other requests, so a skill can resume playback at the right offset without
+reading the position from storage.
+
+Example::
+
+    cache = PlaybackStateCache(url_for_token=lookup_stream_url)
+    mySkill = askalexa.Skill('my-app-id', playback_cache=cache)
+
+    @mySkill.on_request(playback.PLAY_COMMAND_REQUEST_TYPE)
+    def resume(request_event):
+        return cache.resume(request_event.user.user_id)
+'''
+import time
+from askalexa.cache import LRUCache
+from askalexa.request import audio
+from askalexa.request.audio import CurrentPlaybackState
+from askalexa.response import ResponseBuilder
+from askalexa.response.audio import PlayDirective
+
+#: player activity for each AudioPlayer request type
+_REQUEST_ACTIVITY = {
+    audio.PLAYBACK_STARTED_REQUEST_TYPE: CurrentPlaybackState.PLAYING,
+    audio.PLAYBACK_NEARLY_FINISHED_REQUEST_TYPE: CurrentPlaybackState.PLAYING,
+    audio.PLAYBACK_STOPPED_REQUEST_TYPE: CurrentPlaybackState.STOPPED,
+    audio.PLAYBACK_FINISHED_REQUEST_TYPE: CurrentPlaybackState.FINISHED,
+}
+
+class PlaybackState(object):
+    '''
+    The last known playback state of a user.
+    '''
+
+    __slots__ = ('token', 'offset_in_milliseconds', 'player_activity', 'updated')
+
+    def __init__(self, token, offset_in_milliseconds, player_activity, updated=None):
+        self.token = token
+        self.offset_in_milliseconds = offset_in_milliseconds or 0
+        self.player_activity = player_activity
+        self.updated = updated if updated is not None else time.time()
+
+    def __repr__(self):
+        return 'PlaybackState({0!r}, {1!r}, {2!r})'.format(self.token,
+                    self.offset_in_milliseconds, self.player_activity)
+
+class PlaybackStateCache(object):
+    '''
+    A bounded cache of the playback state of each user. An optional persist
+    function is called with the user ID and state when playback stops or
+    finishes, and an optional load function is called with the user ID when
+    a user is not in the cache.
+    '''
+
+    def __init__(self, max_users=10000, persist=None, load=None, url_for_token=None):
+        '''
+        url_for_token is an optional function that returns the stream url for
+        a token. It is used when resuming playback without a stream url.
+        '''
+        self._states = LRUCache(max_users)
+        self.persist = persist
+        self.load = load
+        self.url_for_token = url_for_token
+
+    def __len__(self):
+        return len(self._states)
+
+    def get(self, user_id):
+        '''
+        Return the PlaybackState of the user or None if it is not known.
+        '''
+        state = self._states.get(user_id)
+        if state is None and self.load is not None:
+            state = self.load(user_id)
+            if state is not None:
+                self._states.set(user_id, state)
+        return state
+
+    def set(self, user_id, state):
+        '''
+        Set the PlaybackState of the user.
+        '''
+        self._states.set(user_id, state)
+        if self.persist is not None and state.player_activity in (CurrentPlaybackState.STOPPED,
+                                                                  CurrentPlaybackState.FINISHED):
+            self.persist(user_id, state)
+
+    def clear(self, user_id):
+        '''
+        Forget the PlaybackState of the user. The state is loaded again on
+        the next get if there is a load function.
+        '''
+        self._states.pop(user_id)
+
+    def update_from_event(self, event):
+        '''
+        Update the state of the user from the request event. This is called
+        by the skill for every request.
+        '''
+        user = event.user
+        if user is None:
+            return
+
+        request = event.request
+        activity = _REQUEST_ACTIVITY.get(request.request_type)
+        if activity is not None:
+            state = PlaybackState(request.token, request.offset_in_milliseconds, activity)
+        elif request.request_type == audio.PLAYBACK_FAILED_REQUEST_TYPE:
+            current = request.current_playback_state
+            state = PlaybackState(current.token, current.offset_in_milliseconds,
+                                  current.player_activity)
+        elif event.context is not None and event.context.audio_player is not None:
+            current = event.context.audio_player
+            if current.token is None:
+                return
+            state = PlaybackState(current.token, current.offset_in_milliseconds,
+                                  current.player_activity)
+        else:
+            return
+
+        self.set(user.user_id, state)
+
+    def resume(self, user_id, stream_url=None, response=None):
+        '''
+        Build a response that resumes the last stream of the user at the
+        last known offset. The stream url is looked up with url_for_token if
+        it is not given. Returns the response builder.
+        '''
+        if response is None:
+            response = ResponseBuilder()
+
+        state = self.get(user_id)
+        if state is None or state.token is None:
+            return response
+
+        if stream_url is None:
+            if self.url_for_token is None:
+                raise ValueError('A stream url or url_for_token function is required')
+            stream_url = self.url_for_token(state.token)
+
+        response.play_audio(stream_url, state.token, None, state.offset_in_milliseconds,
+                            play_behavior=PlayDirective.REPLACE_ALL)
+        return response
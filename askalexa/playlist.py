@@ -0,0 +1,261 @@
+'''
+Alexa Playlist Module
+=====================
+
+A playlist engine for skills that use the AudioPlayer interface. Each user
+has a queue of tracks indexed by their stream token, so finding the next or
+previous track for an AudioPlayer or PlaybackController request does not
+need to look anything up in a database.
+
+Example::
+
+    engine = PlaylistEngine()
+    engine.attach(mySkill)
+
+    @mySkill.on_intent('PlayMusic')
+    def play_music(request_event):
+        user_id = request_event.user.user_id
+        engine.set_tracks(user_id, [Track('track-1', 'https://...'),
+                                    Track('track-2', 'https://...')])
+        return engine.play(user_id)
+'''
+from askalexa.cache import LRUCache
+from askalexa.request import audio, playback
+from askalexa.response import ResponseBuilder
+from askalexa.response.audio import PlayDirective
+
+class Track(object):
+    '''
+    An audio track in a playlist. The token must be unique in the playlist.
+    '''
+
+    def __init__(self, token, url):
+        self._token = token
+        self._url = url
+
+    def __repr__(self):
+        return 'Track({0!r}, {1!r})'.format(self._token, self._url)
+
+    @property
+    def token(self):
+        '''
+        The stream token that identifies this track.
+        '''
+        return self._token
+
+    @property
+    def url(self):
+        '''
+        The url of the audio stream.
+        '''
+        return self._url
+
+class Playlist(object):
+    '''
+    A queue of tracks for a single user. Tracks are indexed by token so
+    the position of any track is found in constant time.
+    '''
+
+    def __init__(self, tracks=None, loop=False):
+        self._tracks = []
+        self._positions = {}
+        self.loop = loop
+
+        for track in tracks or []:
+            self.enqueue(track)
+
+    def __len__(self):
+        return len(self._tracks)
+
+    def __iter__(self):
+        return iter(self._tracks)
+
+    @classmethod
+    def create_from_json(cls, playlist_json):
+        tracks = [Track(token, url) for token, url in playlist_json['tracks']]
+        return cls(tracks=tracks, loop=playlist_json.get('loop', False))
+
+    def get_json_data(self):
+        '''
+        Returns a dictionary with the playlist data to store.
+        '''
+        return {'tracks': [[t.token, t.url] for t in self._tracks], 'loop': self.loop}
+
+    def enqueue(self, track):
+        '''
+        Add the track to the end of the playlist.
+        '''
+        if track.token in self._positions:
+            raise ValueError('Track token is already in the playlist: {0}'.format(track.token))
+
+        self._positions[track.token] = len(self._tracks)
+        self._tracks.append(track)
+
+    def position(self, token):
+        '''
+        Return the position of the track with the given token or None if the
+        token is not in the playlist.
+        '''
+        return self._positions.get(token)
+
+    def track_at(self, position):
+        '''
+        Return the track at the position or None if the position is outside
+        of the playlist. Positions wrap around if the playlist loops.
+        '''
+        if not self._tracks:
+            return None
+
+        if self.loop:
+            position %= len(self._tracks)
+        elif position < 0 or position >= len(self._tracks):
+            return None
+
+        return self._tracks[position]
+
+    def next_track(self, token):
+        '''
+        Return the track after the track with the given token.
+        '''
+        position = self._positions.get(token)
+        if position is None:
+            return None
+        return self.track_at(position + 1)
+
+    def previous_track(self, token):
+        '''
+        Return the track before the track with the given token.
+        '''
+        position = self._positions.get(token)
+        if position is None:
+            return None
+        return self.track_at(position - 1)
+
+class PlaylistEngine(object):
+    '''
+    Keeps a playlist for each user and builds the audio responses to move
+    through them. Playlists can optionally be persisted with a
+    UserAttributesStore, in which case they are saved under the given
+    attribute key.
+    '''
+
+    def __init__(self, max_users=10000, store=None, attribute_key='playlist'):
+        self._playlists = LRUCache(max_users)
+        self._store = store
+        self._attribute_key = attribute_key
+
+    def get_playlist(self, user_id):
+        '''
+        Return the playlist for the user or None if the user has no playlist.
+        '''
+        playlist = self._playlists.get(user_id)
+        if playlist is None and self._store is not None:
+            playlist_json = self._store.get(user_id).peek(self._attribute_key)
+            if playlist_json is not None:
+                playlist = Playlist.create_from_json(playlist_json)
+                self._playlists.set(user_id, playlist)
+
+        return playlist
+
+    def set_tracks(self, user_id, tracks, loop=False):
+        '''
+        Replace the playlist for the user with the given tracks.
+        '''
+        playlist = Playlist(tracks=tracks, loop=loop)
+        self._playlists.set(user_id, playlist)
+        self._save(user_id, playlist)
+        return playlist
+
+    def enqueue(self, user_id, track):
+        '''
+        Add the track to the end of the playlist for the user.
+        '''
+        playlist = self.get_playlist(user_id)
+        if playlist is None:
+            return self.set_tracks(user_id, [track])
+
+        playlist.enqueue(track)
+        self._save(user_id, playlist)
+        return playlist
+
+    def clear(self, user_id):
+        '''
+        Remove the playlist for the user.
+        '''
+        self._playlists.pop(user_id)
+        if self._store is not None:
+            self._store.get(user_id).pop(self._attribute_key, None)
+            self._store.commit(user_id)
+
+    def _save(self, user_id, playlist):
+        if self._store is None:
+            return
+
+        attributes = self._store.get(user_id)
+        playlist_json = playlist.get_json_data()
+        if attributes.peek(self._attribute_key) != playlist_json:
+            attributes[self._attribute_key] = playlist_json
+            self._store.commit(user_id)
+
+    def play(self, user_id, position=0, offset_in_milliseconds=0, response=None):
+        '''
+        Play the playlist of the user from the given position, replacing
+        anything that is currently playing. Returns the response builder.
+        '''
+        if response is None:
+            response = ResponseBuilder()
+
+        playlist = self.get_playlist(user_id)
+        track = playlist.track_at(position) if playlist is not None else None
+        if track is not None:
+            response.play_audio(track.url, track.token, None, offset_in_milliseconds,
+                                play_behavior=PlayDirective.REPLACE_ALL)
+        return response
+
+    def on_playback_nearly_finished(self, event):
+        '''
+        Enqueue the track that follows the one that is nearly finished.
+        '''
+        response = ResponseBuilder()
+        token = event.request.token
+
+        playlist = self.get_playlist(event.user.user_id)
+        track = playlist.next_track(token) if playlist is not None else None
+        if track is not None:
+            response.play_audio(track.url, track.token, token)
+        return response
+
+    def on_next(self, event):
+        '''
+        Skip to the track after the one that is currently playing.
+        '''
+        return self._skip(event, Playlist.next_track)
+
+    def on_previous(self, event):
+        '''
+        Go back to the track before the one that is currently playing.
+        '''
+        return self._skip(event, Playlist.previous_track)
+
+    def _skip(self, event, find_track):
+        response = ResponseBuilder()
+
+        audio_player = event.context.audio_player if event.context is not None else None
+        if audio_player is None or audio_player.token is None:
+            return response
+
+        playlist = self.get_playlist(event.user.user_id)
+        track = find_track(playlist, audio_player.token) if playlist is not None else None
+        if track is not None:
+            response.play_audio(track.url, track.token, None,
+                                play_behavior=PlayDirective.REPLACE_ALL)
+        return response
+
+    def attach(self, skill):
+        '''
+        Register the engine to handle the nearly finished, next and previous
+        requests for the skill.
+        '''
+        skill.on_request(audio.PLAYBACK_NEARLY_FINISHED_REQUEST_TYPE)(self.on_playback_nearly_finished)
+        skill.on_request(playback.NEXT_COMMAND_REQUEST_TYPE)(self.on_next)
+        skill.on_request(playback.PREVIOUS_COMMAND_REQUEST_TYPE)(self.on_previous)
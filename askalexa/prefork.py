@@ -0,0 +1,216 @@
+'''
+Alexa Pre-fork Module
+=====================
+
+Helpers for pre-forking servers such as gunicorn. Call warm in the master
+process after the modules that register the skills are imported and before
+the workers are forked, so the skills are frozen with everything else.
+It does the work every worker would otherwise repeat: it imports and
+registers every request class, fills the module level caches used to parse
+requests and encode responses, and downloads and checks the signing
+certificates. It then moves every object into the permanent generation of
+the garbage collector with gc.freeze, so collections in the workers do not
+write to the shared pages and the pages stay shared copy-on-write.
+
+Example gunicorn configuration::
+
+    import gc
+    from askalexa import prefork
+
+    gc.disable()
+
+    def when_ready(server):
+        import myskills
+        before, after = prefork.warm(certificate_urls=[
+            'https://s3.amazonaws.com/echo.api/echo-api-cert-7.pem'])
+        server.log.info(prefork.format_memory_usage({'master before': before,
+                                                     'master after': after}))
+
+    def post_fork(server, worker):
+        gc.enable()
+
+    def post_worker_init(worker):
+        worker.log.info(prefork.format_memory_usage({worker.pid: prefork.memory_usage()}))
+
+The requests are warmed with a small built-in request of every request
+type. Pass request bodies captured from real traffic as requests to warm
+with them instead.
+
+Disabling the collector until the fork keeps it from moving objects around
+while the master starts. gc.freeze needs python 3.7, on older versions the
+objects are only collected. Resources that cannot be shared between
+processes, such as the connection of a UserAttributesStore backend, should
+still be opened in the workers.
+'''
+import gc
+import os
+import json
+
+from askalexa.request import validation, standard, audio, playback
+from askalexa.request.attributes import load_request_json
+from askalexa.request.event import AlexaEvent
+from askalexa.response import ResponseBuilder
+from askalexa.response.audio import PlayDirective
+from askalexa.response.package import ResponsePackage
+
+_MEMORY_FIELDS = {'Rss': 'rss', 'Pss': 'pss', 'Shared_Clean': 'shared', 'Shared_Dirty': 'shared',
+                  'Private_Clean': 'private', 'Private_Dirty': 'private'}
+
+_WARM_AUDIO_FIELDS = {'token': 'warm-token', 'offsetInMilliseconds': 0}
+_WARM_PLAYBACK_STATE = {'token': 'warm-token', 'offsetInMilliseconds': 0, 'playerActivity': 'PLAYING'}
+
+#: request fields of the built-in warm up request of each request type
+WARM_REQUEST_FIELDS = {
+    standard.LAUNCH_REQUEST_TYPE: {},
+    standard.INTENT_REQUEST_TYPE: {
+        'dialogState': 'COMPLETED',
+        'intent': {'name': 'AMAZON.HelpIntent', 'confirmationStatus': 'NONE',
+                   'slots': {'warm': {'name': 'warm', 'value': 'warm',
+                                      'confirmationStatus': 'NONE'}}}},
+    standard.SESSION_ENDED_REQUEST_TYPE: {'reason': 'USER_INITIATED'},
+    audio.PLAYBACK_STARTED_REQUEST_TYPE: _WARM_AUDIO_FIELDS,
+    audio.PLAYBACK_NEARLY_FINISHED_REQUEST_TYPE: _WARM_AUDIO_FIELDS,
+    audio.PLAYBACK_FINISHED_REQUEST_TYPE: _WARM_AUDIO_FIELDS,
+    audio.PLAYBACK_STOPPED_REQUEST_TYPE: _WARM_AUDIO_FIELDS,
+    audio.PLAYBACK_FAILED_REQUEST_TYPE: {
+        'token': 'warm-token', 'currentPlaybackState': _WARM_PLAYBACK_STATE,
+        'error': {'type': 'MEDIA_ERROR_UNKNOWN', 'message': 'Warming up'}},
+    audio.SYSTEM_EXCEPTION_ENCOUNTERED: {
+        'error': {'type': 'INVALID_RESPONSE', 'message': 'Warming up'},
+        'cause': {'requestId': 'amzn1.echo-api.request.warm'}},
+    playback.NEXT_COMMAND_REQUEST_TYPE: {},
+    playback.PREVIOUS_COMMAND_REQUEST_TYPE: {},
+    playback.PLAY_COMMAND_REQUEST_TYPE: {},
+    playback.PAUSE_COMMAND_REQUEST_TYPE: {},
+}
+
+#: request types that are sent with a session
+_SESSION_REQUEST_TYPES = (standard.LAUNCH_REQUEST_TYPE, standard.INTENT_REQUEST_TYPE,
+                          standard.SESSION_ENDED_REQUEST_TYPE)
+
+def warm(certificate_urls=(), freeze=True, requests=None):
+    '''
+    Warm the state that is shared with the workers and freeze it. Returns
+    the memory usage of this process before and after. Raises ValueError if
+    one of the certificates is not valid, so the server does not start
+    with a certificate that fails every request. requests are the request
+    bodies given to warm_requests.
+    '''
+    before = memory_usage()
+
+    warm_requests(requests)
+    warm_responses()
+    invalid_urls = [certificate_url for certificate_url in certificate_urls
+                    if not validation.get_validator(certificate_url).has_valid_certificate]
+    if invalid_urls:
+        raise ValueError('The certificates are not valid: {0}'.format(', '.join(invalid_urls)))
+
+    if freeze:
+        freeze_objects()
+    return before, memory_usage()
+
+def warm_requests(requests=None):
+    '''
+    Parse the request bodies so every request class is registered and the
+    caches for parsing are filled, including the timestamp format used by
+    the timestamp validation. Without request bodies a built-in request of
+    every request type is parsed. The requests are not dispatched to the
+    skills.
+    '''
+    if requests is None:
+        requests = [create_warm_request(request_type) for request_type in sorted(WARM_REQUEST_FIELDS)]
+
+    for request_data in requests:
+        request_json = load_request_json(request_data)
+        AlexaEvent.create_from_json(request_json)
+        validation.is_timestamp_valid(request_json['request']['timestamp'])
+
+def create_warm_request(request_type):
+    '''
+    Return the body of the built-in warm up request of the request type.
+    '''
+    application = {'applicationId': 'amzn1.ask.skill.warm'}
+    user = {'userId': 'amzn1.ask.account.warm'}
+    request_json = {'type': request_type, 'requestId': 'amzn1.echo-api.request.warm',
+                    'timestamp': '2018-01-01T00:00:00Z', 'locale': 'en-US'}
+    request_json.update(WARM_REQUEST_FIELDS[request_type])
+
+    body = {'version': '1.0', 'request': request_json, 'context': {
+        'System': {'application': application, 'user': user,
+                   'device': {'deviceId': 'amzn1.ask.device.warm',
+                              'supportedInterfaces': {'AudioPlayer': {}}},
+                   'apiEndpoint': 'https://api.amazonalexa.com'},
+        'AudioPlayer': _WARM_PLAYBACK_STATE}}
+    if request_type in _SESSION_REQUEST_TYPES:
+        body['session'] = {'new': False, 'sessionId': 'amzn1.echo-api.session.warm',
+                           'application': application, 'user': user,
+                           'attributes': {'warm': True, 'tags': ['warm']}}
+    return json.dumps(body)
+
+def warm_responses():
+    '''
+    Encode a response with speech, a card and an audio directive so the
+    response classes and the JSON encoder are loaded.
+    '''
+    builder = ResponseBuilder()
+    builder.add_speech('Warming up', 'Still warming up')
+    builder.add_standard_card('Warm', 'Warming up', 'https://example.com/small.png')
+    builder.play_audio('https://example.com/warm.mp3', 'warm-token', None,
+                       play_behavior=PlayDirective.REPLACE_ALL)
+    ResponsePackage(builder._response, {'warm': True}).get_json_text()
+
+def freeze_objects():
+    '''
+    Collect the garbage and move all remaining objects into the permanent
+    generation. Returns True if the objects were frozen, False if
+    gc.freeze is not available.
+    '''
+    gc.collect()
+    if not hasattr(gc, 'freeze'):
+        return False
+    gc.freeze()
+    return True
+
+def memory_usage(pid='self'):
+    '''
+    Return a dictionary with the rss, pss, shared and private memory of the
+    process in bytes. Without /proc/<pid>/smaps_rollup only rss is given.
+    '''
+    usage = {'rss': 0, 'pss': None, 'shared': None, 'private': None}
+    try:
+        with open('/proc/{0}/smaps_rollup'.format(pid)) as smaps_file:
+            usage.update(pss=0, shared=0, private=0)
+            for line in smaps_file:
+                parts = line.split()
+                field = _MEMORY_FIELDS.get(parts[0].rstrip(':'))
+                if field is not None:
+                    usage[field] += int(parts[1]) * 1024
+        return usage
+    except (IOError, OSError):
+        pass
+
+    try:
+        with open('/proc/{0}/statm'.format(pid)) as statm_file:
+            usage['rss'] = int(statm_file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (IOError, OSError):
+        import resource
+        # maximum rss of this process in kilobytes on linux
+        usage['rss'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return usage
+
+def format_memory_usage(usages):
+    '''
+    Format a dictionary of names, such as worker pids, to memory usage as
+    text in megabytes.
+    '''
+    def megabytes(value):
+        return '-' if value is None else '{0:.1f}'.format(value / 1048576.0)
+
+    lines = ['{0:<20} {1:>9} {2:>9} {3:>10} {4:>10}'.format('process', 'rss MB', 'pss MB',
+                                                             'shared MB', 'private MB')]
+    for name in sorted(usages, key=str):
+        usage = usages[name]
+        lines.append('{0:<20} {1:>9} {2:>9} {3:>10} {4:>10}'.format(
+            name, megabytes(usage['rss']), megabytes(usage['pss']),
+            megabytes(usage['shared']), megabytes(usage['private'])))
+    return '\n'.join(lines)
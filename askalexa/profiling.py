@@ -0,0 +1,241 @@
+'''
+Alexa Skill Profiling Module
+============================
+
+Profiles a sample of the requests handled by a skill. Profiles are
+aggregated in memory and can be dumped on demand, either as pstats data
+from cProfile or as collapsed stacks for flame graphs from a stack sampler.
+
+Example::
+
+    profiler = SamplingProfiler(rate=0.01, intent_rates={'SlowIntent': 0.5})
+    mySkill.profiler = profiler
+    ...
+    profiler.dump_stats('skill.pstats')
+
+When a skill has no profiler, the only cost is a single check per request.
+Only one request is profiled with cProfile at a time, since python 3.12
+does not allow two profilers at once. A request that is sampled while
+another one is profiled is handled without profiling and counted in
+skipped_count.
+'''
+import sys
+import random
+import pstats
+import cProfile
+import threading
+from collections import defaultdict
+from askalexa.request import standard
+
+CPROFILE = 'cprofile'
+STACK = 'stack'
+
+class SamplingProfiler(object):
+    '''
+    Profiles a fraction of requests. The rate is the fraction of all requests
+    that are profiled. intent_rates can override the rate for intent names.
+    The mode is CPROFILE to profile every function call or STACK to sample
+    the call stack every interval seconds.
+    '''
+
+    def __init__(self, rate=0.0, intent_rates=None, mode=CPROFILE, interval=0.001):
+        if mode not in (CPROFILE, STACK):
+            raise ValueError('Invalid profiler mode: {0}'.format(mode))
+
+        self.rate = rate
+        self.intent_rates = intent_rates or {}
+        self.mode = mode
+        self.interval = interval
+
+        self._lock = threading.Lock()
+        self._profile_lock = threading.Lock()
+        self._random = random.Random()
+        self._stats = None
+        self._stacks = defaultdict(int)
+        self._sampled_threads = set()
+        self._sampler = None
+        self.profiled_count = 0
+        self.skipped_count = 0
+
+    def should_sample(self, event):
+        '''
+        Returns True/False if the request event should be profiled.
+        '''
+        rate = self.rate
+        if self.intent_rates:
+            request = event.request
+            if request.request_type == standard.INTENT_REQUEST_TYPE:
+                rate = self.intent_rates.get(request.intent.name, rate)
+
+        return rate > 0.0 and self._random.random() < rate
+
+    def run(self, func, event):
+        '''
+        Call the function with the event while profiling it.
+        '''
+        session = self.begin()
+        if session is None:
+            return func(event)
+
+        session.resume()
+        try:
+            return func(event)
+        finally:
+            session.pause()
+            session.end()
+
+    def begin(self):
+        '''
+        Start profiling a request that may run in several steps, such as a
+        coroutine. Call resume and pause on the returned session around each
+        step and end when the request is done. Returns None if the request is
+        skipped because another request is being profiled with cProfile.
+        '''
+        if self.mode == CPROFILE:
+            if not self._profile_lock.acquire(False):
+                with self._lock:
+                    self.skipped_count += 1
+                return None
+            return _CProfileSession(self)
+        return _StackSession(self)
+
+    def _add_profile(self, profile):
+        with self._lock:
+            if self._stats is None:
+                self._stats = pstats.Stats(profile)
+            else:
+                self._stats.add(profile)
+            self.profiled_count += 1
+
+    def _add_sampled_thread(self, thread_id):
+        with self._lock:
+            self._sampled_threads.add(thread_id)
+            if self._sampler is None:
+                stop_event = threading.Event()
+                self._sampler = (threading.Thread(target=self._sample_loop, args=(stop_event,),
+                                                  name='SamplingProfiler'), stop_event)
+                self._sampler[0].daemon = True
+                self._sampler[0].start()
+
+    def _remove_sampled_thread(self, thread_id):
+        sampler = None
+        with self._lock:
+            self._sampled_threads.discard(thread_id)
+            if not self._sampled_threads:
+                # stop sampling until the next profiled request
+                sampler, self._sampler = self._sampler, None
+
+        if sampler is not None:
+            # the thread stops on its own, the request does not wait for it
+            sampler[1].set()
+
+    def _sample_loop(self, stop_event):
+        while not stop_event.wait(self.interval):
+            with self._lock:
+                thread_ids = list(self._sampled_threads)
+
+            frames = sys._current_frames()
+            for thread_id in thread_ids:
+                frame = frames.get(thread_id)
+                if frame is None:
+                    continue
+
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append('{0} ({1}:{2})'.format(code.co_name, code.co_filename,
+                                                        code.co_firstlineno))
+                    frame = frame.f_back
+                stack.reverse()
+
+                with self._lock:
+                    self._stacks[';'.join(stack)] += 1
+
+    def get_stats(self):
+        '''
+        Return the aggregated pstats.Stats or None if nothing was profiled
+        with cProfile.
+        '''
+        return self._stats
+
+    def dump_stats(self, path):
+        '''
+        Write the aggregated cProfile stats to the file in pstats format.
+        '''
+        with self._lock:
+            if self._stats is None:
+                raise ValueError('No cProfile stats have been collected')
+            self._stats.dump_stats(path)
+
+    def collapsed_stacks(self):
+        '''
+        Return the sampled stacks in the collapsed stack format used by flame
+        graph tools, one stack and its sample count per line.
+        '''
+        with self._lock:
+            items = sorted(self._stacks.items())
+        return ''.join('{0} {1}\n'.format(stack, count) for stack, count in items)
+
+    def reset(self):
+        '''
+        Discard all collected profiles.
+        '''
+        with self._lock:
+            self._stats = None
+            self._stacks.clear()
+            self.profiled_count = 0
+            self.skipped_count = 0
+
+class _CProfileSession(object):
+    '''
+    Profiles the steps of one request with cProfile. The session holds the
+    profile lock of the profiler until it ends.
+    '''
+
+    def __init__(self, profiler):
+        self._profiler = profiler
+        self._profile = cProfile.Profile()
+        self._failed = False
+
+    def resume(self):
+        if self._failed:
+            return
+
+        try:
+            self._profile.enable()
+        except ValueError:
+            # another tool is already profiling this process
+            self._failed = True
+
+    def pause(self):
+        if not self._failed:
+            self._profile.disable()
+
+    def end(self):
+        profiler = self._profiler
+        profiler._profile_lock.release()
+        if self._failed:
+            with profiler._lock:
+                profiler.skipped_count += 1
+        else:
+            profiler._add_profile(self._profile)
+
+class _StackSession(object):
+    '''
+    Samples the stack of the thread that runs each step of one request.
+    '''
+
+    def __init__(self, profiler):
+        self._profiler = profiler
+        self._thread_id = None
+
+    def resume(self):
+        self._thread_id = threading.current_thread().ident
+        self._profiler._add_sampled_thread(self._thread_id)
+
+    def pause(self):
+        self._profiler._remove_sampled_thread(self._thread_id)
+
+    def end(self):
+        with self._profiler._lock:
+            self._profiler.profiled_count += 1
@@ -0,0 +1,167 @@
+'''
+Alexa Rate Limit Module
+=======================
+
+Token bucket rate limits for each user or device, applied by
+RequestEventHandler before a request is dispatched to its skill.
+
+Example::
+
+    RequestEventHandler.rate_limiter = RateLimiter(
+        default=RateLimit(rate=2.0, burst=10),
+        limits={audio.PLAYBACK_FAILED_REQUEST_TYPE: RateLimit(rate=0.2, burst=3)},
+        key=RateLimiter.DEVICE)
+
+Each request type with its own limit has its own bucket, every other request
+type shares the bucket of the default limit. Request types without a limit
+are not limited if there is no default. Buckets are kept in an LRU cache of
+at most max_keys entries and are refilled lazily when they are used, so an
+evicted bucket is the same as a full one.
+
+A limited request is not dispatched. It gets a canned response instead, a
+short speech for requests with a session and an empty response for the
+AudioPlayer and PlaybackController requests that cannot have speech.
+'''
+import threading
+
+from askalexa.cache import LRUCache
+from askalexa.instrumentation import clock
+from askalexa.request.standard import SESSION_ENDED_REQUEST_TYPE
+from askalexa.response import ResponseBuilder
+
+class RateLimit(object):
+    '''
+    Allows rate requests per second on average with bursts of up to burst
+    requests.
+    '''
+
+    def __init__(self, rate, burst=1):
+        if burst < 1:
+            raise ValueError('burst must be at least 1')
+
+        self.rate = float(rate)
+        self.burst = float(burst)
+
+class RateLimiter(object):
+    '''
+    Limits the requests of each user, device, or user and device with token
+    buckets. response_func is called with the event of a limited request to
+    get its ResponseBuilder, the default gives the canned response.
+    '''
+
+    USER = 'user'
+    DEVICE = 'device'
+    USER_DEVICE = 'user_device'
+
+    MESSAGE = 'Sorry, there are too many requests right now. Please try again later.'
+
+    def __init__(self, default=None, limits=None, key=USER, max_keys=100000,
+                 response_func=None):
+        if key not in (self.USER, self.DEVICE, self.USER_DEVICE):
+            raise ValueError('Unknown rate limit key: {0}'.format(key))
+
+        self.default = default
+        self.limits = limits or {}
+        self.key = key
+        self.response_func = response_func or self.default_response
+
+        self._buckets = LRUCache(max_keys)
+        self._lock = threading.Lock()
+        self._limited_count = 0
+
+    def _get_key(self, event):
+        user_id = device_id = None
+        if self.key != self.DEVICE:
+            user = event.user
+            user_id = user.user_id if user is not None else None
+        if self.key != self.USER:
+            context = event.context
+            device = context.system.device if context is not None else None
+            device_id = device.device_id if device is not None else None
+
+        if self.key == self.USER:
+            return user_id
+        if self.key == self.DEVICE:
+            return device_id
+        if user_id is None and device_id is None:
+            return None
+        return user_id, device_id
+
+    def allow(self, event):
+        '''
+        Take a token for the request event. Returns True if the request is
+        within its limit, or False if it should be limited.
+        '''
+        request_type = event.request.request_type
+        limit = self.limits.get(request_type)
+        if limit is None:
+            limit = self.default
+            request_type = None
+        if limit is None:
+            return True
+
+        key = self._get_key(event)
+        if key is None:
+            return True
+        key = (request_type, key)
+
+        now = clock()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                tokens = limit.burst
+            else:
+                tokens = min(limit.burst, bucket[0] + (now - bucket[1]) * limit.rate)
+
+            allowed = tokens >= 1.0
+            if allowed:
+                tokens -= 1.0
+            else:
+                self._limited_count += 1
+
+            if bucket is None:
+                self._buckets.set(key, [tokens, now])
+            else:
+                bucket[0] = tokens
+                bucket[1] = now
+
+        return allowed
+
+    def get_response(self, event, allow_coroutines=False):
+        '''
+        Get the response for a limited request. The handler dispatches limited
+        requests to the rate limiter in place of the skill, allow_coroutines
+        is accepted like Skill.get_response.
+        '''
+        return self.response_func(event)
+
+    def default_response(self, event):
+        '''
+        The canned response for a limited request.
+        '''
+        response = ResponseBuilder()
+        if event.session is not None and \
+                event.request.request_type != SESSION_ENDED_REQUEST_TYPE:
+            response.add_speech(self.MESSAGE)
+        return response
+
+    @property
+    def limited_count(self):
+        '''
+        The total number of requests that were limited.
+        '''
+        return self._limited_count
+
+    @property
+    def key_count(self):
+        '''
+        The number of buckets that are kept.
+        '''
+        return len(self._buckets)
+
+    def clear(self):
+        '''
+        Forget every bucket, which fills them all.
+        '''
+        with self._lock:
+            self._buckets.clear()
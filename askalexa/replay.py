@@ -0,0 +1,337 @@
+'''
+Alexa Traffic Replay Module
+===========================
+
+Replays a corpus of Alexa request bodies through RequestEventHandler to
+measure throughput and latency. The corpus is a JSON lines file where each
+line is either a request body or a capture exported by the capture module.
+Lines that are not Alexa requests are skipped.
+
+Usage::
+
+    python -m askalexa.replay corpus.jsonl --processes 4 --duration 30
+    python -m askalexa.replay corpus.jsonl --rate 200 --module myskills
+    python -m askalexa.replay corpus.jsonl --validate
+
+Skills are registered by importing the modules given with --module. Without
+a module, a skill that answers every request with a short speech is
+registered for each application ID in the corpus, which measures the
+overhead of the framework itself.
+
+With --validate, every request is signed with a locally generated test
+certificate and checked with is_request_valid before it is handled.
+'''
+import sys
+import json
+import math
+import time
+import base64
+import argparse
+import importlib
+import multiprocessing
+from datetime import datetime
+from collections import defaultdict
+
+from askalexa.compat import string_types
+from askalexa.skill import Skill
+from askalexa.handler import RequestEventHandler
+from askalexa.instrumentation import clock
+from askalexa.dispatcher import RequestDispatcher
+from askalexa.response import ResponseBuilder
+
+#: certificate url used for the locally generated test certificate
+TEST_CERTIFICATE_URL = 'https://s3.amazonaws.com/echo.api/askalexa-replay.pem'
+
+PERCENTILES = (('p50', 0.5), ('p95', 0.95), ('p99', 0.99), ('p999', 0.999))
+
+def load_corpus(path):
+    '''
+    Load the request bodies from a JSON lines file. Returns a tuple of the
+    list of request JSON objects and the number of skipped lines.
+    '''
+    requests = []
+    skipped = 0
+    with open(path) as corpus_file:
+        for line in corpus_file:
+            line = line.strip()
+            if not line:
+                continue
+
+            try:
+                data = json.loads(line)
+            except ValueError:
+                skipped += 1
+                continue
+
+            if isinstance(data, dict) and isinstance(data.get('request'), string_types):
+                # an exported capture, the request is the raw body
+                try:
+                    data = json.loads(data['request'])
+                except ValueError:
+                    skipped += 1
+                    continue
+
+            if not isinstance(data, dict) or not isinstance(data.get('request'), dict) \
+                    or 'type' not in data['request']:
+                skipped += 1
+                continue
+
+            requests.append(data)
+
+    return requests, skipped
+
+def request_key(request_json):
+    '''
+    Return the (request type, intent name) used to group the results.
+    '''
+    request = request_json['request']
+    intent = request.get('intent') or {}
+    return request['type'], intent.get('name')
+
+def application_id(request_json):
+    session = request_json.get('session') or {}
+    application = session.get('application')
+    if application is None:
+        system = (request_json.get('context') or {}).get('System') or {}
+        application = system.get('application')
+    return (application or {}).get('applicationId')
+
+def register_echo_skills(corpus):
+    '''
+    Register a skill that answers every request for each application ID
+    in the corpus that does not already have a skill.
+    '''
+    registered = set(skill.application_id for skill in RequestDispatcher.list_skills())
+    for request_json in corpus:
+        app_id = application_id(request_json)
+        if app_id is None or app_id in registered:
+            continue
+
+        skill = Skill(app_id)
+        skill.on_failsafe(_echo_response)
+        registered.add(app_id)
+
+def _echo_response(event):
+    return ResponseBuilder().add_speech('OK')
+
+class TestSigner(object):
+    '''
+    Signs request bodies with a locally generated certificate that is
+    installed as a trusted certificate for TEST_CERTIFICATE_URL.
+    '''
+
+    def __init__(self):
+        from OpenSSL import crypto
+        from askalexa.request import validation
+
+        self._crypto = crypto
+        self._key = crypto.PKey()
+        self._key.generate_key(crypto.TYPE_RSA, 2048)
+
+        certificate = crypto.X509()
+        certificate.get_subject().CN = validation.CertificateValidator.SAN
+        certificate.set_serial_number(1)
+        certificate.gmtime_adj_notBefore(0)
+        certificate.gmtime_adj_notAfter(24 * 60 * 60)
+        certificate.set_issuer(certificate.get_subject())
+        certificate.set_pubkey(self._key)
+        certificate.sign(self._key, 'sha256')
+
+        validation.install_certificate(TEST_CERTIFICATE_URL, certificate)
+
+    def sign(self, request_body):
+        return base64.b64encode(self._crypto.sign(self._key, request_body, 'sha1'))
+
+def _prepare_bodies(corpus, signer):
+    '''
+    Encode the corpus into request bodies. When signing, the timestamps are
+    set to now so they pass the timestamp validation.
+    '''
+    bodies = []
+    timestamp = datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ')
+    for request_json in corpus:
+        if signer is not None:
+            request_json['request']['timestamp'] = timestamp
+
+        body = json.dumps(request_json)
+        signature = signer.sign(body) if signer is not None else None
+        bodies.append((request_key(request_json), body, signature))
+    return bodies
+
+def run_worker(corpus, rate, duration, iterations, validate, modules):
+    '''
+    Replay the corpus in the current process. Returns a dictionary with the
+    latencies for each request key, the error counts and the elapsed time.
+    '''
+    for module in modules:
+        importlib.import_module(module)
+    if not modules:
+        register_echo_skills(corpus)
+
+    signer = TestSigner() if validate else None
+    bodies = _prepare_bodies(corpus, signer)
+    prepared = clock()
+
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    interval = 1.0 / rate if rate else 0.0
+
+    start = clock()
+    next_time = start
+    count = 0
+    passes = 0
+    while True:
+        if iterations and passes >= iterations:
+            break
+        if duration and clock() - start >= duration:
+            break
+
+        if signer is not None and clock() - prepared > 60:
+            # keep the signed timestamps inside the validation tolerance
+            bodies = _prepare_bodies(corpus, signer)
+            prepared = clock()
+
+        for key, body, signature in bodies:
+            if interval:
+                now = clock()
+                if next_time > now:
+                    time.sleep(next_time - now)
+                next_time += interval
+
+            request_start = clock()
+            try:
+                handler = RequestEventHandler(body)
+                if signature is not None and \
+                        not handler.is_request_valid(TEST_CERTIFICATE_URL, signature):
+                    errors['InvalidRequest'] += 1
+                else:
+                    handler.get_response()
+            except Exception as e:
+                errors[type(e).__name__] += 1
+            latencies[key].append(clock() - request_start)
+            count += 1
+
+            if duration and clock() - start >= duration:
+                break
+        passes += 1
+
+    return {'latencies': dict(latencies), 'errors': dict(errors),
+            'elapsed': clock() - start, 'count': count}
+
+def _worker_main(args):
+    return run_worker(*args)
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = max(0, int(math.ceil(fraction * len(sorted_values))) - 1)
+    return sorted_values[index]
+
+def merge_results(results):
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    for result in results:
+        for key, values in result['latencies'].items():
+            latencies[key].extend(values)
+        for name, count in result['errors'].items():
+            errors[name] += count
+
+    elapsed = max(result['elapsed'] for result in results) if results else 0.0
+    count = sum(result['count'] for result in results)
+    return latencies, errors, elapsed, count
+
+def summarize(results):
+    '''
+    Summarize the worker results into a report dictionary.
+    '''
+    latencies, errors, elapsed, count = merge_results(results)
+
+    groups = []
+    for key in sorted(latencies, key=lambda k: (k[0], k[1] or '')):
+        values = sorted(latencies[key])
+        group = {'request_type': key[0], 'intent': key[1], 'count': len(values)}
+        for name, fraction in PERCENTILES:
+            group[name] = percentile(values, fraction)
+        groups.append(group)
+
+    return {'count': count, 'elapsed': elapsed,
+            'throughput': count / elapsed if elapsed else 0.0,
+            'errors': dict(errors), 'groups': groups}
+
+def format_report(report):
+    lines = ['requests: {0}  elapsed: {1:.2f}s  throughput: {2:.1f} req/s'.format(
+                report['count'], report['elapsed'], report['throughput'])]
+    if report['errors']:
+        lines.append('errors: ' + ', '.join('{0}={1}'.format(name, count)
+                                           for name, count in sorted(report['errors'].items())))
+
+    lines.append('{0:<50} {1:>8} {2:>9} {3:>9} {4:>9} {5:>9}'.format(
+        'request type / intent', 'count', 'p50 ms', 'p95 ms', 'p99 ms', 'p999 ms'))
+    for group in report['groups']:
+        name = group['request_type']
+        if group['intent']:
+            name += ' / ' + group['intent']
+        lines.append('{0:<50} {1:>8} {2:>9.3f} {3:>9.3f} {4:>9.3f} {5:>9.3f}'.format(
+            name, group['count'], group['p50'] * 1e3, group['p95'] * 1e3,
+            group['p99'] * 1e3, group['p999'] * 1e3))
+    return '\n'.join(lines)
+
+def replay(corpus, processes=1, rate=0.0, duration=0.0, iterations=1, validate=False,
+           modules=()):
+    '''
+    Replay the corpus across the given number of processes and return the
+    report. The rate is the total target requests per second, 0 replays as
+    fast as possible.
+    '''
+    worker_rate = rate / processes if rate else 0.0
+    args = (corpus, worker_rate, duration, iterations, validate, list(modules))
+
+    if processes == 1:
+        results = [run_worker(*args)]
+    else:
+        pool = multiprocessing.Pool(processes)
+        try:
+            results = pool.map(_worker_main, [args] * processes)
+        finally:
+            pool.close()
+            pool.join()
+
+    return summarize(results)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m askalexa.replay',
+                                     description='Replay Alexa requests and report latency.')
+    parser.add_argument('corpus', help='JSON lines file of request bodies')
+    parser.add_argument('--processes', type=int, default=1, help='number of worker processes')
+    parser.add_argument('--rate', type=float, default=0.0,
+                        help='total target requests per second, 0 for maximum throughput')
+    parser.add_argument('--duration', type=float, default=0.0,
+                        help='seconds to run, replaces --iterations')
+    parser.add_argument('--iterations', type=int, default=1,
+                        help='number of passes over the corpus for each process')
+    parser.add_argument('--validate', action='store_true',
+                        help='sign requests with a local test certificate and validate them')
+    parser.add_argument('--module', action='append', default=[],
+                        help='module to import that registers the skills')
+    parser.add_argument('--json', help='write the report as JSON to this file')
+    args = parser.parse_args(argv)
+
+    corpus, skipped = load_corpus(args.corpus)
+    if skipped:
+        sys.stderr.write('skipped {0} lines that are not Alexa requests\n'.format(skipped))
+    if not corpus:
+        sys.stderr.write('no requests found in {0}\n'.format(args.corpus))
+        return 1
+
+    report = replay(corpus, processes=args.processes, rate=args.rate, duration=args.duration,
+                    iterations=0 if args.duration else args.iterations,
+                    validate=args.validate, modules=args.module)
+    print(format_report(report))
+
+    if args.json:
+        with open(args.json, 'w') as report_file:
+            json.dump(report, report_file, indent=2)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
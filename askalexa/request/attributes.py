@@ -0,0 +1,380 @@
+'''
+Session Attributes Module
+=========================
+
+Session attributes are sent by Alexa on every request and must be sent back
+with every response. Skills often leave most of them untouched, so the
+attributes are wrapped in a mapping that tracks changes and remembers the
+original JSON text of each top level value. When the response is encoded,
+unchanged values reuse that text instead of being serialized again.
+
+Large attributes can optionally be packed into a compressed envelope by
+setting an AttributesCodec on the Session class::
+
+    Session.attributes_codec = AttributesCodec(threshold=2048)
+
+The envelope is unpacked when the codec is set. If the attributes are not
+changed, the envelope is sent back as it was received.
+'''
+import re
+import json
+import zlib
+import base64
+from askalexa.compat import PY2, string_types, text_type
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_ATTRIBUTES_KEY = re.compile(r'"attributes"[ \t\n\r]*:[ \t\n\r]*')
+
+#: placeholder that replaces the attributes text while decoding the request
+_PLACEHOLDER = '0'
+
+class AttributesCodec(object):
+    '''
+    Packs the JSON text of session attributes into a compressed and base64
+    encoded envelope stored under a single key. Attributes are only packed
+    when their JSON text is larger than the threshold.
+    '''
+
+    ENVELOPE_KEY = '_askalexa_z'
+
+    def __init__(self, threshold=1024, level=6, key=ENVELOPE_KEY):
+        self.threshold = threshold
+        self.level = level
+        self.key = key
+
+    def is_envelope(self, data):
+        '''
+        Returns True/False if the decoded attribute data is a packed envelope.
+        '''
+        if len(data) != 1:
+            return False
+
+        try:
+            value = data[self.key]
+        except KeyError:
+            return False
+
+        return isinstance(value, string_types)
+
+    def pack(self, json_text):
+        '''
+        Pack the attributes JSON text into an envelope. The text is returned
+        unchanged if it is under the threshold or does not get smaller.
+        '''
+        if len(json_text) <= self.threshold:
+            return json_text
+
+        data = json_text
+        if isinstance(data, text_type):
+            data = data.encode('utf-8')
+
+        packed = base64.b64encode(zlib.compress(data, self.level)).decode('ascii')
+        envelope = '{"' + self.key + '": "' + packed + '"}'
+        if len(envelope) >= len(data):
+            return json_text
+        return envelope
+
+    def unpack(self, packed):
+        '''
+        Unpack the envelope value back to the attributes JSON text.
+        '''
+        return zlib.decompress(base64.b64decode(packed)).decode('utf-8')
+
+class SessionAttributes(dict):
+    '''
+    A dictionary holding the session attributes. Setting or deleting a key
+    marks it as changed. Reading a dictionary or list value, including
+    through items, values or copy, also marks the key as changed since it
+    may be modified in place.
+
+    If a codec is set and the attributes were received as an envelope, they
+    are unpacked when it is set.
+
+    On python 2 dict(attributes) copies the attributes without marking the
+    dictionary and list values as changed, use copy() instead if they are
+    changed through the copy.
+    '''
+
+    def __init__(self, data=None, json_text=None, value_texts=None):
+        '''
+        Initialize with the decoded attribute data. If json_text is given, it
+        is the original JSON text of the attributes and value_texts maps
+        each key to the original JSON text of its value.
+        '''
+        dict.__init__(self, data or {})
+        self._json_text = json_text
+        self._value_texts = value_texts if value_texts is not None else {}
+        self._modified = False
+        self._codec = None
+        self._packed = False
+
+        # True when the original text has already been through the codec
+        self._json_text_packed = False
+
+    @classmethod
+    def create_from_text(cls, text, start=0):
+        '''
+        Decode the JSON object that begins at the start index of the text.
+        Returns a tuple of the attributes and the index where the object ends.
+        '''
+        data = {}
+        value_texts = {}
+
+        idx = _WHITESPACE.match(text, start).end()
+        if text[idx:idx + 1] != '{':
+            raise ValueError('Session attributes are not a JSON object')
+
+        idx = _WHITESPACE.match(text, idx + 1).end()
+        if text[idx:idx + 1] == '}':
+            idx += 1
+        else:
+            while True:
+                if text[idx:idx + 1] != '"':
+                    raise ValueError('Expected a key at index {0}'.format(idx))
+
+                key, idx = _DECODER.raw_decode(text, idx)
+                idx = _WHITESPACE.match(text, idx).end()
+                if text[idx:idx + 1] != ':':
+                    raise ValueError('Expected ":" at index {0}'.format(idx))
+
+                value_start = _WHITESPACE.match(text, idx + 1).end()
+                data[key], idx = _DECODER.raw_decode(text, value_start)
+                value_texts[key] = text[value_start:idx]
+
+                idx = _WHITESPACE.match(text, idx).end()
+                delimiter = text[idx:idx + 1]
+                idx = _WHITESPACE.match(text, idx + 1).end()
+                if delimiter == '}':
+                    break
+                elif delimiter != ',':
+                    raise ValueError('Expected "," or "}}" at index {0}'.format(idx))
+
+        json_text = text[start:idx].strip()
+        return cls(data=data, json_text=json_text, value_texts=value_texts), idx
+
+    def __getitem__(self, key):
+        value = dict.__getitem__(self, key)
+        if isinstance(value, (dict, list)):
+            # the value could be changed in place so we can not trust the
+            # original text any more
+            self._touch(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self._touch(key)
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key):
+        dict.__delitem__(self, key)
+        self._touch(key)
+
+    def __iter__(self):
+        # overriding iteration makes dict(attributes) copy them with
+        # __getitem__ on python 3, so the copied values are marked changed
+        return dict.__iter__(self)
+
+    def __repr__(self):
+        return '{0}({1!r})'.format(self.__class__.__name__, dict(dict.items(self)))
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+    def peek(self, key, default=None):
+        '''
+        Return the value without marking the attributes as modified. The
+        value must not be changed in place.
+        '''
+        return dict.get(self, key, default)
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, key, *default):
+        if key in self:
+            self._touch(key)
+        return dict.pop(self, key, *default)
+
+    def popitem(self):
+        key, value = dict.popitem(self)
+        self._touch(key)
+        return key, value
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def clear(self):
+        if dict.__len__(self):
+            self._modified = True
+        self._value_texts.clear()
+        dict.clear(self)
+
+    def items(self):
+        self._touch_containers()
+        return dict.items(self)
+
+    def values(self):
+        self._touch_containers()
+        return dict.values(self)
+
+    def copy(self):
+        '''
+        Return a plain dictionary with the attributes.
+        '''
+        self._touch_containers()
+        return dict(dict.items(self))
+
+    if PY2:
+        def iteritems(self):
+            return iter(self.items())
+
+        def itervalues(self):
+            return iter(self.values())
+
+    def __reduce__(self):
+        return (self.__class__, (dict(dict.items(self)),))
+
+    def _touch(self, key):
+        self._modified = True
+        self._value_texts.pop(key, None)
+
+    def _touch_containers(self):
+        for key, value in dict.items(self):
+            if isinstance(value, (dict, list)):
+                self._touch(key)
+
+    @property
+    def codec(self):
+        '''
+        The AttributesCodec used to pack and unpack the attributes, or None
+        if the attributes are never packed.
+        '''
+        return self._codec
+
+    @codec.setter
+    def codec(self, codec):
+        self._codec = codec
+        if codec is not None and not self._modified and codec.is_envelope(self):
+            unpacked = self.create_from_text(codec.unpack(dict.__getitem__(self, codec.key)))[0]
+            dict.clear(self)
+            dict.update(self, dict.items(unpacked))
+            self._value_texts = unpacked._value_texts
+            self._json_text_packed = True
+            self._packed = True
+
+    @property
+    def is_packed(self):
+        '''
+        True if the attributes were received as an envelope.
+        '''
+        return self._packed
+
+    @property
+    def is_modified(self):
+        '''
+        True if any attribute was set, deleted, or possibly changed in place.
+        '''
+        return self._modified
+
+    def snapshot(self):
+        '''
+        Encode the attributes and make the result the new baseline for change
+        tracking. Returns the encoded JSON text.
+        '''
+        json_text = self.get_json_text()
+        self._json_text = json_text
+        self._json_text_packed = True
+        self._modified = False
+        return json_text
+
+    @property
+    def original_size(self):
+        '''
+        The size of the original JSON text of the attributes. This is 0 if the
+        attributes did not come from JSON text.
+        '''
+        if self._json_text is None:
+            return 0
+        return len(self._json_text)
+
+    def get_json_text(self):
+        '''
+        Encode the attributes as JSON text. The original text is returned if
+        nothing was changed, otherwise only the changed values are encoded.
+        The text is packed into an envelope if a codec is set.
+        '''
+        if self._json_text is not None and not self._modified:
+            if self._codec is None or self._json_text_packed:
+                return self._json_text
+            return self._codec.pack(self._json_text)
+
+        if not self._value_texts:
+            json_text = json.dumps(dict(dict.items(self)))
+        else:
+            members = []
+            for key, value in dict.items(self):
+                value_text = self._value_texts.get(key)
+                if value_text is None:
+                    value_text = json.dumps(value)
+                members.append(json.dumps(key) + ': ' + value_text)
+
+            json_text = '{' + ', '.join(members) + '}'
+
+        if self._codec is not None:
+            json_text = self._codec.pack(json_text)
+        return json_text
+
+def encode_attributes(attributes, codec=None):
+    '''
+    Encode session attributes as JSON text. Attributes can be a
+    SessionAttributes instance or a plain dictionary. Plain dictionaries are
+    packed with the given codec, SessionAttributes use their own codec.
+    '''
+    if isinstance(attributes, SessionAttributes):
+        return attributes.get_json_text()
+
+    json_text = json.dumps(attributes)
+    if codec is not None:
+        json_text = codec.pack(json_text)
+    return json_text
+
+def load_request_json(request_data):
+    '''
+    Decode the raw request text. If the request has session attributes they
+    are decoded into a SessionAttributes instance that remembers the original
+    text so it can be reused when encoding the response.
+    '''
+    if not isinstance(request_data, string_types):
+        request_data = request_data.decode('utf-8')
+
+    match = _ATTRIBUTES_KEY.search(request_data)
+    if match is None or request_data[match.start() - 1:match.start()] == '\\':
+        return json.loads(request_data)
+
+    try:
+        attributes, end = SessionAttributes.create_from_text(request_data, match.end())
+    except ValueError:
+        return json.loads(request_data)
+
+    try:
+        request_json = json.loads(request_data[:match.end()] + _PLACEHOLDER + request_data[end:])
+    except ValueError:
+        return json.loads(request_data)
+
+    # make sure the attributes that were found belong to the session and
+    # not to some other object in the request
+    session_json = request_json.get('session')
+    if not isinstance(session_json, dict):
+        return json.loads(request_data)
+
+    placeholder = session_json.get('attributes')
+    if type(placeholder) is not int or placeholder != 0:
+        return json.loads(request_data)
+
+    session_json['attributes'] = attributes
+    return request_json
@@ -38,6 +38,13 @@ class BaseAudioPlayerRequest(BaseRequest):
         '''
         return self._token
 
+    def decode_token(self, codec):
+        '''
+        Decode the token with the given StreamTokenCodec and return the
+        StreamState packed into it.
+        '''
+        return codec.decode(self._token)
+
 class NormalAudioPlayerRequest(BaseAudioPlayerRequest):
     '''
     Base class for normal audio player requests
@@ -10,17 +10,16 @@ and set the request_type class variable to the respective Alexa request
 type found in the JSON request data.
 '''
 
+from askalexa.compat import with_metaclass
 from askalexa.request.register import RequestRegister
 
-class BaseRequest(object):
+class BaseRequest(with_metaclass(RequestRegister)):
     '''
     Base class for all requests. You must inherit from this class and set the
     request_type class variable for each concrete request type. If needed, you
     should implement your own "create_from_json" class method to build your
     request instance.
     '''
-    __metaclass__ = RequestRegister
-
     request_type = None
 
     def __init__(self, request_id, locale, timestamp, **kwargs):
@@ -2,6 +2,9 @@ from askalexa.request.register import RequestRegister
 from askalexa.request.session import Session
 from askalexa.request.context import Context
 
+# import the request modules so all request types are registered
+from askalexa.request import standard, audio, playback
+
 class AlexaEvent(object):
     '''
     This is an request event that received from Alexa containing information
@@ -13,6 +16,7 @@ class AlexaEvent(object):
         self._context = context
         self._version = version
         self._session = session
+        self._user_attributes = None
 
     @classmethod
     def create_from_json(cls, request_json):
@@ -57,6 +61,32 @@ class AlexaEvent(object):
         '''
         return self._session
 
+    @property
+    def user(self):
+        '''
+        The user making the request. This comes from the session if there is
+        one, otherwise from the context system.
+        '''
+        if self._session is not None:
+            return self._session.user
+
+        if self._context is not None:
+            return self._context.system.user
+
+        return None
+
+    @property
+    def user_attributes(self):
+        '''
+        The persistent user attributes the skill loaded for this event, or
+        None if they were not loaded.
+        '''
+        return self._user_attributes
+
+    @user_attributes.setter
+    def user_attributes(self, user_attributes):
+        self._user_attributes = user_attributes
+
     @property
     def version(self):
         '''
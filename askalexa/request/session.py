@@ -6,16 +6,26 @@ include a session instance.
 
 from askalexa.request.application import Application
 from askalexa.request.user import User
+from askalexa.request.attributes import SessionAttributes
 
 class Session(object):
     '''
     The session object provides additional context associated with the request.
     '''
+
+    #: codec used to unpack session attributes, set to an AttributesCodec
+    #: instance to enable compressed attributes
+    attributes_codec = None
     
     def __init__(self, is_new, session_id, application, attributes, user):
         self._is_new = is_new
         self._session_id = session_id
         self._application = application
+
+        if not isinstance(attributes, SessionAttributes):
+            attributes = SessionAttributes(attributes)
+        if self.attributes_codec is not None:
+            attributes.codec = self.attributes_codec
         self._attributes = attributes
         self._user = user
 
@@ -71,6 +81,7 @@ class Session(object):
         '''
         This is a dictionary containing key value pairs of user defined data
         that can persist across the same session. This is an empty dictionary
-        when this is a new session.
+        when this is a new session. Changes to the attributes are tracked so
+        unchanged attributes are not serialized again in the response.
         '''
         return self._attributes
@@ -109,6 +109,7 @@ class Slot(object):
         self._name = name
         self._value = value
         self._confirmation_status = confirmation_status
+        self._resolution = None
 
     @classmethod
     def create_from_json(cls, slot_json):
@@ -139,3 +140,26 @@ class Slot(object):
         or denied the value of this slot.
         '''
         return self._confirmation_status
+
+    @property
+    def resolution(self):
+        '''
+        The SlotResolution of the value if the skill has a SlotResolver and
+        the value was resolved, otherwise None.
+        '''
+        return self._resolution
+
+    @resolution.setter
+    def resolution(self, resolution):
+        self._resolution = resolution
+
+    @property
+    def canonical_id(self):
+        '''
+        The ID of the slot type value that the value was resolved to, or its
+        canonical value if the model did not give an ID. None if the value
+        was not resolved.
+        '''
+        if self._resolution is None:
+            return None
+        return self._resolution.value_id
@@ -1,9 +1,14 @@
+'''
+Alexa Request Validation Module
+===============================
+
+requests and OpenSSL are imported when a certificate is first validated so
+they do not add to the start up time of processes that never validate.
+'''
 import os
-import urlparse
-import requests
 import base64
-from OpenSSL import crypto
 from datetime import datetime, timedelta
+from askalexa.compat import urlparse
 
 _CACHED_VALIDATOR = {}
 
@@ -19,10 +24,9 @@ def is_timestamp_valid(timestamp, timestamp_tolerance=150):
     tolerance = timedelta(seconds=timestamp_tolerance)
     return abs(current_time - request_time) < tolerance
 
-def is_request_certified(certificate_url, request_body, signature):
+def get_validator(certificate_url):
     '''
-    Certifies that the request matches the signature and the certificate is valid.
-    :returns: bool
+    Return the cached CertificateValidator for the certificate url.
     '''
     try:
         validator = _CACHED_VALIDATOR[certificate_url]
@@ -30,7 +34,27 @@ def is_request_certified(certificate_url, request_body, signature):
         validator = CertificateValidator(certificate_url)
         _CACHED_VALIDATOR[certificate_url] = validator
 
-    return validator.is_valid(request_body, signature)
+    return validator
+
+def install_certificate(certificate_url, certificate):
+    '''
+    Install an already trusted certificate for the certificate url so it is
+    used without being downloaded or checked. This is meant for testing
+    and load generation with a locally generated certificate.
+    '''
+    validator = CertificateValidator(certificate_url)
+    validator.certificate = certificate
+    validator._certificate_checked = True
+    validator._certificate_valid = True
+    _CACHED_VALIDATOR[certificate_url] = validator
+    return validator
+
+def is_request_certified(certificate_url, request_body, signature):
+    '''
+    Certifies that the request matches the signature and the certificate is valid.
+    :returns: bool
+    '''
+    return get_validator(certificate_url).is_valid(request_body, signature)
 
 class CertificateValidator(object):
     '''
@@ -65,7 +89,7 @@ class CertificateValidator(object):
         '''
         self._certificate_valid = False
 
-        url_parts = urlparse.urlparse(self.certificate_url)
+        url_parts = urlparse(self.certificate_url)
 
         if url_parts.scheme != self.SCHEME:
             return
@@ -80,6 +104,9 @@ class CertificateValidator(object):
         if url_parts.port is not None and url_parts.port != self.PORT:
             return
 
+        import requests
+        from OpenSSL import crypto
+
         # get the certificate data from amazon and create a certificate object
         certificate_data = requests.get(self.certificate_url)
         amzn_certificate = crypto.load_certificate(crypto.FILETYPE_PEM, str(certificate_data.text))
@@ -99,6 +126,8 @@ class CertificateValidator(object):
         if not self.has_valid_certificate or not self.certificate:
             return False
 
+        from OpenSSL import crypto
+
         # verify that the signature matches the hash of the request body
         decoded_signature = base64.b64decode(signature)
         try:
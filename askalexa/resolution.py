@@ -0,0 +1,211 @@
+'''
+Alexa Slot Resolution Module
+============================
+
+Resolves slot values to the values of their custom slot types, using the
+values and synonyms of the interaction models of the skill.
+
+Example::
+
+    resolver = SlotResolver([InteractionModel.load('models/en-US.json', 'en-US'),
+                             InteractionModel.load('models/de-DE.json', 'de-DE')])
+    mySkill = askalexa.Skill('my-app-id', slot_resolver=resolver)
+
+    @mySkill.on_intent('PlayStationIntent')
+    def play_station(event):
+        station_id = event.request.intent.slots['Station'].canonical_id
+        ...
+
+The index of each slot type is built once per locale. Values and synonyms
+are normalized to lower case words without punctuation or accents and kept
+in a dictionary, so most slot values are resolved with a single lookup.
+Values that are not in the dictionary are matched with an index of the
+character trigrams of every value and synonym, and resolve to the value
+that shares the most trigrams with them if it is similar enough.
+'''
+import re
+import unicodedata
+
+from askalexa.cache import LRUCache
+from askalexa.compat import text_type
+from askalexa.request import standard
+
+_WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+def normalize(text):
+    '''
+    Normalize the text to lower case words separated by single spaces,
+    without punctuation or accents.
+    '''
+    text = unicodedata.normalize('NFKD', text_type(text).lower())
+    text = u''.join(c for c in text if not unicodedata.combining(c))
+    return u' '.join(_WORD_RE.findall(text))
+
+def get_trigrams(text):
+    '''
+    Get the set of character trigrams of normalized text. The text is padded
+    with spaces so the first and last characters are part of two trigrams.
+    '''
+    padded = u' {0} '.format(text)
+    return set(padded[i:i + 3] for i in range(len(padded) - 2))
+
+class SlotResolution(object):
+    '''
+    The slot type value that a slot value was resolved to.
+    '''
+
+    def __init__(self, slot_type_value, score=1.0):
+        self._slot_type_value = slot_type_value
+        self._score = score
+
+    @property
+    def slot_type_value(self):
+        '''
+        The SlotTypeValue from the interaction model.
+        '''
+        return self._slot_type_value
+
+    @property
+    def value(self):
+        '''
+        The canonical value.
+        '''
+        return self._slot_type_value.value
+
+    @property
+    def value_id(self):
+        '''
+        The ID of the value, or the canonical value if the model did not give
+        an ID.
+        '''
+        value_id = self._slot_type_value.value_id
+        return value_id if value_id is not None else self._slot_type_value.value
+
+    @property
+    def score(self):
+        '''
+        How similar the slot value is to the value or one of its synonyms,
+        from 0 to 1. Exact matches have a score of 1.
+        '''
+        return self._score
+
+    @property
+    def is_exact(self):
+        return self._score == 1.0
+
+class SlotTypeIndex(object):
+    '''
+    The index of the values and synonyms of one slot type. Slot values that
+    are not an exact match are resolved if their trigram similarity is at
+    least min_score. The results of the last cache_size of those lookups are
+    cached.
+    '''
+
+    def __init__(self, slot_type_values, min_score=0.5, cache_size=1000):
+        self.min_score = min_score
+
+        self._exact = {}
+        self._entries = []
+        self._trigrams = {}
+        self._fuzzy_cache = LRUCache(cache_size)
+
+        for slot_type_value in slot_type_values:
+            for text in [slot_type_value.value] + list(slot_type_value.synonyms):
+                key = normalize(text)
+                if not key or key in self._exact:
+                    continue
+
+                self._exact[key] = SlotResolution(slot_type_value)
+                trigrams = get_trigrams(key)
+                for trigram in trigrams:
+                    self._trigrams.setdefault(trigram, []).append(len(self._entries))
+                self._entries.append((slot_type_value, len(trigrams)))
+
+    def __len__(self):
+        return len(self._exact)
+
+    def lookup(self, text):
+        '''
+        Resolve the text to a SlotResolution, or None if no value is similar
+        enough.
+        '''
+        key = normalize(text)
+        resolution = self._exact.get(key)
+        if resolution is not None or not key:
+            return resolution
+
+        resolution = self._fuzzy_cache.get(key, False)
+        if resolution is False:
+            resolution = self._lookup_trigrams(key)
+            self._fuzzy_cache.set(key, resolution)
+        return resolution
+
+    def _lookup_trigrams(self, key):
+        trigrams = get_trigrams(key)
+        counts = {}
+        for trigram in trigrams:
+            for entry in self._trigrams.get(trigram, ()):
+                counts[entry] = counts.get(entry, 0) + 1
+
+        best_score = 0.0
+        best_entry = None
+        for entry, count in counts.items():
+            # the dice coefficient of the two sets of trigrams
+            score = 2.0 * count / (len(trigrams) + self._entries[entry][1])
+            if score > best_score or (score == best_score and entry < best_entry):
+                best_score = score
+                best_entry = entry
+
+        if best_entry is None or best_score < self.min_score:
+            return None
+        # only an exact match has a score of 1
+        return SlotResolution(self._entries[best_entry][0], min(best_score, 0.99))
+
+class SlotResolver(object):
+    '''
+    Resolves the slots of intent requests with the indexes of the custom
+    slot types of one interaction model per locale. The options are given to
+    each SlotTypeIndex.
+    '''
+
+    def __init__(self, models, **options):
+        self._intents = {}
+        self._indexes = {}
+        for model in models:
+            self._intents[model.locale] = model.intents
+            self._indexes[model.locale] = dict(
+                (name, SlotTypeIndex(values, **options))
+                for name, values in model.slot_types.items())
+
+    @property
+    def locales(self):
+        return sorted(self._indexes)
+
+    def get_index(self, locale, slot_type):
+        '''
+        Get the SlotTypeIndex of the custom slot type for the locale, or None.
+        '''
+        return self._indexes.get(locale, {}).get(slot_type)
+
+    def resolve(self, event):
+        '''
+        Resolve the slots of the intent of an intent request event. The
+        resolutions are set on the slots, slots without a value or of a type
+        that is not in the model are not resolved.
+        '''
+        request = event.request
+        if request.request_type != standard.INTENT_REQUEST_TYPE:
+            return
+
+        intent = request.intent
+        slot_types = self._intents.get(request.locale, {}).get(intent.name)
+        if not slot_types:
+            return
+
+        for name, slot in intent.slots.items():
+            if slot.value is None:
+                continue
+
+            index = self.get_index(request.locale, slot_types.get(name))
+            if index is not None:
+                slot.resolution = index.lookup(slot.value)
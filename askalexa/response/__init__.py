@@ -7,5 +7,9 @@ This module contains the main Alexa response objects that the skill can use to
 build a valid response to a request.
 '''
 
-from askalexa.response.builder import ResponseBuilder
-from askalexa.response.progressive import ProgressiveResponseBuilder
\ No newline at end of file
+from askalexa.lazy import make_lazy
+
+make_lazy(__name__, {
+    'ResponseBuilder': 'askalexa.response.builder',
+    'ProgressiveResponseBuilder': 'askalexa.response.progressive',
+})
\ No newline at end of file
@@ -1,5 +1,11 @@
+import hmac
+import base64
+import struct
+import hashlib
+from collections import namedtuple
+from askalexa.compat import text_type
 from askalexa.response.data import JsonResponseData, response_property
-from askalexa.exceptions import InvalidResponseError, ResponseSizeError
+from askalexa.exceptions import InvalidResponseError, ResponseSizeError, InvalidTokenError
 
 class AudioDirective(object):
     '''
@@ -250,3 +256,96 @@ class Stream(JsonResponseData):
             if token_size > self.TOKEN_LIMIT:
                 raise ResponseSizeError('Expected previous token limit exceeded {0} ' \
                                         'characters: {1}'.format(self.TOKEN_LIMIT, token_size))
+
+#: the state that is packed into a stream token
+StreamState = namedtuple('StreamState', 'track_id position playlist_id user_id')
+
+class StreamTokenCodec(object):
+    '''
+    Packs the state of an audio stream into a compact token that is signed
+    with a secret key. The state can be decoded from the token sent back
+    in AudioPlayer requests without having to look it up in storage.
+
+    Example::
+
+        codec = StreamTokenCodec('my-secret')
+        token = codec.encode('track-1', position=3, user_id=user_id)
+        ...
+        state = codec.decode(request_event.request.token)
+    '''
+
+    VERSION = 1
+    DIGEST_SIZE = 12
+
+    _HEADER = struct.Struct('>BI')
+    _LENGTH = struct.Struct('>H')
+
+    def __init__(self, secret, digest_size=DIGEST_SIZE):
+        if isinstance(secret, text_type):
+            secret = secret.encode('utf-8')
+        self._secret = secret
+        self._digest_size = digest_size
+
+    def _sign(self, payload):
+        return hmac.new(self._secret, payload, hashlib.sha256).digest()[:self._digest_size]
+
+    def encode(self, track_id, position=0, playlist_id='', user_id=''):
+        '''
+        Encode the stream state into a token. Raises a ValueError if the
+        position is negative or too large for the token.
+        '''
+        try:
+            parts = [self._HEADER.pack(self.VERSION, position)]
+        except struct.error:
+            raise ValueError('Stream position is out of range: {0}'.format(position))
+
+        for value in (track_id, playlist_id, user_id):
+            if isinstance(value, text_type):
+                value = value.encode('utf-8')
+            if len(value) > Stream.TOKEN_LIMIT:
+                raise ResponseSizeError('Token limit exceeded {0} characters: ' \
+                                        '{1}'.format(Stream.TOKEN_LIMIT, len(value)))
+            parts.append(self._LENGTH.pack(len(value)))
+            parts.append(value)
+
+        payload = b''.join(parts)
+        token = base64.urlsafe_b64encode(payload + self._sign(payload)).rstrip(b'=').decode('ascii')
+        if len(token) > Stream.TOKEN_LIMIT:
+            raise ResponseSizeError('Token limit exceeded {0} characters: ' \
+                                    '{1}'.format(Stream.TOKEN_LIMIT, len(token)))
+        return token
+
+    def decode(self, token):
+        '''
+        Decode the token back to a StreamState. Raises an InvalidTokenError if
+        the token was not created by this codec or has been changed.
+        '''
+        try:
+            if isinstance(token, text_type):
+                token = token.encode('ascii')
+            data = base64.urlsafe_b64decode(token + b'=' * (-len(token) % 4))
+        except (TypeError, ValueError):
+            raise InvalidTokenError('Stream token is not valid base64')
+
+        payload = data[:-self._digest_size]
+        if not hmac.compare_digest(self._sign(payload), data[-self._digest_size:]):
+            raise InvalidTokenError('Stream token signature does not match')
+
+        try:
+            version, position = self._HEADER.unpack_from(payload)
+            if version != self.VERSION:
+                raise InvalidTokenError('Unknown stream token version: {0}'.format(version))
+
+            offset = self._HEADER.size
+            values = []
+            for _ in range(3):
+                length, = self._LENGTH.unpack_from(payload, offset)
+                offset += self._LENGTH.size
+                values.append(payload[offset:offset + length].decode('utf-8'))
+                offset += length
+        except struct.error:
+            raise InvalidTokenError('Stream token is truncated')
+
+        track_id, playlist_id, user_id = values
+        return StreamState(track_id=track_id, position=position,
+                           playlist_id=playlist_id, user_id=user_id)
@@ -1,7 +1,7 @@
 from askalexa.response.card import Card
 from askalexa.response.main import Response
 from askalexa.response.speech import OutputSpeech, Reprompt
-from askalexa.response.audio import AudioDirective
+from askalexa.response.audio import AudioDirective, PlayDirective
 
 class ResponseBuilder(object):
     '''
@@ -10,8 +10,11 @@ class ResponseBuilder(object):
     managed by the builder.
     '''
 
-    def __init__(self):
-        self._response = Response()
+    def __init__(self, response=None):
+        '''
+        Start a new response, or build on the given response.
+        '''
+        self._response = response if response is not None else Response()
 
     def add_speech(self, message, reprompt_message=None, as_ssml=False):
         '''
@@ -77,7 +80,8 @@ class ResponseBuilder(object):
                                             country_postal=country_postal)
         return self
 
-    def play_audio(self, stream_url, token, expected_pevious_token, offset_in_milliseconds=0):
+    def play_audio(self, stream_url, token, expected_pevious_token, offset_in_milliseconds=0,
+                   play_behavior=PlayDirective.ENQUEUE):
         '''
         Play the given audio stream. The default behavior is to enqueue the
         audio to the active audio queue.
@@ -86,9 +90,10 @@ class ResponseBuilder(object):
         :param token: the token to associate this audio stream with
         :param expected_pevious_token: the token for the previous audio stream
         :param offset_in_milliseconds: the offset to begin playing the audio at
+        :param play_behavior: one of the PlayDirective play behaviors
         :returns: self
         '''
-        play_directive = AudioDirective.create(AudioDirective.PLAY)
+        play_directive = AudioDirective.create(AudioDirective.PLAY, play_behavior=play_behavior)
         stream = play_directive.audio_item.stream
         stream.url = stream_url
         stream.token = token
@@ -1,4 +1,4 @@
-from collections import MutableSequence
+from askalexa.compat import MutableSequence
 
 class JsonResponseData(object):
     '''
@@ -24,7 +24,7 @@ class JsonResponseData(object):
                 value = getattr(self, name)
 
                 if isinstance(value, MutableSequence):
-                    value = map(convert_value, value)
+                    value = [convert_value(v) for v in value]
                 else:
                     value = convert_value(value)
 
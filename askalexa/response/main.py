@@ -2,6 +2,9 @@
 Alexa Main Response Module
 ==========================
 '''
+import json
+
+from askalexa.exceptions import InvalidResponseError
 from askalexa.response.data import JsonResponseData, response_property
 from askalexa.response.audio import AudioDirective
 
@@ -99,3 +102,26 @@ class Response(JsonResponseData):
             if len([d for d in self.directives if isinstance(d, AudioDirective)]) > 1:
                 raise Exception("Too many audio directives")
 
+class FrozenResponse(JsonResponseData):
+    '''
+    A response that is encoded once when it is created, so it can be sent
+    for many requests without being built and encoded again. It cannot be
+    changed, setting any of its attributes raises InvalidResponseError.
+    '''
+
+    def __init__(self, response):
+        object.__setattr__(self, '_json_text', json.dumps(response.get_json_data()))
+
+    def __setattr__(self, name, value):
+        raise InvalidResponseError('Cached responses are read-only, {0} cannot be set'.format(name))
+
+    @property
+    def json_text(self):
+        '''
+        The response encoded as JSON text.
+        '''
+        return self._json_text
+
+    def get_json_data(self):
+        return json.loads(self._json_text)
+
@@ -1,4 +1,6 @@
+import json
 from askalexa.response.data import JsonResponseData, response_property
+from askalexa.request.attributes import encode_attributes
 
 class ResponsePackage(JsonResponseData):
     '''
@@ -6,10 +8,63 @@ class ResponsePackage(JsonResponseData):
     given response and session attributes.
     '''
 
-    def __init__(self, response, session_attributes):
+    def __init__(self, response, session_attributes, attributes_codec=None):
         self._version = '1.0'
         self._response = response
         self._session_attributes = session_attributes
+        self._attributes_codec = attributes_codec
+        self._session_attributes_size = 0
+
+    def get_json_text(self):
+        '''
+        Encode the response package as JSON text. The session attributes are
+        encoded on their own so unchanged attributes can reuse the JSON text
+        they were received with. Attributes that are a plain dictionary are
+        packed with the attributes codec if one was given. A FrozenResponse is
+        added as the JSON text it was encoded to.
+        '''
+        response_text = getattr(self._response, 'json_text', None)
+        if response_text is None:
+            json_data = self.get_json_data()
+            attributes = json_data.pop('sessionAttributes', None)
+            json_text = json.dumps(json_data)
+        else:
+            attributes = self._session_attributes
+            json_text = '{{"version": {0}, "response": {1}}}'.format(json.dumps(self._version),
+                                                                   response_text)
+        if attributes is None:
+            self._session_attributes_size = 0
+            return json_text
+
+        attributes_text = encode_attributes(attributes, self._attributes_codec)
+        self._session_attributes_size = len(attributes_text)
+        return json_text[:-1] + ', "sessionAttributes": ' + attributes_text + '}'
+
+    def get_plain_json_data(self):
+        '''
+        Get the JSON data with the session attributes as a plain dictionary,
+        packed with the attributes codec if one was given. This is for
+        platforms that encode the response themselves.
+        '''
+        json_data = self.get_json_data()
+        attributes = json_data.get('sessionAttributes')
+        if attributes is None:
+            return json_data
+
+        if self._attributes_codec is not None:
+            attributes_text = encode_attributes(attributes, self._attributes_codec)
+            json_data['sessionAttributes'] = json.loads(attributes_text)
+        elif not isinstance(attributes, dict):
+            json_data['sessionAttributes'] = dict(attributes)
+        return json_data
+
+    @property
+    def session_attributes_size(self):
+        '''
+        The size of the encoded session attributes from the last time the
+        package was encoded as JSON text.
+        '''
+        return self._session_attributes_size
 
     @response_property('version')
     def version(self):
@@ -7,7 +7,6 @@ the real response is being processed. This is useful for giving an update
 for request that takes a long time.
 '''
 import json
-import requests
 from askalexa.response.data import JsonResponseData, response_property
 
 class ProgressiveResponseBuilder(object):
@@ -40,6 +39,9 @@ class ProgressiveResponseBuilder(object):
                    'Authorization' : 'Bearer {0}'.format(self._api_access_token)}
         data = json.dumps(response.get_json_data())
 
+        # imported here so skills that never send progressive responses do
+        # not pay for importing requests
+        import requests
         result = requests.post(self._api_endpoint, headers=headers, data=data)
         return result.status_code == 204
 
@@ -0,0 +1,32 @@
+'''
+Alexa Serverless Module
+=======================
+
+A function style entry point for platforms such as AWS Lambda, where the
+request arrives as an already decoded event and the response is returned as
+a dictionary.
+
+Example::
+
+    import askalexa
+    from askalexa.serverless import handle_event
+
+    mySkill = askalexa.Skill('my-app-id')
+    ...
+
+    def lambda_handler(event, context):
+        return handle_event(event, context)
+
+The signature of the request is not verified. The platform must already
+guarantee that requests come from Alexa, for example a Lambda function with
+an Alexa Skills Kit trigger that is restricted to the skill ID. Nothing in
+this path imports requests or OpenSSL, which keeps the cold start short.
+'''
+from askalexa.handler import RequestEventHandler
+
+def handle_event(event, context=None):
+    '''
+    Handle a decoded Alexa request and return the response dictionary. The
+    context of the platform is not used.
+    '''
+    return RequestEventHandler.create_from_json(event).get_response_data()
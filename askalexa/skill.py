@@ -3,9 +3,34 @@ Alexa Skill Module
 ==================
 '''
 
+import inspect
+import functools
+
+from askalexa import circuit
+from askalexa.cache import DataCache, TTLCache
 from askalexa.dispatcher import RequestDispatcher
+from askalexa.exceptions import CircuitOpenError, InvalidResponseError
 from askalexa.request import standard
 from askalexa.response import ResponseBuilder
+from askalexa.response.main import FrozenResponse
+
+def is_coroutine_function(func):
+    '''
+    Returns True/False if func is a coroutine function, which is always
+    False before python 3.5.
+    '''
+    iscoroutinefunction = getattr(inspect, 'iscoroutinefunction', None)
+    return iscoroutinefunction is not None and iscoroutinefunction(func)
+
+def reject_awaitable(awaitable):
+    '''
+    Close the awaitable response of a coroutine handler that is served by a
+    caller that cannot await it, and raise an InvalidResponseError.
+    '''
+    close = getattr(awaitable, 'close', None)
+    if close is not None:
+        close()
+    raise InvalidResponseError('Coroutine handlers can only be served by the ASGI application')
 
 class Skill(object):
     '''
@@ -13,17 +38,33 @@ class Skill(object):
     command to respond to the request.
     '''
 
-    def __init__(self, application_id, register=True):
+    def __init__(self, application_id, register=True, attributes_store=None,
+                 playback_cache=None, bulkhead=None, slot_resolver=None):
         '''
         Initialize a new skill with the given application ID. The skill will be
-        registered to the dispatcher if register is True.
+        registered to the dispatcher if register is True. An optional
+        UserAttributesStore can be given to persist attributes per user, an
+        optional PlaybackStateCache to track the audio player of each user, an
+        optional Bulkhead to limit the requests handled at the same time, and
+        an optional SlotResolver to resolve the slot values of intents.
         '''
         self._application_id = application_id
+        self._attributes_store = attributes_store
+        self._playback_cache = playback_cache
+        self._bulkhead = bulkhead
+        self._slot_resolver = slot_resolver
+        self._profiler = None
 
         self._session_started_func = None
         self._failsafe_func = self.default_response
+        self._shed_func = None
         self._request_funcs = {}
         self._intent_funcs = {}
+        self._circuits = {}
+        self._dependencies = {}
+        self._degraded_funcs = {}
+        self._response_caches = {}
+        self._data_caches = {}
         
         if register:
             RequestDispatcher.add_skill(self)
@@ -41,6 +82,141 @@ class Skill(object):
         '''
         return self._application_id
 
+    @property
+    def attributes_store(self):
+        '''
+        The UserAttributesStore used to persist user attributes, or None.
+        '''
+        return self._attributes_store
+
+    @attributes_store.setter
+    def attributes_store(self, attributes_store):
+        self._attributes_store = attributes_store
+
+    @property
+    def playback_cache(self):
+        '''
+        The PlaybackStateCache updated from the requests of this skill, or None.
+        '''
+        return self._playback_cache
+
+    @playback_cache.setter
+    def playback_cache(self, playback_cache):
+        self._playback_cache = playback_cache
+
+    @property
+    def bulkhead(self):
+        '''
+        The Bulkhead that limits the concurrent requests of this skill, or None.
+        '''
+        return self._bulkhead
+
+    @bulkhead.setter
+    def bulkhead(self, bulkhead):
+        self._bulkhead = bulkhead
+
+    @property
+    def slot_resolver(self):
+        '''
+        The SlotResolver that resolves the slot values of intents, or None.
+        '''
+        return self._slot_resolver
+
+    @slot_resolver.setter
+    def slot_resolver(self, slot_resolver):
+        self._slot_resolver = slot_resolver
+
+    @property
+    def profiler(self):
+        '''
+        The SamplingProfiler used to profile a sample of requests, or None.
+        '''
+        return self._profiler
+
+    @profiler.setter
+    def profiler(self, profiler):
+        self._profiler = profiler
+
+    def add_dependency(self, name, breaker=None, **options):
+        '''
+        Add a backend dependency that handlers can declare with depends_on.
+        The options are given to the CircuitBreaker created for it if no
+        breaker is given, give it the exceptions that are failures of the
+        backend. Returns the CircuitBreaker.
+        '''
+        if breaker is None:
+            breaker = circuit.CircuitBreaker(name, **options)
+        self._circuits[name] = breaker
+        return breaker
+
+    def get_circuit(self, name):
+        '''
+        Get the CircuitBreaker of the dependency with the given name.
+        '''
+        try:
+            return self._circuits[name]
+        except KeyError:
+            raise ValueError('Unknown dependency: {0}'.format(name))
+
+    def circuit(self, name):
+        '''
+        Context manager for a call to the dependency with the given name. It
+        raises CircuitOpenError if the circuit is open.
+        '''
+        return self.get_circuit(name).guard()
+
+    def get_circuit_stats(self):
+        '''
+        Return a dictionary of dependency names to the state and counts of
+        their circuits.
+        '''
+        return dict((name, breaker.get_stats())
+                    for name, breaker in list(self._circuits.items()))
+
+    def cached(self, ttl=300.0, max_size=1000, max_memory=None, stale_ttl=0.0, size_func=None,
+               name=None):
+        '''
+        Decorator for a function that loads data for the handlers, such as a
+        catalog or a schedule, to cache its results by its arguments in a
+        DataCache. The arguments must be hashable. The cache is available as
+        the cache attribute of the decorated function and its statistics
+        from get_cache_stats under the name, or the function name if no name
+        is given.
+        '''
+        def wrapper(func):
+            cache = DataCache(max_size, ttl, max_memory, stale_ttl, size_func)
+            self._data_caches[name or func.__name__] = cache
+
+            @functools.wraps(func)
+            def cached_func(*args, **kwargs):
+                key = (args, tuple(sorted(kwargs.items()))) if kwargs else args
+                return cache.get_or_fill(key, lambda: func(*args, **kwargs))
+
+            cached_func.cache = cache
+            return cached_func
+
+        return wrapper
+
+    def get_cache_stats(self):
+        '''
+        Return a dictionary of cache names to the hit, miss and eviction
+        counts and the size of the caches of the cached decorator.
+        '''
+        return dict((name, cache.get_stats())
+                    for name, cache in list(self._data_caches.items()))
+
+    def get_user_attributes(self, event):
+        '''
+        Get the persistent attributes for the user of the request event.
+        Changes to the attributes are saved after the request is handled.
+        '''
+        if self._attributes_store is None:
+            raise ValueError('Skill does not have an attributes store')
+
+        if event.user_attributes is None:
+            event.user_attributes = self._attributes_store.get(event.user.user_id)
+        return event.user_attributes
+
     def on_launch(self, func):
         '''
         Decorator that registers a function to be called on a launch request.
@@ -64,17 +240,48 @@ class Skill(object):
         self._request_funcs[standard.SESSION_ENDED_REQUEST_TYPE] = func
         return func
 
-    def on_intent(self, *name):
+    def on_intent(self, *name, **options):
         '''
         Decorator for a function to handle the given intent name(s).
+
+        If cache_ttl is given, the responses of the function are cached for
+        that many seconds by locale, intent name and slot values, and the
+        function is only called when there is no cached response. At most
+        cache_size responses are cached. Only use it for intents whose
+        response depends on nothing else, the function is not called for
+        cached responses so it cannot change the session attributes either.
+        The ResponseBuilder of a cached response is read-only, its add and
+        audio methods raise InvalidResponseError.
         '''
+        cache_ttl = options.pop('cache_ttl', None)
+        cache_size = options.pop('cache_size', 1000)
+        if options:
+            raise TypeError('Unexpected options: {0}'.format(', '.join(sorted(options))))
+
         def wrapper(func):
+            cache = None
+            if cache_ttl is not None:
+                if is_coroutine_function(func):
+                    raise ValueError('Responses of coroutine functions cannot be cached')
+                cache = TTLCache(cache_size, cache_ttl)
+
             for n in name:
                 self._intent_funcs[n] = func
+                if cache is None:
+                    self._response_caches.pop(n, None)
+                else:
+                    self._response_caches[n] = cache
             return func
 
         return wrapper
 
+    def clear_response_caches(self):
+        '''
+        Remove the cached responses of every intent.
+        '''
+        for cache in list(self._response_caches.values()):
+            cache.clear()
+
     def on_request(self, request_type):
         '''
         Decorator for the function to call for the given request type
@@ -85,6 +292,35 @@ class Skill(object):
 
         return wrapper
 
+    def depends_on(self, *name):
+        '''
+        Decorator that declares the backend dependencies of a handler. The
+        handler is not called while the circuit of one of them is open.
+        Dependencies that were not added with add_dependency are added with
+        the default options, which count no exception as a failure.
+        '''
+        def wrapper(func):
+            for n in name:
+                if n not in self._circuits:
+                    self.add_dependency(n)
+            self._dependencies[func] = self._dependencies.get(func, ()) + name
+            return func
+
+        return wrapper
+
+    def on_degraded(self, *name):
+        '''
+        Decorator for the function to call when the given dependencies are
+        not available. Without names the function is used for every
+        dependency that has no degraded function of its own.
+        '''
+        def wrapper(func):
+            for n in name or (None,):
+                self._degraded_funcs[n] = func
+            return func
+
+        return wrapper
+
     def on_failsafe(self, func):
         '''
         If no function matches the request, call this function to provide an
@@ -93,6 +329,15 @@ class Skill(object):
         self._failsafe_func = func
         return func
 
+    def on_shed(self, func):
+        '''
+        Registers a function that gives a fast response when the request is
+        shed because the bulkhead of the skill is full. The failsafe function
+        is used if there is none.
+        '''
+        self._shed_func = func
+        return func
+
     def default_response(self, event):
         '''
         This is a default response if no function can handle the request. You
@@ -103,33 +348,166 @@ class Skill(object):
         response.add_speech('This skill is unable to respond to this request. Sorry!')
         return response
 
-    def get_response(self, event):
+    def get_response(self, event, allow_coroutines=False):
         '''
         Get the skill response from the given request event. This is normally
         called from the request dispatcher.
+
+        Handlers and the session started function may be coroutine functions
+        when the skill is served by the ASGI application, which sets
+        allow_coroutines. Their response is then an awaitable that keeps the
+        bulkhead slot and is profiled until it is done or closed, and commits
+        the user attributes when it completes. Without allow_coroutines they
+        raise an InvalidResponseError.
         '''
+        if not allow_coroutines and self._has_coroutine_handler(event):
+            raise InvalidResponseError('Coroutine handlers can only be served by the ASGI '
+                                       'application')
+
+        if self._playback_cache is not None:
+            self._playback_cache.update_from_event(event)
+
+        bulkhead = self._bulkhead
+        if bulkhead is not None:
+            if not bulkhead.acquire():
+                return (self._shed_func or self._failsafe_func)(event)
+
+        profile_session = None
+        profiler = self._profiler
+        if profiler is not None and profiler.should_sample(event):
+            profile_session = profiler.begin()
+
+        try:
+            if profile_session is not None:
+                profile_session.resume()
+            try:
+                response = self._get_response(event)
+            finally:
+                if profile_session is not None:
+                    profile_session.pause()
+        except BaseException:
+            self._finish_response(event, bulkhead, profile_session, False)
+            raise
+
+        if hasattr(response, '__await__'):
+            from askalexa.coroutines import HandlerAwaitable
+            response = HandlerAwaitable(response, profile_session, lambda completed:
+                                        self._finish_response(event, bulkhead, profile_session,
+                                                              completed))
+            if not allow_coroutines:
+                # a plain function that returned an awaitable
+                reject_awaitable(response)
+            return response
+
+        self._finish_response(event, bulkhead, profile_session, True)
+        return response
+
+    def _has_coroutine_handler(self, event):
+        session = event.session
+        if session is not None and session.is_new and \
+                is_coroutine_function(self._session_started_func):
+            return True
+        return is_coroutine_function(self._get_request_func(event.request))
+
+    def _finish_response(self, event, bulkhead, profile_session, completed):
+        try:
+            if profile_session is not None:
+                profile_session.end()
+        finally:
+            if bulkhead is not None:
+                bulkhead.release()
+
+        if completed:
+            self.commit_user_attributes(event)
+
+    def commit_user_attributes(self, event):
+        '''
+        Queue any changes the handler made to the user attributes of the
+        event to be saved by the attributes store.
+        '''
+        if self._attributes_store is not None and event.user_attributes is not None:
+            self._attributes_store.commit(event.user.user_id, event.user_attributes)
+
+    def _get_response(self, event):
         session = event.session
 
         if session is not None and session.is_new and self._session_started_func is not None:
             # call the session started function if there is one
-            self._session_started_func(event)
+            started = self._session_started_func(event)
+            if hasattr(started, '__await__'):
+                from askalexa.coroutines import call_after
+                return call_after(started, self._get_handler_response, event)
 
+        return self._get_handler_response(event)
+
+    def _get_handler_response(self, event):
         request = event.request
         request_type = request.request_type
 
-        # if this is a intent request then call the associated function
+        request_func = self._get_request_func(request)
+        if request_type == standard.INTENT_REQUEST_TYPE:
+            if self._slot_resolver is not None:
+                self._slot_resolver.resolve(event)
+
+            cache = self._response_caches.get(request.intent.name)
+            if cache is not None and request_func is self._intent_funcs.get(request.intent.name):
+                return self._get_cached_response(cache, request_func, event)
+
+        # different request types get different arguments
+        return self._call_handler(request_func, event)
+
+    def _get_request_func(self, request):
+        # if this is a intent request then use the associated function
         # that matches the intent name if the user added to the skill one.
+        request_type = request.request_type
         if request_type == standard.INTENT_REQUEST_TYPE:
-            intent_func = self._intent_funcs.get(request.intent.name)
-            if intent_func:
-                return intent_func(event)
+            request_func = self._intent_funcs.get(request.intent.name)
+            if request_func:
+                return request_func
 
         # fallback to use the request type instead for other types of requests.
         try:
-            request_func = self._request_funcs[request_type]
+            return self._request_funcs[request_type]
         except KeyError:
             # used a default message since there is no handler
-            request_func = self._failsafe_func
+            return self._failsafe_func
 
-        # different request types get different arguments
-        return request_func(event)
\ No newline at end of file
+    def _call_handler(self, request_func, event, degraded_func=None):
+        # handlers with dependencies are called through their circuits
+        dependencies = self._dependencies.get(request_func)
+        if dependencies:
+            breakers = [self._circuits[n] for n in dependencies]
+            return circuit.call_handler(request_func, event, breakers,
+                                        degraded_func or self._get_degraded_response)
+
+        return request_func(event)
+
+    def _get_cached_response(self, cache, request_func, event):
+        request = event.request
+        intent = request.intent
+        key = (request.locale, intent.name,
+               tuple(sorted((name, slot.value) for name, slot in intent.slots.items())))
+
+        try:
+            response = cache.get_or_fill(key, lambda: self._freeze_response(request_func, event))
+        except CircuitOpenError as e:
+            # degraded responses are not cached
+            return self._get_degraded_response(event, e.name)
+
+        return ResponseBuilder(response)
+
+    def _freeze_response(self, request_func, event):
+        response = self._call_handler(request_func, event, self._raise_circuit_open)
+        if not isinstance(response, ResponseBuilder):
+            raise InvalidResponseError('Response is not an instance of ResponseBuilder.')
+
+        return FrozenResponse(response._response)
+
+    @staticmethod
+    def _raise_circuit_open(event, name):
+        raise CircuitOpenError(name)
+
+    def _get_degraded_response(self, event, name):
+        degraded_func = self._degraded_funcs.get(name) or self._degraded_funcs.get(None) \
+            or self._failsafe_func
+        return degraded_func(event)
\ No newline at end of file
@@ -0,0 +1,242 @@
+'''
+Alexa User Attributes Store Module
+==================================
+
+Session attributes only last for a single session. The user attributes store
+keeps attributes for each user ID in a persistent backend. Loaded attributes
+are kept in an in-process LRU cache so each user is loaded at most once while
+cached, and changed attributes are written to the backend in batches by a
+background thread so the request does not wait on the write.
+
+Example::
+
+    store = UserAttributesStore(SQLiteAttributesBackend('attributes.db'))
+    mySkill = askalexa.Skill('my-app-id', attributes_store=store)
+
+    @mySkill.on_launch
+    def welcome_response(request_event):
+        attributes = mySkill.get_user_attributes(request_event)
+        attributes['visits'] = attributes.get('visits', 0) + 1
+        ...
+'''
+import atexit
+import logging
+import sqlite3
+import threading
+from askalexa.cache import LRUCache
+from askalexa.request.attributes import SessionAttributes
+
+logger = logging.getLogger(__name__)
+
+class AttributesBackend(object):
+    '''
+    Base class for persistent attribute backends. Backends store the JSON
+    text of the attributes for each user ID.
+    '''
+
+    def load(self, user_id):
+        '''
+        Return the attributes JSON text for the user ID or None if there is
+        no record for the user.
+        '''
+        raise NotImplementedError
+
+    def save_many(self, records):
+        '''
+        Save a list of (user_id, json_text) tuples.
+        '''
+        raise NotImplementedError
+
+    def close(self):
+        '''
+        Release any resources held by the backend.
+        '''
+        pass
+
+class SQLiteAttributesBackend(AttributesBackend):
+    '''
+    Stores user attributes in a SQLite database table.
+    '''
+
+    def __init__(self, path, table='user_attributes'):
+        self._table = table
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute('CREATE TABLE IF NOT EXISTS {0} (user_id TEXT PRIMARY KEY, '
+                                 'attributes TEXT NOT NULL)'.format(table))
+        self._connection.commit()
+
+    def load(self, user_id):
+        with self._lock:
+            cursor = self._connection.execute('SELECT attributes FROM {0} WHERE '
+                                              'user_id = ?'.format(self._table), (user_id,))
+            row = cursor.fetchone()
+
+        if row is None:
+            return None
+        return row[0]
+
+    def save_many(self, records):
+        with self._lock:
+            self._connection.executemany('INSERT OR REPLACE INTO {0} (user_id, attributes) '
+                                         'VALUES (?, ?)'.format(self._table), records)
+            self._connection.commit()
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+class UserAttributesStore(object):
+    '''
+    Caches user attributes loaded from a backend and writes changed
+    attributes back to the backend from a background thread.
+    '''
+
+    def __init__(self, backend, cache_size=1000, flush_interval=1.0, batch_size=100):
+        '''
+        Initialize the store with the backend. Up to cache_size users are kept
+        in memory. Changed attributes are written every flush_interval seconds
+        or as soon as batch_size users have changes.
+        '''
+        self.backend = backend
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+
+        self._cache = LRUCache(cache_size)
+        self._lock = threading.Lock()
+        self._loading = {}
+        self._pending = {}
+        self._flushing = {}
+        self._flush_condition = threading.Condition(threading.Lock())
+        self._writer = None
+        self._closed = False
+
+    def get(self, user_id):
+        '''
+        Return the attributes for the user ID. Attributes are loaded from the
+        backend only if they are not already cached. An empty SessionAttributes
+        is returned for users without a record.
+        '''
+        attributes = self._cache.get(user_id)
+        if attributes is not None:
+            return attributes
+
+        with self._lock:
+            attributes = self._cache.get(user_id)
+            if attributes is not None:
+                return attributes
+
+            loaded_event = self._loading.get(user_id)
+            is_loader = loaded_event is None
+            if is_loader:
+                loaded_event = self._loading[user_id] = threading.Event()
+
+        if not is_loader:
+            # another thread is loading this user, wait for it to finish
+            loaded_event.wait()
+            return self.get(user_id)
+
+        try:
+            attributes = self._load(user_id)
+            for evicted_id, evicted in self._cache.set(user_id, attributes):
+                # changes that were not committed yet must not be lost
+                self._queue(evicted_id, evicted)
+        finally:
+            with self._lock:
+                self._loading.pop(user_id, None)
+            loaded_event.set()
+
+        return attributes
+
+    def _load(self, user_id):
+        with self._flush_condition:
+            json_text = self._pending.get(user_id) or self._flushing.get(user_id)
+
+        if json_text is None:
+            json_text = self.backend.load(user_id)
+
+        if json_text is None:
+            return SessionAttributes()
+
+        return SessionAttributes.create_from_text(json_text)[0]
+
+    def commit(self, user_id, attributes=None):
+        '''
+        Queue the attributes of the user ID to be written if they were
+        changed. This is called by the skill after each request with the
+        attributes returned by get, which are written even if they were
+        evicted from the cache since. Without attributes the cached
+        attributes of the user are used.
+        '''
+        if attributes is None:
+            attributes = self._cache.get(user_id)
+        if attributes is not None:
+            self._queue(user_id, attributes)
+
+    def _queue(self, user_id, attributes):
+        if not attributes.is_modified:
+            return
+
+        json_text = attributes.snapshot()
+        with self._flush_condition:
+            self._pending[user_id] = json_text
+            if self._writer is None:
+                self._start_writer()
+            if len(self._pending) >= self.batch_size:
+                self._flush_condition.notify()
+
+    def _start_writer(self):
+        self._writer = threading.Thread(target=self._write_loop, name='UserAttributesStore')
+        self._writer.daemon = True
+        self._writer.start()
+        atexit.register(self.flush)
+
+    def _write_loop(self):
+        while True:
+            with self._flush_condition:
+                if not self._closed and len(self._pending) < self.batch_size:
+                    self._flush_condition.wait(self.flush_interval)
+
+                if self._closed:
+                    return
+
+            self.flush()
+
+    def flush(self):
+        '''
+        Write all queued attributes to the backend now.
+        '''
+        with self._flush_condition:
+            pending = self._flushing = self._pending
+            self._pending = {}
+
+        if not pending:
+            return
+
+        try:
+            self.backend.save_many(list(pending.items()))
+        except Exception:
+            logger.exception('Unable to save user attributes')
+
+            # put the records back unless they were changed again since
+            with self._flush_condition:
+                for user_id, json_text in pending.items():
+                    self._pending.setdefault(user_id, json_text)
+        finally:
+            with self._flush_condition:
+                self._flushing = {}
+
+    def close(self):
+        '''
+        Write all queued attributes, stop the writer thread and close the
+        backend.
+        '''
+        with self._flush_condition:
+            self._closed = True
+            self._flush_condition.notify()
+
+        if self._writer is not None:
+            self._writer.join()
+
+        self.flush()
+        self.backend.close()
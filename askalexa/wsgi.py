@@ -0,0 +1,203 @@
+'''
+Alexa WSGI Application Module
+=============================
+
+A WSGI application that serves Alexa requests with the registered skills,
+so no web framework glue is needed.
+
+Example::
+
+    import askalexa
+    from askalexa.wsgi import WSGIApplication
+
+    mySkill = askalexa.Skill('my-app-id')
+    ...
+    application = WSGIApplication()
+
+The request body is read once, checked and verified as bytes, then decoded
+and parsed. The session attributes are parsed where they are found and
+replaced by a placeholder, so the rest of the request is parsed without
+them. Requests without a valid Content-Length, with a body larger than
+max_body_size, or with a body that is not a JSON object are rejected before
+they are parsed. Requests that cannot be parsed are
+answered with status 400. Any other error is logged and answered with
+status 500.
+'''
+import logging
+
+from askalexa.compat import text_type
+from askalexa.handler import RequestEventHandler
+from askalexa.exceptions import RequestError, SkillNotFoundError, InvalidResponseError
+
+logger = logging.getLogger(__name__)
+
+#: the largest request body accepted, Alexa requests are far smaller
+MAX_BODY_SIZE = 128 * 1024
+
+JSON_CONTENT_TYPE = 'application/json;charset=UTF-8'
+TEXT_CONTENT_TYPE = 'text/plain;charset=UTF-8'
+
+SIGNATURE_CERT_CHAIN_URL_HEADER = 'SignatureCertChainUrl'
+SIGNATURE_HEADER = 'Signature'
+
+_JSON_WHITESPACE = b' \t\r\n'
+
+_STATUS_TEXT = {
+    200: 'OK',
+    400: 'Bad Request',
+    405: 'Method Not Allowed',
+    411: 'Length Required',
+    413: 'Payload Too Large',
+    500: 'Internal Server Error',
+}
+
+def check_body(body):
+    '''
+    Returns True/False if the body looks like a JSON object. This is a cheap
+    check that is done before the body is verified and parsed.
+    '''
+    stripped = body.lstrip(_JSON_WHITESPACE)
+    return stripped[:1] == b'{' and body.rstrip(_JSON_WHITESPACE)[-1:] == b'}'
+
+#: exceptions from parsing and dispatching a request that are answered as bad requests
+REQUEST_ERRORS = (ValueError, KeyError, TypeError, RequestError, SkillNotFoundError)
+
+def check_request(body, certificate_url=None, signature=None, validate=True):
+    '''
+    Check the request before it is handled. Returns the error response tuple
+    of the status code and message, or None if the request can be handled.
+    '''
+    if not check_body(body):
+        return error_response(400, 'The request body is not a JSON object')
+
+    if validate and (not certificate_url or not signature):
+        return error_response(400, 'The request is not signed')
+
+    return None
+
+def handle_body(body, certificate_url=None, signature=None, validate=True):
+    '''
+    Verify and handle a request body. Returns a tuple of the status code and
+    the encoded response body.
+    '''
+    error = check_request(body, certificate_url, signature, validate)
+    if error is not None:
+        return error
+
+    handler = RequestEventHandler(body)
+    try:
+        if validate and not handler.is_request_valid(certificate_url, signature):
+            return invalid_signature_response()
+        alexa_event, skill = handler.dispatch()
+    except REQUEST_ERRORS as e:
+        return exception_response(e)
+    except Exception as e:
+        return internal_error_response(e)
+
+    try:
+        alexa_response = skill.get_response(alexa_event)
+        response_text = handler.encode_response(alexa_event, alexa_response)
+    except Exception as e:
+        return internal_error_response(e)
+
+    return 200, encode_response_text(response_text)
+
+def encode_response_text(response_text):
+    if isinstance(response_text, text_type):
+        return response_text.encode('utf-8')
+    return response_text
+
+def invalid_signature_response():
+    return error_response(400, 'The request signature is not valid')
+
+def exception_response(exception):
+    '''
+    Returns the error response tuple for one of the REQUEST_ERRORS.
+    '''
+    if isinstance(exception, (RequestError, SkillNotFoundError)):
+        return error_response(400, str(exception) or type(exception).__name__)
+    return error_response(400, 'The request is malformed')
+
+def internal_error_response(exception):
+    '''
+    Log an unexpected exception and return the error response tuple for it.
+    This must be called while the exception is handled.
+    '''
+    logger.exception('Unable to handle the request')
+    if isinstance(exception, InvalidResponseError):
+        return error_response(500, 'The skill returned an invalid response')
+    return error_response(500, 'The skill was unable to handle the request')
+
+def error_response(status, message):
+    '''
+    Returns a tuple of the status code and the encoded message.
+    '''
+    return status, message.encode('utf-8')
+
+def get_status_line(status):
+    return '{0} {1}'.format(status, _STATUS_TEXT.get(status, ''))
+
+def get_response_headers(status, body):
+    content_type = JSON_CONTENT_TYPE if status == 200 else TEXT_CONTENT_TYPE
+    return [('Content-Type', content_type), ('Content-Length', str(len(body)))]
+
+def read_body(stream, content_length):
+    '''
+    Read exactly content_length bytes from the stream. Returns None if the
+    stream ends early.
+    '''
+    body = stream.read(content_length)
+    if len(body) == content_length:
+        return body
+
+    # the server returned a short read, keep reading until the end
+    chunks = [body]
+    remaining = content_length - len(body)
+    while remaining > 0:
+        chunk = stream.read(remaining)
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b''.join(chunks)
+
+class WSGIApplication(object):
+    '''
+    WSGI application that handles Alexa requests. Set validate to False to
+    skip the signature verification, for example behind a trusted gateway
+    that already verified the request.
+    '''
+
+    def __init__(self, validate=True, max_body_size=MAX_BODY_SIZE):
+        self.validate = validate
+        self.max_body_size = max_body_size
+
+    def __call__(self, environ, start_response):
+        status, body = self.handle(environ)
+        start_response(get_status_line(status), get_response_headers(status, body))
+        return [body]
+
+    def handle(self, environ):
+        '''
+        Handle the request described by the WSGI environ. Returns a tuple of
+        the status code and the response body.
+        '''
+        if environ.get('REQUEST_METHOD') != 'POST':
+            return error_response(405, 'Only POST requests are accepted')
+
+        try:
+            content_length = int(environ.get('CONTENT_LENGTH') or '')
+        except ValueError:
+            return error_response(411, 'The request has no valid Content-Length')
+        if content_length < 0:
+            return error_response(411, 'The request has no valid Content-Length')
+        if content_length > self.max_body_size:
+            return error_response(413, 'The request body is larger than {0} bytes'.format(
+                self.max_body_size))
+
+        body = read_body(environ['wsgi.input'], content_length)
+        if body is None:
+            return error_response(400, 'The request body is shorter than its Content-Length')
+
+        return handle_body(body, environ.get('HTTP_SIGNATURECERTCHAINURL'),
+                           environ.get('HTTP_SIGNATURE'), validate=self.validate)
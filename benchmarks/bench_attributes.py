@@ -0,0 +1,78 @@
+'''
+Session Attributes Benchmark
+============================
+
+Compares plain JSON session attributes with the compressed attribute envelope.
+For each attribute size it reports the bytes on the wire and the time to
+decode a request and read the attributes.
+
+Usage::
+
+    python benchmarks/bench_attributes.py
+'''
+import os
+import sys
+import json
+import random
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from askalexa.request.attributes import AttributesCodec, load_request_json
+
+SIZES = (10, 100, 1000, 5000)
+
+def make_attributes(count, seed=0):
+    '''
+    Build game state like attributes with the given number of entries.
+    '''
+    rng = random.Random(seed)
+    return {
+        'score': rng.randint(0, 1000),
+        'level': rng.randint(1, 50),
+        'history': [{'question': 'question-{0}'.format(i),
+                     'answer': rng.choice(['yes', 'no', 'maybe']),
+                     'points': rng.randint(0, 10)} for i in range(count)],
+    }
+
+def make_request(attributes_text):
+    return ('{"version": "1.0", "session": {"new": false, "sessionId": "session-1", '
+            '"application": {"applicationId": "app-1"}, "attributes": ' + attributes_text +
+            ', "user": {"userId": "user-1"}}, "request": {"type": "LaunchRequest", '
+            '"requestId": "request-1", "locale": "en-US", "timestamp": "2018-01-01T00:00:00Z"}}')
+
+def time_call(func, number):
+    return min(timeit.repeat(func, number=number, repeat=3)) / number
+
+def run():
+    codec = AttributesCodec(threshold=0)
+    print('{0:>8} {1:>12} {2:>12} {3:>14} {4:>14}'.format(
+        'entries', 'plain bytes', 'packed bytes', 'plain parse us', 'packed parse us'))
+
+    for size in SIZES:
+        attributes = make_attributes(size)
+        plain_text = json.dumps(attributes)
+        packed_text = codec.pack(plain_text)
+
+        plain_request = make_request(plain_text)
+        packed_request = make_request(packed_text)
+
+        def parse_plain():
+            request_json = json.loads(plain_request)
+            return request_json['session']['attributes']['score']
+
+        def parse_packed():
+            request_json = load_request_json(packed_request)
+            attributes = request_json['session']['attributes']
+            attributes.codec = codec
+            return attributes['score']
+
+        number = max(1, 20000 // (size + 10))
+        plain_time = time_call(parse_plain, number) * 1e6
+        packed_time = time_call(parse_packed, number) * 1e6
+
+        print('{0:>8} {1:>12} {2:>12} {3:>14.1f} {4:>14.1f}'.format(
+            size, len(plain_text), len(packed_text), plain_time, packed_time))
+
+if __name__ == '__main__':
+    run()
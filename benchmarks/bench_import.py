@@ -0,0 +1,101 @@
+'''
+Import Time Benchmark
+=====================
+
+Measures the import time, memory, and cold start of the package. Every
+sample runs in a new interpreter.
+
+* package imports askalexa only.
+* eager imports everything that importing askalexa used to import,
+  including requests and OpenSSL, then handles one request with the
+  serverless entry point.
+* lazy handles one request with the serverless entry point, which only
+  imports what that request needs.
+
+Usage::
+
+    python benchmarks/bench_import.py --samples 20
+'''
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+#: name, imports, and whether a request is handled
+SCENARIOS = (
+    ('package', 'import askalexa', False),
+    ('eager', 'import requests\nfrom OpenSSL import crypto\n'
+              'from askalexa import Skill, ResponseBuilder, ProgressiveResponseBuilder, '
+              'RequestEventHandler', True),
+    ('lazy', 'from askalexa.serverless import handle_event', True),
+)
+
+_CHILD = '''
+import sys, json, time, resource
+start = time.time()
+{imports}
+imported = time.time()
+first_request = None
+
+if {handle_request}:
+    from askalexa.serverless import handle_event
+    from askalexa import Skill, ResponseBuilder
+    from askalexa.corpus import CorpusGenerator
+
+    generator = CorpusGenerator(None, seed=1)
+    skill = Skill(generator.application_id)
+    skill.on_failsafe(lambda event: ResponseBuilder().add_speech('OK'))
+    event = generator.generate_one('IntentRequest')
+
+    handle_start = time.time()
+    handle_event(event)
+    first_request = time.time() - handle_start
+
+print(json.dumps({{'import': imported - start, 'first_request': first_request,
+                  'rss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                  'modules': len([m for m in sys.modules if m.startswith('askalexa')
+                                  and sys.modules[m] is not None]),
+                  'requests': 'requests' in sys.modules, 'OpenSSL': 'OpenSSL' in sys.modules}}))
+'''
+
+def run_sample(imports, handle_request):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [ROOT, env.get('PYTHONPATH')]))
+    code = _CHILD.format(imports=imports, handle_request=handle_request)
+    output = subprocess.check_output([sys.executable, '-c', code], env=env)
+    return json.loads(output.decode('utf-8').strip().splitlines()[-1])
+
+def median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measure the import time and cold start.')
+    parser.add_argument('--samples', type=int, default=10)
+    args = parser.parse_args(argv)
+
+    print('{0:<8} {1:>10} {2:>17} {3:>12} {4:>8} {5:>9} {6:>8}'.format(
+        'scenario', 'import ms', 'first request ms', 'max rss MB', 'modules', 'requests',
+        'OpenSSL'))
+    for name, imports, handle_request in SCENARIOS:
+        try:
+            samples = [run_sample(imports, handle_request) for _ in range(args.samples)]
+        except subprocess.CalledProcessError:
+            print('{0:<8} failed, is the scenario importable?'.format(name))
+            continue
+
+        first_request = '-'
+        if handle_request:
+            first_request = '{0:.2f}'.format(median([s['first_request'] for s in samples]) * 1e3)
+        print('{0:<8} {1:>10.2f} {2:>17} {3:>12.1f} {4:>8} {5:>9} {6:>8}'.format(
+            name, median([s['import'] for s in samples]) * 1e3, first_request,
+            median([s['rss'] for s in samples]) / 1024.0, samples[0]['modules'],
+            'loaded' if samples[0]['requests'] else '-',
+            'loaded' if samples[0]['OpenSSL'] else '-'))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,151 @@
+'''
+WSGI and ASGI Benchmark
+=======================
+
+Compares the throughput and latency of WSGIApplication and ASGIApplication
+under a local load generator. The load generator calls the applications in
+process with the given number of concurrent clients, threads for WSGI and
+tasks for ASGI, so only the adapters and the framework are measured and not
+an HTTP server.
+
+With --io-delay, every skill handler waits that many milliseconds, with
+time.sleep for WSGI and asyncio.sleep for ASGI, to model a handler that
+calls another service.
+
+Usage::
+
+    python3 benchmarks/bench_servers.py --requests 20000 --concurrency 1,10,100
+    python3 benchmarks/bench_servers.py --io-delay 20 --concurrency 10,100,1000
+
+Signature verification is turned off since it costs the same for both.
+This benchmark needs python 3.
+'''
+import io
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from askalexa.asgi import ASGIApplication
+from askalexa.corpus import CorpusGenerator
+from askalexa.dispatcher import RequestDispatcher
+from askalexa.replay import percentile
+from askalexa.response import ResponseBuilder
+from askalexa.skill import Skill
+from askalexa.wsgi import WSGIApplication
+
+def make_bodies(count, seed=0):
+    generator = CorpusGenerator(None, seed=seed, attribute_size=512)
+    bodies = [json.dumps(request_json).encode('utf-8')
+              for request_json in generator.generate(count)]
+    return generator.application_id, bodies
+
+def register_skill(application_id, io_delay, is_async):
+    RequestDispatcher.clear_skills()
+    skill = Skill(application_id)
+
+    if is_async:
+        @skill.on_failsafe
+        async def respond(event):
+            if io_delay:
+                await asyncio.sleep(io_delay)
+            return ResponseBuilder().add_speech('OK')
+    else:
+        @skill.on_failsafe
+        def respond(event):
+            if io_delay:
+                time.sleep(io_delay)
+            return ResponseBuilder().add_speech('OK')
+
+def run_wsgi(bodies, request_count, concurrency):
+    application = WSGIApplication(validate=False)
+
+    def call(body):
+        environ = {'REQUEST_METHOD': 'POST', 'CONTENT_LENGTH': str(len(body)),
+                   'wsgi.input': io.BytesIO(body)}
+        start = time.time()
+        result = []
+        application(environ, lambda status, headers: result.append(status))
+        latency = time.time() - start
+        if not result[0].startswith('200'):
+            raise RuntimeError('Request failed: {0}'.format(result[0]))
+        return latency
+
+    with ThreadPoolExecutor(concurrency) as executor:
+        start = time.time()
+        latencies = list(executor.map(call, (bodies[i % len(bodies)]
+                                             for i in range(request_count))))
+        return time.time() - start, latencies
+
+def run_asgi(bodies, request_count, concurrency):
+    application = ASGIApplication(validate=False)
+
+    async def call(body):
+        messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+        scope = {'type': 'http', 'method': 'POST',
+                 'headers': [(b'content-length', str(len(body)).encode('latin-1'))]}
+        sent = []
+
+        async def receive():
+            return messages.pop()
+
+        async def send(message):
+            sent.append(message)
+
+        start = time.time()
+        await application(scope, receive, send)
+        latency = time.time() - start
+        if sent[0]['status'] != 200:
+            raise RuntimeError('Request failed: {0}'.format(sent[0]['status']))
+        return latency
+
+    async def client(indexes, latencies):
+        for i in indexes:
+            latencies.append(await call(bodies[i % len(bodies)]))
+
+    async def run():
+        latencies = []
+        start = time.time()
+        await asyncio.gather(*[client(range(c, request_count, concurrency), latencies)
+                               for c in range(concurrency)])
+        return time.time() - start, latencies
+
+    return asyncio.get_event_loop().run_until_complete(run())
+
+def report(name, concurrency, elapsed, latencies):
+    latencies = sorted(latencies)
+    print('{0:<6} {1:>11} {2:>12.1f} {3:>9.3f} {4:>9.3f} {5:>9.3f}'.format(
+        name, concurrency, len(latencies) / elapsed, percentile(latencies, 0.5) * 1e3,
+        percentile(latencies, 0.99) * 1e3, latencies[-1] * 1e3))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare the WSGI and ASGI applications.')
+    parser.add_argument('--requests', type=int, default=10000)
+    parser.add_argument('--concurrency', default='1,10,100',
+                        help='comma separated numbers of concurrent clients')
+    parser.add_argument('--io-delay', type=float, default=0.0,
+                        help='milliseconds each skill handler waits')
+    args = parser.parse_args(argv)
+
+    application_id, bodies = make_bodies(1000)
+    io_delay = args.io_delay / 1e3
+
+    print('{0:<6} {1:>11} {2:>12} {3:>9} {4:>9} {5:>9}'.format(
+        'server', 'concurrency', 'requests/s', 'p50 ms', 'p99 ms', 'max ms'))
+    for concurrency in [int(c) for c in args.concurrency.split(',')]:
+        register_skill(application_id, io_delay, is_async=False)
+        report('wsgi', concurrency, *run_wsgi(bodies, args.requests, concurrency))
+
+        register_skill(application_id, io_delay, is_async=True)
+        report('asgi', concurrency, *run_asgi(bodies, args.requests, concurrency))
+
+    RequestDispatcher.clear_skills()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
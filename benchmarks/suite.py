@@ -0,0 +1,194 @@
+'''
+AskAlexa Benchmark Suite
+========================
+
+Micro benchmarks for parsing, validating, dispatching and encoding requests,
+plus the full RequestEventHandler round trip.
+
+Usage::
+
+    python benchmarks/suite.py --save results.json
+    python benchmarks/suite.py --compare results.json --threshold 0.1
+    python benchmarks/suite.py --filter create_from_json
+
+Results are stored as JSON. In compare mode every benchmark that is slower
+than the baseline by more than the threshold is flagged as a regression and
+the exit status is 1.
+'''
+import os
+import sys
+import json
+import time
+import timeit
+import platform
+import argparse
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from askalexa.corpus import CorpusGenerator, DEFAULT_MIX
+from askalexa.dispatcher import RequestDispatcher
+from askalexa.handler import RequestEventHandler
+from askalexa.request import validation, standard
+from askalexa.request.event import AlexaEvent
+from askalexa.response import ResponseBuilder
+from askalexa.skill import Skill
+
+_BENCHMARKS = []
+
+def benchmark(name):
+    '''
+    Register a benchmark. The decorated function does the setup and returns
+    the function to time, or None to skip the benchmark.
+    '''
+    def wrapper(setup):
+        _BENCHMARKS.append((name, setup))
+        return setup
+    return wrapper
+
+def _generator():
+    return CorpusGenerator(None, seed=1, attribute_size=512)
+
+def _register_skill(application_id):
+    RequestDispatcher.clear_skills()
+    skill = Skill(application_id)
+    skill.on_failsafe(lambda event: ResponseBuilder().add_speech('OK', 'Anything else?'))
+    return skill
+
+def _register_create_from_json():
+    for request_type in sorted(DEFAULT_MIX):
+        def setup(request_type=request_type):
+            request_json = _generator().generate_one(request_type)
+            return lambda: AlexaEvent.create_from_json(request_json)
+        benchmark('create_from_json.' + request_type)(setup)
+
+_register_create_from_json()
+
+@benchmark('is_timestamp_valid')
+def bench_timestamp():
+    timestamp = datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ')
+    return lambda: validation.is_timestamp_valid(timestamp)
+
+@benchmark('CertificateValidator.is_valid')
+def bench_certificate():
+    try:
+        from askalexa.replay import TestSigner, TEST_CERTIFICATE_URL
+        signer = TestSigner()
+    except ImportError:
+        # pyOpenSSL is not installed
+        return None
+
+    body = json.dumps(_generator().generate_one(standard.INTENT_REQUEST_TYPE))
+    signature = signer.sign(body)
+    validator = validation.get_validator(TEST_CERTIFICATE_URL)
+    return lambda: validator.is_valid(body, signature)
+
+@benchmark('RequestDispatcher.dispatch_request')
+def bench_dispatch():
+    generator = _generator()
+    _register_skill(generator.application_id)
+    event = AlexaEvent.create_from_json(generator.generate_one(standard.INTENT_REQUEST_TYPE))
+    return lambda: RequestDispatcher.dispatch_request(event)
+
+@benchmark('JsonResponseData.get_json_data')
+def bench_get_json_data():
+    builder = ResponseBuilder()
+    builder.add_speech('Here is the forecast for today.', 'Anything else?')
+    builder.add_standard_card('Forecast', 'Sunny', 'https://example.com/small.png',
+                              'https://example.com/large.png')
+    response = builder._response
+    return response.get_json_data
+
+@benchmark('RequestEventHandler.get_response')
+def bench_round_trip():
+    generator = _generator()
+    _register_skill(generator.application_id)
+    body = json.dumps(generator.generate_one(standard.INTENT_REQUEST_TYPE))
+    return lambda: RequestEventHandler(body).get_response()
+
+def measure(func, min_time=0.2, repeat=5):
+    '''
+    Time the function. The number of calls per repeat is chosen so each
+    repeat takes at least min_time seconds. Returns the results dictionary
+    with times in microseconds per call.
+    '''
+    number = 1
+    while True:
+        elapsed = timeit.timeit(func, number=number)
+        if elapsed >= min_time / 10 or number >= 10 ** 7:
+            break
+        number *= 10
+    number = max(1, int(number * (min_time / max(elapsed, 1e-9)) / 10) * 10 or number)
+
+    times = sorted(t / number * 1e6 for t in timeit.repeat(func, number=number, repeat=repeat))
+    return {'min_us': times[0], 'median_us': times[len(times) // 2], 'max_us': times[-1],
+            'number': number, 'repeat': repeat}
+
+def run(name_filter=None, min_time=0.2, repeat=5):
+    results = {}
+    for name, setup in _BENCHMARKS:
+        if name_filter and name_filter not in name:
+            continue
+
+        func = setup()
+        if func is None:
+            sys.stderr.write('skipped {0}\n'.format(name))
+            continue
+
+        results[name] = measure(func, min_time=min_time, repeat=repeat)
+        sys.stderr.write('{0:<60} {1:>12.2f} us\n'.format(name, results[name]['min_us']))
+
+    RequestDispatcher.clear_skills()
+    return {'created': time.time(), 'python': platform.python_version(),
+            'platform': platform.platform(), 'benchmarks': results}
+
+def compare(results, baseline, threshold):
+    '''
+    Compare the results with the baseline results. Returns a list of
+    (name, baseline us, current us, change) for the regressions.
+    '''
+    regressions = []
+    print('{0:<60} {1:>12} {2:>12} {3:>8}'.format('benchmark', 'baseline us', 'current us',
+                                                  'change'))
+    for name in sorted(results['benchmarks']):
+        current = results['benchmarks'][name]['min_us']
+        previous = baseline['benchmarks'].get(name)
+        if previous is None:
+            print('{0:<60} {1:>12} {2:>12.2f} {3:>8}'.format(name, '-', current, 'new'))
+            continue
+
+        change = current / previous['min_us'] - 1.0
+        flag = ''
+        if change > threshold:
+            flag = '  REGRESSION'
+            regressions.append((name, previous['min_us'], current, change))
+        print('{0:<60} {1:>12.2f} {2:>12.2f} {3:>+7.1%}{4}'.format(
+            name, previous['min_us'], current, change, flag))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run the AskAlexa benchmark suite.')
+    parser.add_argument('--save', help='write the results as JSON to this file')
+    parser.add_argument('--compare', help='baseline results JSON file to compare with')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='relative slowdown that is flagged as a regression')
+    parser.add_argument('--filter', help='only run benchmarks whose name contains this text')
+    parser.add_argument('--min-time', type=float, default=0.2,
+                        help='minimum seconds for each timing repeat')
+    args = parser.parse_args(argv)
+
+    results = run(args.filter, min_time=args.min_time)
+
+    if args.save:
+        with open(args.save, 'w') as results_file:
+            json.dump(results, results_file, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
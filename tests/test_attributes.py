@@ -0,0 +1,104 @@
+import json
+import unittest
+
+import os
+import base64
+
+from askalexa.request.attributes import (AttributesCodec, SessionAttributes, encode_attributes,
+                                         load_request_json)
+
+REQUEST_TEXT = ('{"session": {"attributes": {"count": 1,  "tags": ["a", "b"], '
+                '"name": "x"}}, "request": {}}')
+
+class SessionAttributesTest(unittest.TestCase):
+
+    def test_unchanged_attributes_reuse_original_text(self):
+        attributes = load_request_json(REQUEST_TEXT)['session']['attributes']
+        self.assertIsInstance(attributes, SessionAttributes)
+        self.assertEqual(attributes['count'], 1)
+        self.assertFalse(attributes.is_modified)
+        self.assertEqual(attributes.get_json_text(),
+                         '{"count": 1,  "tags": ["a", "b"], "name": "x"}')
+
+    def test_changed_attributes_round_trip(self):
+        attributes = load_request_json(REQUEST_TEXT)['session']['attributes']
+        attributes['count'] = 2
+        del attributes['name']
+        self.assertTrue(attributes.is_modified)
+        self.assertEqual(json.loads(encode_attributes(attributes)),
+                         {'count': 2, 'tags': ['a', 'b']})
+
+    def test_reading_a_container_marks_it_changed(self):
+        attributes = load_request_json(REQUEST_TEXT)['session']['attributes']
+        attributes['tags'].append('c')
+        self.assertTrue(attributes.is_modified)
+        self.assertEqual(json.loads(attributes.get_json_text())['tags'], ['a', 'b', 'c'])
+
+    def test_snapshot_resets_tracking(self):
+        attributes = SessionAttributes({'a': 1})
+        attributes['b'] = 2
+        text = attributes.snapshot()
+        self.assertFalse(attributes.is_modified)
+        self.assertEqual(attributes.get_json_text(), text)
+
+    def test_attributes_are_a_dict(self):
+        attributes = load_request_json(REQUEST_TEXT)['session']['attributes']
+        self.assertIsInstance(attributes, dict)
+        self.assertEqual(attributes, {'count': 1, 'tags': ['a', 'b'], 'name': 'x'})
+        self.assertEqual(json.loads(json.dumps({'attributes': attributes})),
+                         {'attributes': {'count': 1, 'tags': ['a', 'b'], 'name': 'x'}})
+
+    def test_dict_methods_track_changes(self):
+        changes = [
+            lambda attributes: attributes.update(count=2),
+            lambda attributes: attributes.setdefault('new', 1),
+            lambda attributes: attributes.pop('name'),
+            lambda attributes: attributes.popitem(),
+            lambda attributes: attributes.clear(),
+            lambda attributes: attributes.get('tags').append('c'),
+            lambda attributes: [v for v in attributes.values() if v == ['a', 'b']][0].append('c'),
+            lambda attributes: attributes.copy()['tags'].append('c'),
+        ]
+        for change in changes:
+            attributes = load_request_json(REQUEST_TEXT)['session']['attributes']
+            change(attributes)
+            self.assertTrue(attributes.is_modified)
+            self.assertEqual(json.loads(attributes.get_json_text()), attributes)
+
+    def test_reading_values_does_not_track_changes(self):
+        attributes = load_request_json(REQUEST_TEXT)['session']['attributes']
+        self.assertEqual(attributes.get('count'), 1)
+        self.assertEqual(attributes.get('missing', 2), 2)
+        self.assertEqual(attributes.setdefault('name', 'y'), 'x')
+        self.assertEqual(sorted(attributes.keys()), ['count', 'name', 'tags'])
+        self.assertIn('name', attributes)
+        self.assertFalse(attributes.is_modified)
+
+    def test_attributes_outside_the_session_are_ignored(self):
+        request_json = load_request_json('{"request": {"attributes": {"a": 1}}}')
+        self.assertEqual(request_json['request']['attributes'], {'a': 1})
+
+class AttributesCodecTest(unittest.TestCase):
+
+    def test_pack_and_unpack(self):
+        codec = AttributesCodec(threshold=10)
+        json_text = json.dumps({'text': 'abc' * 100})
+        envelope = codec.pack(json_text)
+        self.assertTrue(codec.is_envelope(json.loads(envelope)))
+        self.assertEqual(codec.unpack(json.loads(envelope)[codec.key]), json_text)
+
+    def test_incompressible_text_is_returned_unchanged(self):
+        codec = AttributesCodec(threshold=10)
+        json_text = json.dumps({'noise': base64.b64encode(os.urandom(64)).decode('ascii')})
+        packed = codec.pack(json_text)
+        self.assertIs(packed, json_text)
+
+    def test_packed_session_attributes_round_trip(self):
+        codec = AttributesCodec(threshold=10)
+        attributes = SessionAttributes({'text': 'abc' * 100})
+        attributes.codec = codec
+        envelope = SessionAttributes(json.loads(attributes.get_json_text()))
+        envelope.codec = codec
+        self.assertTrue(envelope.is_packed)
+        self.assertEqual(dict(envelope), {'text': 'abc' * 100})
+        self.assertEqual(json.loads(json.dumps(envelope)), {'text': 'abc' * 100})
@@ -0,0 +1,45 @@
+import unittest
+
+from askalexa.exceptions import InvalidTokenError, ResponseSizeError
+from askalexa.response.audio import StreamState, StreamTokenCodec
+
+class StreamTokenCodecTest(unittest.TestCase):
+
+    def setUp(self):
+        self.codec = StreamTokenCodec('secret')
+
+    def test_round_trip(self):
+        token = self.codec.encode(u'track-\xe9', position=3, playlist_id='list', user_id='user')
+        self.assertEqual(self.codec.decode(token), StreamState(
+            track_id=u'track-\xe9', position=3, playlist_id=u'list', user_id=u'user'))
+
+    def test_tampered_token(self):
+        token = self.codec.encode('track-1', position=3)
+        for i in range(len(token)):
+            changed = token[:i] + ('A' if token[i] != 'A' else 'B') + token[i + 1:]
+            try:
+                state = self.codec.decode(changed)
+            except InvalidTokenError:
+                continue
+            # the last character may only hold padding bits
+            self.assertEqual(i, len(token) - 1)
+            self.assertEqual(state, self.codec.decode(token))
+
+    def test_other_secret(self):
+        token = StreamTokenCodec('other').encode('track-1')
+        self.assertRaises(InvalidTokenError, self.codec.decode, token)
+
+    def test_invalid_tokens(self):
+        for token in ('', 'abc', '!!!!', u'\xe9\xe9\xe9\xe9', 'x' * 40):
+            self.assertRaises(InvalidTokenError, self.codec.decode, token)
+
+    def test_position_out_of_range(self):
+        self.assertRaises(ValueError, self.codec.encode, 'track-1', position=-1)
+        self.assertRaises(ValueError, self.codec.encode, 'track-1', position=2 ** 32)
+
+    def test_token_limit(self):
+        self.assertRaises(ResponseSizeError, self.codec.encode, 'x' * 2000)
+        self.assertRaises(ResponseSizeError, self.codec.encode, 'x' * 70000)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import threading
+import time
+import unittest
+
+from askalexa.bulkhead import Bulkhead
+
+class BulkheadTest(unittest.TestCase):
+
+    def start_waiter(self, bulkhead, results, name):
+        def wait():
+            results.append((name, bulkhead.acquire()))
+
+        waiting = bulkhead.waiting + 1
+        thread = threading.Thread(target=wait)
+        thread.start()
+        while bulkhead.waiting < waiting:
+            time.sleep(0.001)
+        self.threads.append(thread)
+        return thread
+
+    def setUp(self):
+        self.threads = []
+
+    def tearDown(self):
+        for thread in self.threads:
+            thread.join(5)
+
+    def test_accept_and_shed(self):
+        bulkhead = Bulkhead(max_concurrent=2)
+        self.assertTrue(bulkhead.acquire())
+        self.assertTrue(bulkhead.acquire())
+        self.assertFalse(bulkhead.acquire())
+        self.assertEqual(bulkhead.in_flight, 2)
+
+        bulkhead.release()
+        self.assertEqual(bulkhead.in_flight, 1)
+        self.assertTrue(bulkhead.acquire())
+        self.assertEqual(bulkhead.get_stats(), {
+            'max_concurrent': 2, 'in_flight': 2, 'waiting': 0, 'accepted': 3, 'shed': 1})
+
+    def test_queue_timeout(self):
+        bulkhead = Bulkhead(max_concurrent=1, max_queue=1, queue_timeout=0.01)
+        self.assertTrue(bulkhead.acquire())
+        self.assertFalse(bulkhead.acquire())
+        self.assertEqual(bulkhead.waiting, 0)
+        self.assertEqual(bulkhead.shed_count, 1)
+
+        bulkhead.release()
+        self.assertEqual(bulkhead.in_flight, 0)
+        self.assertTrue(bulkhead.acquire())
+
+    def test_full_queue_sheds(self):
+        bulkhead = Bulkhead(max_concurrent=1, max_queue=1)
+        results = []
+        self.assertTrue(bulkhead.acquire())
+        self.start_waiter(bulkhead, results, 'first')
+        self.assertFalse(bulkhead.acquire())
+
+        bulkhead.release()
+        self.threads[0].join(5)
+        self.assertEqual(results, [('first', True)])
+        self.assertEqual(bulkhead.in_flight, 1)
+
+    def test_waiters_are_served_in_order(self):
+        bulkhead = Bulkhead(max_concurrent=1, max_queue=3)
+        results = []
+        self.assertTrue(bulkhead.acquire())
+        for name in ('first', 'second', 'third'):
+            self.start_waiter(bulkhead, results, name)
+
+        for thread in self.threads:
+            bulkhead.release()
+            thread.join(5)
+        self.assertEqual(results, [('first', True), ('second', True), ('third', True)])
+        self.assertEqual(bulkhead.in_flight, 1)
+        self.assertEqual(bulkhead.accepted_count, 4)
+
+    def test_new_request_does_not_skip_the_queue(self):
+        bulkhead = Bulkhead(max_concurrent=1, max_queue=1, queue_timeout=1)
+        results = []
+        self.assertTrue(bulkhead.acquire())
+        self.start_waiter(bulkhead, results, 'first')
+
+        bulkhead.release()
+        bulkhead.queue_timeout = 0.01
+        self.assertFalse(bulkhead.acquire())
+        self.threads[0].join(5)
+        self.assertEqual(results, [('first', True)])
+        self.assertEqual(bulkhead.in_flight, 1)
+
+if __name__ == '__main__':
+    unittest.main()
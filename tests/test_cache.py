@@ -0,0 +1,170 @@
+import logging
+import threading
+import time
+import unittest
+
+from askalexa import cache
+from askalexa.cache import DataCache, LRUCache, TTLCache
+
+class ClockTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 100.0
+        self.clock = cache.clock
+        cache.clock = lambda: self.now
+
+    def tearDown(self):
+        cache.clock = self.clock
+
+class LRUCacheTest(unittest.TestCase):
+
+    def test_eviction(self):
+        lru = LRUCache(2)
+        lru.set('a', 1)
+        lru.set('b', 2)
+        self.assertEqual(lru.get('a'), 1)
+        self.assertEqual(lru.set('c', 3), [('b', 2)])
+        self.assertEqual(len(lru), 2)
+        self.assertNotIn('b', lru)
+
+class TTLCacheTest(ClockTestCase):
+
+    def test_expiry(self):
+        ttl_cache = TTLCache(10, ttl=5.0)
+        ttl_cache.set('a', 1)
+        ttl_cache.set('b', 2, ttl=20.0)
+        self.now += 4.0
+        self.assertEqual(ttl_cache.get('a'), 1)
+        self.now += 1.0
+        self.assertEqual(ttl_cache.get('a'), None)
+        self.assertNotIn('a', ttl_cache)
+        self.assertEqual(ttl_cache.get('b'), 2)
+
+    def test_get_or_fill(self):
+        ttl_cache = TTLCache(10, ttl=5.0)
+        calls = []
+
+        def fill():
+            calls.append(1)
+            return len(calls)
+
+        self.assertEqual(ttl_cache.get_or_fill('a', fill), 1)
+        self.assertEqual(ttl_cache.get_or_fill('a', fill), 1)
+        self.now += 5.0
+        self.assertEqual(ttl_cache.get_or_fill('a', fill), 2)
+
+    def test_fill_error_is_not_cached(self):
+        ttl_cache = TTLCache(10, ttl=5.0)
+
+        def fail():
+            raise IOError('down')
+
+        self.assertRaises(IOError, ttl_cache.get_or_fill, 'a', fail)
+        self.assertEqual(ttl_cache.get_or_fill('a', lambda: 1), 1)
+
+    def test_single_flight(self):
+        ttl_cache = TTLCache(10, ttl=5.0)
+        started = threading.Event()
+        finish = threading.Event()
+        calls = []
+        results = []
+
+        def fill():
+            calls.append(1)
+            started.set()
+            finish.wait(5)
+            return 'value'
+
+        def get():
+            results.append(ttl_cache.get_or_fill('a', fill))
+
+        threads = [threading.Thread(target=get) for _ in range(4)]
+        threads[0].start()
+        started.wait(5)
+        for thread in threads[1:]:
+            thread.start()
+        # let the other threads reach the fill that is running
+        time.sleep(0.05)
+        finish.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ['value'] * 4)
+
+class DataCacheTest(ClockTestCase):
+
+    def test_expiry(self):
+        data_cache = DataCache(10, ttl=5.0)
+        self.assertEqual(data_cache.get_or_fill('a', lambda: 1), 1)
+        self.assertEqual(data_cache.get_or_fill('a', lambda: 2), 1)
+        self.now += 5.0
+        self.assertEqual(data_cache.get_or_fill('a', lambda: 3), 3)
+
+        stats = data_cache.get_stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['stale_hits']), (1, 2, 0))
+
+    def test_stale_while_revalidate(self):
+        data_cache = DataCache(10, ttl=5.0, stale_ttl=10.0)
+        data_cache.set('a', 1)
+        refreshed = threading.Event()
+
+        def fill():
+            refreshed.set()
+            return 2
+
+        self.now += 6.0
+        self.assertEqual(data_cache.get_or_fill('a', fill), 1)
+        self.assertTrue(refreshed.wait(5))
+        while data_cache._refreshing:
+            time.sleep(0.001)
+        self.assertEqual(data_cache.get_or_fill('a', fill), 2)
+        self.assertEqual(data_cache.get_stats()['stale_hits'], 1)
+
+        # past the stale ttl the value is filled again before it is returned
+        self.now += 20.0
+        self.assertEqual(data_cache.get_or_fill('a', lambda: 3), 3)
+
+    def test_refresh_error_keeps_stale_value(self):
+        data_cache = DataCache(10, ttl=5.0, stale_ttl=10.0)
+        data_cache.set('a', 1)
+
+        def fail():
+            raise IOError('down')
+
+        self.now += 6.0
+        logging.disable(logging.CRITICAL)
+        try:
+            for errors in (1, 2):
+                self.assertEqual(data_cache.get_or_fill('a', fail), 1)
+                while data_cache._refreshing or \
+                        data_cache.get_stats()['refresh_errors'] < errors:
+                    time.sleep(0.001)
+        finally:
+            logging.disable(logging.NOTSET)
+
+    def test_max_memory(self):
+        data_cache = DataCache(10, max_memory=100, size_func=len)
+        data_cache.set('a', 'x' * 60)
+        data_cache.set('b', 'x' * 30)
+        self.assertEqual(data_cache.memory, 90)
+
+        data_cache.set('c', 'x' * 20)
+        self.assertEqual(data_cache.memory, 50)
+        self.assertEqual(data_cache.pop('a'), None)
+
+        # a value over max_memory on its own is not cached
+        data_cache.set('d', 'x' * 200)
+        self.assertEqual(data_cache.pop('d'), None)
+        self.assertEqual(data_cache.get_stats()['evictions'], 1)
+
+    def test_max_size(self):
+        data_cache = DataCache(2)
+        for key in 'abc':
+            data_cache.set(key, key)
+        self.assertEqual(len(data_cache), 2)
+        self.assertEqual(data_cache.pop('a'), None)
+        self.assertEqual(data_cache.memory, 0)
+
+if __name__ == '__main__':
+    unittest.main()
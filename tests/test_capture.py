@@ -0,0 +1,131 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from askalexa import instrumentation
+from askalexa.capture import CaptureBuffer, CaptureReader
+from askalexa.corpus import CorpusGenerator
+from askalexa.dispatcher import RequestDispatcher
+from askalexa.handler import RequestEventHandler
+from askalexa.response.builder import ResponseBuilder
+from askalexa.skill import Skill
+
+class CaptureBufferTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'alexa.capture')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, buffer, count, start=1):
+        for i in range(start, start + count):
+            buffer.write(u'{{"request": {0}}}'.format(i), u'{{"response": {0}}}'.format(i))
+
+    def test_round_trip(self):
+        timer = instrumentation.StageTimer()
+        timer.lap(instrumentation.PARSE)
+        timer.lap(instrumentation.HANDLER)
+
+        buffer = CaptureBuffer(self.path, slot_count=4)
+        buffer.write(u'{"request": "\xe9"}', b'{"response": 1}', timer)
+        buffer.close()
+
+        records = list(CaptureReader(self.path))
+        self.assertEqual(len(records), 1)
+        record = records[0]
+        self.assertEqual(record.sequence, 1)
+        self.assertEqual(record.request_data, u'{"request": "\xe9"}'.encode('utf-8'))
+        self.assertEqual(record.response_data, b'{"response": 1}')
+        self.assertEqual([stage for stage, _ in record.durations],
+                         [instrumentation.PARSE, instrumentation.HANDLER])
+        self.assertFalse(record.truncated)
+
+    def test_wraparound(self):
+        buffer = CaptureBuffer(self.path, slot_count=3)
+        self.write(buffer, 5)
+        buffer.close()
+
+        records = list(CaptureReader(self.path))
+        self.assertEqual([record.sequence for record in records], [3, 4, 5])
+        self.assertEqual(records[-1].request_data, b'{"request": 5}')
+
+    def test_reopen_continues_the_sequence(self):
+        buffer = CaptureBuffer(self.path, slot_count=3)
+        self.write(buffer, 2)
+        buffer.close()
+
+        buffer = CaptureBuffer(self.path, slot_count=3)
+        self.write(buffer, 2, start=3)
+        buffer.close()
+        self.assertEqual([record.sequence for record in CaptureReader(self.path)], [2, 3, 4])
+
+        # a different layout starts over
+        buffer = CaptureBuffer(self.path, slot_count=2)
+        buffer.close()
+        self.assertEqual(list(CaptureReader(self.path)), [])
+
+    def test_truncated(self):
+        buffer = CaptureBuffer(self.path, slot_size=512, slot_count=2)
+        buffer.write(b'x' * 1000, b'y' * 10)
+        buffer.close()
+
+        record = list(CaptureReader(self.path))[0]
+        self.assertTrue(record.truncated)
+        self.assertTrue(len(record.request_data) < 512)
+        self.assertEqual(record.response_data, b'')
+
+    def test_export_jsonl(self):
+        buffer = CaptureBuffer(self.path, slot_count=4)
+        self.write(buffer, 2)
+        buffer.close()
+
+        output_path = os.path.join(self.directory, 'captures.jsonl')
+        self.assertEqual(CaptureReader(self.path).export_jsonl(output_path), 2)
+        with open(output_path) as output_file:
+            lines = [json.loads(line) for line in output_file]
+        self.assertEqual([line['request'] for line in lines],
+                         ['{"request": 1}', '{"request": 2}'])
+
+    def test_not_a_capture_file(self):
+        with open(self.path, 'wb') as capture_file:
+            capture_file.write(b'\0' * 64)
+        self.assertRaises(ValueError, list, CaptureReader(self.path))
+
+class HandlerCaptureTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'alexa.capture')
+        RequestEventHandler.capture = CaptureBuffer(self.path, slot_count=4)
+
+        self.generator = CorpusGenerator(None, seed=1)
+        self.skill = Skill(self.generator.application_id)
+        self.skill.on_launch(lambda event: ResponseBuilder().add_speech('Hello'))
+
+    def tearDown(self):
+        RequestEventHandler.capture.close()
+        RequestEventHandler.capture = None
+        RequestDispatcher.remove_skill(self.skill)
+        shutil.rmtree(self.directory)
+
+    def test_request_is_captured(self):
+        request_text = json.dumps(self.generator.generate_one('LaunchRequest'))
+        response_text = RequestEventHandler(request_text).get_response()
+
+        records = list(CaptureReader(self.path))
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0].request_data.decode('utf-8'), request_text)
+        self.assertEqual(records[0].response_data.decode('utf-8'), response_text)
+
+    def test_decoded_request_is_not_captured(self):
+        request_json = self.generator.generate_one('LaunchRequest')
+        response_text = RequestEventHandler.create_from_json(request_json).get_response()
+        self.assertIn('Hello', response_text)
+        self.assertEqual(list(CaptureReader(self.path)), [])
+
+if __name__ == '__main__':
+    unittest.main()
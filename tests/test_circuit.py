@@ -0,0 +1,125 @@
+import unittest
+
+from askalexa import circuit
+from askalexa.circuit import CircuitBreaker, CLOSED, HALF_OPEN, OPEN
+from askalexa.exceptions import CircuitOpenError
+
+def fail():
+    raise IOError('down')
+
+def degraded(event, name):
+    return 'degraded {0}'.format(name)
+
+class CircuitBreakerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.breaker = CircuitBreaker('backend', failure_threshold=2, reset_timeout=60.0,
+                                      exceptions=(IOError,))
+
+    def open_circuit(self):
+        for _ in range(2):
+            self.assertRaises(IOError, self.breaker.call, fail)
+        self.assertEqual(self.breaker.state, OPEN)
+        # let the reset timeout pass
+        self.breaker.reset_timeout = 0.0
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+
+    def test_opens_after_threshold(self):
+        self.assertRaises(IOError, self.breaker.call, fail)
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertRaises(IOError, self.breaker.call, fail)
+        self.assertEqual(self.breaker.state, OPEN)
+
+        self.assertRaises(CircuitOpenError, self.breaker.call, lambda: 'ok')
+        self.assertEqual(self.breaker.get_stats(), {
+            'state': OPEN, 'success': 0, 'failure': 2, 'timeout': 0, 'rejected': 1})
+
+    def test_success_resets_failures(self):
+        self.assertRaises(IOError, self.breaker.call, fail)
+        self.assertEqual(self.breaker.call(lambda: 'ok'), 'ok')
+        self.assertRaises(IOError, self.breaker.call, fail)
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    def test_other_exceptions_are_not_failures(self):
+        for _ in range(3):
+            self.assertRaises(KeyError, self.breaker.call, {}.__getitem__, 'key')
+        self.assertEqual(self.breaker.state, CLOSED)
+
+        breaker = CircuitBreaker('backend', failure_threshold=1)
+        self.assertRaises(IOError, breaker.call, fail)
+        self.assertEqual(breaker.state, CLOSED)
+
+    def test_timeout_is_failure(self):
+        breaker = CircuitBreaker('backend', failure_threshold=1, timeout=0.5)
+        breaker.record_success(0.1)
+        self.assertEqual(breaker.state, CLOSED)
+        breaker.record_success(1.0)
+        self.assertEqual(breaker.state, OPEN)
+        self.assertEqual(breaker.get_stats()['timeout'], 1)
+
+    def test_half_open_allows_one_trial(self):
+        self.open_circuit()
+        self.assertTrue(self.breaker.allow())
+        self.assertFalse(self.breaker.allow())
+
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertTrue(self.breaker.allow())
+        self.assertTrue(self.breaker.allow())
+
+    def test_failed_trial_opens(self):
+        self.open_circuit()
+        self.breaker.reset_timeout = 60.0
+        self.assertRaises(IOError, self.breaker.call, fail)
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertFalse(self.breaker.allow())
+
+    def test_reset(self):
+        self.open_circuit()
+        self.assertTrue(self.breaker.allow())
+        self.breaker.reset()
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertTrue(self.breaker.allow())
+
+class CallHandlerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.breaker = CircuitBreaker('backend', failure_threshold=1, reset_timeout=0.0,
+                                      exceptions=(IOError,))
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+
+    def test_trial_handler_uses_its_circuit(self):
+        breaker = self.breaker
+
+        def handler(event):
+            # the handler is the trial call, so a second call is rejected
+            self.assertFalse(breaker.allow())
+            with breaker.guard():
+                return 'ok'
+
+        self.assertEqual(circuit.call_handler(handler, None, [breaker], degraded), 'ok')
+        self.assertEqual(breaker.state, CLOSED)
+
+    def test_failed_trial_handler(self):
+        self.assertEqual(circuit.call_handler(lambda event: fail(), None, [self.breaker],
+                                              degraded), 'degraded backend')
+        self.breaker.reset_timeout = 60.0
+        self.assertEqual(self.breaker.state, OPEN)
+
+    def test_unrecorded_trial_is_ended(self):
+        def handler(event):
+            raise KeyError('bug')
+
+        self.assertRaises(KeyError, circuit.call_handler, handler, None, [self.breaker],
+                          degraded)
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.assertTrue(self.breaker.allow())
+
+    def test_rejected_while_trial_runs(self):
+        self.assertTrue(self.breaker.allow())
+        self.assertEqual(circuit.call_handler(lambda event: 'ok', None, [self.breaker],
+                                              degraded), 'degraded backend')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,160 @@
+import io
+import json
+import logging
+import threading
+import unittest
+
+from askalexa.bulkhead import Bulkhead
+from askalexa.compat import PY2
+from askalexa.corpus import CorpusGenerator
+from askalexa.dispatcher import RequestDispatcher
+from askalexa.exceptions import InvalidResponseError
+from askalexa.handler import RequestEventHandler
+from askalexa.profiling import SamplingProfiler
+from askalexa.request.event import AlexaEvent
+from askalexa.response.builder import ResponseBuilder
+from askalexa.skill import Skill
+from askalexa.wsgi import WSGIApplication
+
+if not PY2:
+    import asyncio
+
+    # coroutine functions are a syntax error on python 2
+    exec('async def launch(event):\n'
+         '    await asyncio.sleep(0)\n'
+         '    return ResponseBuilder()\n')
+
+class Started(object):
+    '''
+    An awaitable that records that it was awaited.
+    '''
+
+    def __init__(self):
+        self.awaited = False
+
+    def __await__(self):
+        self.awaited = True
+        return iter(())
+
+@unittest.skipIf(PY2, 'coroutine handlers need python 3')
+class CoroutineHandlerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.generator = CorpusGenerator(None, seed=1)
+        self.skill = Skill(self.generator.application_id)
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+        RequestDispatcher.remove_skill(self.skill)
+
+    def create_event(self, request_type='LaunchRequest'):
+        return AlexaEvent.create_from_json(self.generator.generate_one(request_type))
+
+    def test_bulkhead_is_held_until_the_handler_is_done(self):
+        self.skill.bulkhead = Bulkhead(max_concurrent=1)
+        self.skill.on_launch(lambda event: asyncio.sleep(0.01, result=ResponseBuilder()))
+
+        awaitable = self.skill.get_response(self.create_event(), allow_coroutines=True)
+        self.assertEqual(self.skill.bulkhead.in_flight, 1)
+        self.assertIsInstance(self.loop.run_until_complete(awaitable), ResponseBuilder)
+        self.assertEqual(self.skill.bulkhead.in_flight, 0)
+
+    def test_handler_is_profiled_until_it_is_done(self):
+        self.skill.profiler = SamplingProfiler(rate=1.0)
+        self.skill.on_launch(lambda event: asyncio.sleep(0.01, result=ResponseBuilder()))
+
+        awaitable = self.skill.get_response(self.create_event(), allow_coroutines=True)
+        self.assertEqual(self.skill.profiler.profiled_count, 0)
+        self.loop.run_until_complete(awaitable)
+        self.assertEqual(self.skill.profiler.profiled_count, 1)
+        self.assertIn('sleep', ''.join(map(str, self.skill.profiler.get_stats().stats)))
+
+    def test_session_started_coroutine_is_awaited(self):
+        started = Started()
+        self.skill.on_session_started(lambda event: started)
+        self.skill.on_launch(lambda event: ResponseBuilder())
+
+        event = self.create_event()
+        self.assertTrue(event.session.is_new)
+        response = self.skill.get_response(event, allow_coroutines=True)
+        self.assertFalse(started.awaited)
+        self.assertIsInstance(self.loop.run_until_complete(response), ResponseBuilder)
+        self.assertTrue(started.awaited)
+
+    def test_plain_handlers_run_in_the_executor(self):
+        from askalexa.asgi import ASGIApplication
+
+        threads = []
+        def launch(event):
+            threads.append(threading.current_thread())
+            return ResponseBuilder().add_speech('Hello')
+
+        self.skill.on_launch(launch)
+        body = json.dumps(self.create_request()).encode('utf-8')
+        messages = [{'type': 'http.request', 'body': body}]
+        sent = []
+
+        def receive():
+            return asyncio.sleep(0, result=messages.pop(0))
+
+        def send(message):
+            sent.append(message)
+            return asyncio.sleep(0)
+
+        scope = {'type': 'http', 'method': 'POST', 'headers': []}
+        self.loop.run_until_complete(ASGIApplication(validate=False)(scope, receive, send))
+        self.assertEqual(sent[0]['status'], 200)
+        self.assertIsNot(threads[0], threading.current_thread())
+
+    def test_wsgi_rejects_coroutine_handlers(self):
+        self.skill.bulkhead = Bulkhead(max_concurrent=2)
+        application = WSGIApplication(validate=False)
+        body = json.dumps(self.create_request()).encode('utf-8')
+        environ = {'REQUEST_METHOD': 'POST', 'CONTENT_LENGTH': str(len(body))}
+
+        logging.disable(logging.CRITICAL)
+        try:
+            for handler in (launch, lambda event: asyncio.sleep(0, result=ResponseBuilder())):
+                self.skill.on_launch(handler)
+                for _ in range(3):
+                    environ['wsgi.input'] = io.BytesIO(body)
+                    status, _ = application.handle(environ)
+                    self.assertEqual(status, 500)
+                    self.assertEqual(self.skill.bulkhead.in_flight, 0)
+        finally:
+            logging.disable(logging.NOTSET)
+
+    def test_encode_response_closes_awaitables(self):
+        self.skill.bulkhead = Bulkhead(max_concurrent=1)
+        self.skill.on_launch(launch)
+
+        handler = RequestEventHandler(json.dumps(self.create_request()))
+        event, skill = handler.dispatch()
+        awaitable = skill.get_response(event, allow_coroutines=True)
+        self.assertEqual(self.skill.bulkhead.in_flight, 1)
+        self.assertRaises(InvalidResponseError, handler.encode_response, event, awaitable)
+        self.assertEqual(self.skill.bulkhead.in_flight, 0)
+
+    def test_cancelled_executor_call_closes_the_response(self):
+        from askalexa.asgi import _ExecutorCall
+
+        self.skill.bulkhead = Bulkhead(max_concurrent=1)
+        self.skill.on_launch(launch)
+
+        call = _ExecutorCall(self.skill, self.create_event())
+        call()
+        self.assertEqual(self.skill.bulkhead.in_flight, 1)
+        call.cancel()
+        self.assertEqual(self.skill.bulkhead.in_flight, 0)
+
+        # cancelled before the response was returned
+        call = _ExecutorCall(self.skill, self.create_event())
+        call.cancel()
+        self.assertIsNone(call())
+        self.assertEqual(self.skill.bulkhead.in_flight, 0)
+
+    def create_request(self):
+        request_json = self.generator.generate_one('LaunchRequest')
+        request_json['session']['new'] = True
+        return request_json
@@ -0,0 +1,30 @@
+import json
+import unittest
+
+from askalexa import instrumentation
+from askalexa.handler import RequestEventHandler
+
+def forged_request(index):
+    return json.dumps({'version': '1.0',
+                       'session': {'application': {'applicationId': 'app-{0}'.format(index)}},
+                       'request': {'type': 'Type{0}'.format(index), 'requestId': 'id',
+                                   'timestamp': '2001-01-01T00:00:00Z', 'locale': 'en-US'}})
+
+class ValidationFailureTest(unittest.TestCase):
+
+    def setUp(self):
+        self.sink = instrumentation.HistogramSink()
+        instrumentation.enable(self.sink)
+
+    def tearDown(self):
+        instrumentation.remove_sink(self.sink)
+
+    def test_failures_are_recorded_under_one_key(self):
+        for index in range(20):
+            handler = RequestEventHandler(forged_request(index))
+            self.assertFalse(handler.is_request_valid('https://example.com/cert.pem', 'x'))
+
+        keys = set(key for key, _ in self.sink.items())
+        self.assertEqual(keys, set([(instrumentation.PARSE, None, None, None),
+                                    (instrumentation.VALIDATE_TIMESTAMP, None, None, None)]))
+        self.assertEqual(self.sink.get(instrumentation.PARSE).count, 20)
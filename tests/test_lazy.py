@@ -0,0 +1,55 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+PACKAGE_INIT = '''
+from askalexa.lazy import make_lazy
+
+make_lazy(__name__, {'Thing': 'lazytestpkg.thing'})
+'''
+
+class LazyModuleTest(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        package_path = os.path.join(self.path, 'lazytestpkg')
+        os.mkdir(package_path)
+        self.write(package_path, '__init__.py', PACKAGE_INIT)
+        self.write(package_path, 'thing.py', 'import lazy_test_missing_dependency\nThing = 1\n')
+        self.write(package_path, 'other.py', 'import lazy_test_missing_dependency\n')
+        sys.path.insert(0, self.path)
+
+    def tearDown(self):
+        sys.path.remove(self.path)
+        for name in list(sys.modules):
+            if name.startswith('lazytestpkg'):
+                del sys.modules[name]
+        shutil.rmtree(self.path)
+
+    def write(self, path, name, text):
+        with open(os.path.join(path, name), 'w') as module_file:
+            module_file.write(text)
+
+    def test_missing_submodule_is_an_attribute_error(self):
+        import lazytestpkg
+        self.assertRaises(AttributeError, getattr, lazytestpkg, 'missing')
+        self.assertFalse(hasattr(lazytestpkg, 'missing'))
+
+    def test_import_errors_of_exports_are_kept(self):
+        try:
+            from lazytestpkg import Thing
+        except ImportError as e:
+            self.assertIn('lazy_test_missing_dependency', str(e))
+        else:
+            self.fail('ImportError not raised')
+
+    def test_import_errors_of_submodules_are_kept(self):
+        import lazytestpkg
+        try:
+            lazytestpkg.other
+        except ImportError as e:
+            self.assertIn('lazy_test_missing_dependency', str(e))
+        else:
+            self.fail('ImportError not raised')
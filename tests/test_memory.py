@@ -0,0 +1,117 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from askalexa import instrumentation, memory
+from askalexa.corpus import CorpusGenerator
+from askalexa.dispatcher import RequestDispatcher
+from askalexa.handler import RequestEventHandler
+from askalexa.memory import MemoryProfiler, MemoryStageTimer, compare_reports
+from askalexa.response.builder import ResponseBuilder
+from askalexa.skill import Skill
+
+def create_report(peak):
+    return {'requests': [{'request_type': 'LaunchRequest', 'intent': None, 'count': 1,
+                          'retained_bytes_mean': 0,
+                          'stages': {'parse': {'retained_bytes_mean': 0, 'peak_bytes_mean': peak,
+                                               'peak_bytes_max': peak}}}],
+            'survivors': []}
+
+@unittest.skipIf(memory.tracemalloc is None, 'tracemalloc is not available')
+class MemoryProfilerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.profiler = MemoryProfiler()
+        self.profiler.start()
+
+    def tearDown(self):
+        self.profiler.stop()
+        shutil.rmtree(self.directory)
+
+    def test_stage_timer(self):
+        timer = MemoryStageTimer()
+        data = [object() for _ in range(10000)]
+        timer.lap(instrumentation.PARSE)
+        del data
+        timer.lap(instrumentation.HANDLER)
+
+        (parse, parse_retained, parse_peak), (handler, handler_retained, _) = timer.allocations
+        self.assertEqual((parse, handler), (instrumentation.PARSE, instrumentation.HANDLER))
+        self.assertGreater(parse_retained, 100000)
+        self.assertGreaterEqual(parse_peak, parse_retained)
+        self.assertLess(handler_retained, 0)
+        self.assertEqual([stage for stage, _ in timer.durations],
+                         [instrumentation.PARSE, instrumentation.HANDLER])
+
+    def test_record_and_report(self):
+        for size in (1000, 3000):
+            timer = self.profiler.start_timer()
+            timer.tags[instrumentation.REQUEST_TYPE] = 'IntentRequest'
+            timer.tags[instrumentation.INTENT_NAME] = 'PlayIntent'
+            data = [object() for _ in range(size)]
+            timer.lap(instrumentation.HANDLER)
+            self.profiler.record(timer)
+            del data
+        self.profiler.record(instrumentation.StageTimer())
+
+        report = self.profiler.get_report()
+        self.assertEqual(len(report['requests']), 1)
+        request = report['requests'][0]
+        self.assertEqual((request['request_type'], request['intent'], request['count']),
+                         ('IntentRequest', 'PlayIntent', 2))
+        stage = request['stages'][instrumentation.HANDLER]
+        self.assertGreater(stage['peak_bytes_max'], stage['peak_bytes_mean'])
+        self.assertIn('IntentRequest / PlayIntent', self.profiler.format_report())
+
+        path = os.path.join(self.directory, 'memory.json')
+        self.profiler.write_report(path)
+        with open(path) as report_file:
+            self.assertEqual(json.load(report_file), json.loads(json.dumps(report)))
+
+        self.profiler.reset()
+        self.assertEqual(self.profiler.get_report(), {'requests': [], 'survivors': []})
+
+    def test_handler_requests(self):
+        generator = CorpusGenerator(None, seed=1)
+        survivors = []
+        skill = Skill(generator.application_id)
+        skill.on_launch(lambda event: survivors.append([object() for _ in range(1000)])
+                        or ResponseBuilder().add_speech('Hello'))
+
+        profiler = MemoryProfiler(track_survivors=True)
+        RequestEventHandler.memory_profiler = profiler
+        try:
+            for _ in range(3):
+                RequestEventHandler(json.dumps(generator.generate_one('LaunchRequest'))).get_response()
+        finally:
+            RequestEventHandler.memory_profiler = None
+            RequestDispatcher.remove_skill(skill)
+
+        report = profiler.get_report()
+        self.assertEqual([(data['request_type'], data['count']) for data in report['requests']],
+                         [('LaunchRequest', 3)])
+        self.assertIn(instrumentation.HANDLER, report['requests'][0]['stages'])
+        self.assertTrue(any(survivor['location'].startswith(__file__.rstrip('c'))
+                            for survivor in report['survivors']))
+
+class CompareReportsTest(unittest.TestCase):
+
+    def test_growth(self):
+        self.assertEqual(compare_reports(create_report(1000), create_report(1200)),
+                         [('LaunchRequest', 'parse', 1000, 1200)])
+
+    def test_within_threshold(self):
+        self.assertEqual(compare_reports(create_report(1000), create_report(1050)), [])
+        self.assertEqual(compare_reports(create_report(1000), create_report(1050), threshold=0.01),
+                         [('LaunchRequest', 'parse', 1000, 1050)])
+
+    def test_new_requests_are_ignored(self):
+        report = create_report(5000)
+        report['requests'][0]['request_type'] = 'IntentRequest'
+        self.assertEqual(compare_reports(create_report(1000), report), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+
+from askalexa import instrumentation, metrics
+
+class MetricsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = metrics.MetricsRegistry()
+
+    def test_render_with_missing_labels(self):
+        counter = self.registry.counter('requests_total', 'Requests.', ('application_id', 'intent'))
+        counter.inc('app', None)
+        counter.inc(None, 'Intent')
+        counter.inc('app', 'Intent')
+        text = self.registry.render()
+        self.assertIn('requests_total{intent="Intent"} 1', text)
+        self.assertIn('requests_total{application_id="app"} 1', text)
+        self.assertIn('requests_total{application_id="app",intent="Intent"} 1', text)
+
+    def test_series_are_bounded(self):
+        histogram = self.registry.histogram('duration_seconds', 'Duration.', ('intent',),
+                                            max_series=3)
+        for index in range(10):
+            histogram.observe(0.01, 'Intent{0}'.format(index))
+
+        text = self.registry.render()
+        self.assertIn('duration_seconds_count{intent="other"} 7', text)
+        self.assertNotIn('Intent3', text)
+
+    def test_validation_failures_have_no_labels(self):
+        sink = metrics.MetricsSink(self.registry)
+        timer = instrumentation.StageTimer()
+        timer.tags.update({instrumentation.APPLICATION_ID: 'forged',
+                           instrumentation.VALID: False})
+        sink.record(timer)
+        text = self.registry.render()
+        self.assertIn('askalexa_validation_failures_total 1', text)
+        self.assertNotIn('forged', text)
@@ -0,0 +1,95 @@
+import copy
+import unittest
+
+from askalexa.corpus import CorpusGenerator
+from askalexa.playback import PlaybackState, PlaybackStateCache
+from askalexa.request.audio import CurrentPlaybackState
+from askalexa.request.event import AlexaEvent
+
+def get_stream(response):
+    directive = response._response.get_json_data()['directives'][0]
+    return directive['audioItem']['stream']
+
+class PlaybackStateCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.generator = CorpusGenerator(None, seed=1)
+        self.loaded = []
+        self.persisted = []
+
+    def load(self, user_id):
+        self.loaded.append(user_id)
+        return PlaybackState('stored-' + user_id, 500, CurrentPlaybackState.STOPPED)
+
+    def persist(self, user_id, state):
+        self.persisted.append((user_id, state.token, state.offset_in_milliseconds))
+
+    def create_event(self, request_type, user_id, token, offset):
+        request_json = copy.deepcopy(self.generator.generate_one(request_type))
+        request_json['context']['System']['user']['userId'] = user_id
+        request_json['context']['AudioPlayer']['token'] = token
+        request_json['context']['AudioPlayer']['offsetInMilliseconds'] = offset
+        if 'token' in request_json['request']:
+            request_json['request']['token'] = token
+            request_json['request']['offsetInMilliseconds'] = offset
+        return AlexaEvent.create_from_json(request_json)
+
+    def test_hits_do_not_load(self):
+        cache = PlaybackStateCache(load=self.load)
+        self.assertEqual(cache.get('user-1').token, 'stored-user-1')
+        self.assertEqual(cache.get('user-1').token, 'stored-user-1')
+        self.assertEqual(self.loaded, ['user-1'])
+        self.assertEqual(len(cache), 1)
+
+    def test_events_update_the_state(self):
+        cache = PlaybackStateCache(persist=self.persist)
+        cache.update_from_event(self.create_event(
+            'AudioPlayer.PlaybackStarted', 'user-1', 'track-1', 0))
+        state = cache.get('user-1')
+        self.assertEqual((state.token, state.player_activity),
+                         ('track-1', CurrentPlaybackState.PLAYING))
+        self.assertEqual(self.persisted, [])
+
+        cache.update_from_event(self.create_event(
+            'AudioPlayer.PlaybackStopped', 'user-1', 'track-1', 1200))
+        state = cache.get('user-1')
+        self.assertEqual((state.offset_in_milliseconds, state.player_activity),
+                         (1200, CurrentPlaybackState.STOPPED))
+        self.assertEqual(self.persisted, [('user-1', 'track-1', 1200)])
+
+    def test_eviction(self):
+        cache = PlaybackStateCache(max_users=2, load=self.load)
+        for user_id in ('user-1', 'user-2', 'user-3'):
+            cache.set(user_id, PlaybackState('track-' + user_id, 0, CurrentPlaybackState.PLAYING))
+        self.assertEqual(len(cache), 2)
+
+        self.assertEqual(cache.get('user-3').token, 'track-user-3')
+        self.assertEqual(self.loaded, [])
+        self.assertEqual(cache.get('user-1').token, 'stored-user-1')
+        self.assertEqual(self.loaded, ['user-1'])
+
+        no_load = PlaybackStateCache(max_users=1)
+        no_load.set('user-1', PlaybackState('track-1', 0, CurrentPlaybackState.PLAYING))
+        no_load.set('user-2', PlaybackState('track-2', 0, CurrentPlaybackState.PLAYING))
+        self.assertIsNone(no_load.get('user-1'))
+
+    def test_clear(self):
+        cache = PlaybackStateCache(load=self.load)
+        cache.set('user-1', PlaybackState('track-1', 0, CurrentPlaybackState.PLAYING))
+        cache.clear('user-1')
+        self.assertEqual(cache.get('user-1').token, 'stored-user-1')
+        cache.clear('user-2')
+        self.assertEqual(len(cache), 1)
+
+    def test_resume(self):
+        cache = PlaybackStateCache(url_for_token=lambda token: 'https://example.com/' + token)
+        cache.set('user-1', PlaybackState('track-1', 3000, CurrentPlaybackState.STOPPED))
+        stream = get_stream(cache.resume('user-1'))
+        self.assertEqual(stream['url'], 'https://example.com/track-1')
+        self.assertEqual(stream['offsetInMilliseconds'], 3000)
+
+        self.assertFalse(cache.resume('user-2')._response.get_json_data().get('directives'))
+        self.assertRaises(ValueError, PlaybackStateCache(load=self.load).resume, 'user-1')
+
+if __name__ == '__main__':
+    unittest.main()
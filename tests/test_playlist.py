@@ -0,0 +1,121 @@
+import copy
+import unittest
+
+from askalexa.corpus import CorpusGenerator
+from askalexa.playlist import PlaylistEngine, Track
+from askalexa.request.event import AlexaEvent
+from askalexa.store import AttributesBackend, UserAttributesStore
+
+USER_ID = 'user-1'
+
+TRACKS = [Track('track-1', 'https://example.com/1.mp3'),
+          Track('track-2', 'https://example.com/2.mp3')]
+
+class MemoryBackend(AttributesBackend):
+
+    def __init__(self):
+        self.records = {}
+
+    def load(self, user_id):
+        return self.records.get(user_id)
+
+    def save_many(self, records):
+        self.records.update(records)
+
+def get_directive(response):
+    directives = response._response.get_json_data().get('directives')
+    return directives[0] if directives else None
+
+class PlaylistEngineTest(unittest.TestCase):
+
+    def setUp(self):
+        self.generator = CorpusGenerator(None, seed=1)
+        self.engine = PlaylistEngine()
+
+    def create_event(self, request_type, token):
+        request_json = copy.deepcopy(self.generator.generate_one(request_type))
+        request_json['context']['System']['user']['userId'] = USER_ID
+        request_json['context']['AudioPlayer']['token'] = token
+        if 'token' in request_json['request']:
+            request_json['request']['token'] = token
+        return AlexaEvent.create_from_json(request_json)
+
+    def test_enqueue_and_play(self):
+        self.engine.enqueue(USER_ID, TRACKS[0])
+        playlist = self.engine.enqueue(USER_ID, TRACKS[1])
+        self.assertEqual([track.token for track in playlist], ['track-1', 'track-2'])
+        self.assertRaises(ValueError, self.engine.enqueue, USER_ID, TRACKS[0])
+
+        directive = get_directive(self.engine.play(USER_ID, position=1))
+        self.assertEqual(directive['playBehavior'], 'REPLACE_ALL')
+        self.assertEqual(directive['audioItem']['stream']['token'], 'track-2')
+        self.assertIsNone(get_directive(self.engine.play('user-2')))
+
+    def test_nearly_finished_enqueues_the_next_track(self):
+        self.engine.set_tracks(USER_ID, TRACKS)
+        event = self.create_event('AudioPlayer.PlaybackNearlyFinished', 'track-1')
+        directive = get_directive(self.engine.on_playback_nearly_finished(event))
+        self.assertEqual(directive['playBehavior'], 'ENQUEUE')
+        self.assertEqual(directive['audioItem']['stream']['token'], 'track-2')
+        self.assertEqual(directive['audioItem']['stream']['url'], TRACKS[1].url)
+        self.assertEqual(directive['audioItem']['stream']['expectedPreviousToken'], 'track-1')
+
+    def test_next_and_previous(self):
+        self.engine.set_tracks(USER_ID, TRACKS)
+        event = self.create_event('PlaybackController.NextCommandIssued', 'track-1')
+        directive = get_directive(self.engine.on_next(event))
+        self.assertEqual(directive['audioItem']['stream']['token'], 'track-2')
+
+        event = self.create_event('PlaybackController.PreviousCommandIssued', 'track-2')
+        directive = get_directive(self.engine.on_previous(event))
+        self.assertEqual(directive['audioItem']['stream']['token'], 'track-1')
+
+    def test_end_of_the_playlist(self):
+        self.engine.set_tracks(USER_ID, TRACKS)
+        event = self.create_event('AudioPlayer.PlaybackNearlyFinished', 'track-2')
+        self.assertIsNone(get_directive(self.engine.on_playback_nearly_finished(event)))
+        event = self.create_event('PlaybackController.PreviousCommandIssued', 'track-1')
+        self.assertIsNone(get_directive(self.engine.on_previous(event)))
+
+        self.engine.set_tracks(USER_ID, TRACKS, loop=True)
+        event = self.create_event('AudioPlayer.PlaybackNearlyFinished', 'track-2')
+        directive = get_directive(self.engine.on_playback_nearly_finished(event))
+        self.assertEqual(directive['audioItem']['stream']['token'], 'track-1')
+
+class PersistentPlaylistEngineTest(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = MemoryBackend()
+        self.store = UserAttributesStore(self.backend, flush_interval=60)
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_playlist_is_loaded_from_the_store(self):
+        PlaylistEngine(store=self.store).set_tracks(USER_ID, TRACKS)
+        self.store.flush()
+
+        store = UserAttributesStore(self.backend, flush_interval=60)
+        try:
+            playlist = PlaylistEngine(store=store).get_playlist(USER_ID)
+            self.assertEqual([track.url for track in playlist], [track.url for track in TRACKS])
+            self.assertFalse(store.get(USER_ID).is_modified)
+        finally:
+            store.close()
+
+    def test_unchanged_playlist_is_not_written(self):
+        engine = PlaylistEngine(store=self.store)
+        engine.set_tracks(USER_ID, TRACKS)
+        self.store.flush()
+        self.backend.records.clear()
+
+        engine.set_tracks(USER_ID, TRACKS)
+        self.store.flush()
+        self.assertEqual(self.backend.records, {})
+
+        engine.enqueue(USER_ID, Track('track-3', 'https://example.com/3.mp3'))
+        self.store.flush()
+        self.assertIn(USER_ID, self.backend.records)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import json
+import unittest
+
+from askalexa import prefork
+from askalexa.request import validation
+from askalexa.request.register import RequestRegister
+
+class WarmTest(unittest.TestCase):
+
+    certificate_url = 'http://example.com/echo.api/echo-api-cert.pem'
+
+    def tearDown(self):
+        validation._CACHED_VALIDATOR.pop(self.certificate_url, None)
+
+    def test_invalid_certificate(self):
+        with self.assertRaises(ValueError) as context:
+            prefork.warm(certificate_urls=[self.certificate_url], freeze=False)
+        self.assertIn(self.certificate_url, str(context.exception))
+
+    def test_no_certificates(self):
+        before, after = prefork.warm(freeze=False)
+        self.assertIn('rss', after)
+
+    def test_built_in_requests_cover_every_request_type(self):
+        self.assertEqual(set(prefork.WARM_REQUEST_FIELDS),
+                         set(RequestRegister.registered_request_classes))
+        for request_type in prefork.WARM_REQUEST_FIELDS:
+            request_json = json.loads(prefork.create_warm_request(request_type))
+            self.assertEqual(request_json['request']['type'], request_type)
+
+    def test_caller_requests(self):
+        request_data = prefork.create_warm_request('LaunchRequest').encode('utf-8')
+        prefork.warm_requests([request_data])
+        self.assertRaises(ValueError, prefork.warm_requests, [b'not json'])
+
+if __name__ == '__main__':
+    unittest.main()
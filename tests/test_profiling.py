@@ -0,0 +1,38 @@
+import time
+import threading
+import unittest
+
+from askalexa.profiling import SamplingProfiler, STACK
+
+def handler(event):
+    time.sleep(0.02)
+    return event
+
+class SamplingProfilerTest(unittest.TestCase):
+
+    def test_concurrent_requests_are_skipped(self):
+        profiler = SamplingProfiler(rate=1.0)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(profiler.run(handler, 'x')))
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, ['x'] * 4)
+        self.assertEqual(profiler.profiled_count + profiler.skipped_count, 4)
+        self.assertGreaterEqual(profiler.profiled_count, 1)
+        self.assertIsNotNone(profiler.get_stats())
+
+    def test_profiles_in_sequence(self):
+        profiler = SamplingProfiler(rate=1.0)
+        profiler.run(lambda event: event, 'x')
+        profiler.run(lambda event: event, 'x')
+        self.assertEqual(profiler.profiled_count, 2)
+        self.assertEqual(profiler.skipped_count, 0)
+
+    def test_stack_sampling(self):
+        profiler = SamplingProfiler(rate=1.0, mode=STACK, interval=0.001)
+        self.assertEqual(profiler.run(handler, 'x'), 'x')
+        self.assertIn('handler', profiler.collapsed_stacks())
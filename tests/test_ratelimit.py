@@ -0,0 +1,77 @@
+import copy
+import unittest
+
+from askalexa import ratelimit
+from askalexa.corpus import CorpusGenerator
+from askalexa.ratelimit import RateLimit, RateLimiter
+from askalexa.request.event import AlexaEvent
+
+class RateLimiterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 100.0
+        self.clock = ratelimit.clock
+        ratelimit.clock = lambda: self.now
+
+        self.request_json = CorpusGenerator(None, seed=1).generate_one('IntentRequest')
+        self.event = AlexaEvent.create_from_json(self.request_json)
+
+    def tearDown(self):
+        ratelimit.clock = self.clock
+
+    def create_event(self, user_id):
+        request_json = copy.deepcopy(self.request_json)
+        request_json['session']['user']['userId'] = user_id
+        return AlexaEvent.create_from_json(request_json)
+
+    def test_burst(self):
+        limiter = RateLimiter(default=RateLimit(rate=1.0, burst=3))
+        self.assertEqual([limiter.allow(self.event) for _ in range(4)],
+                         [True, True, True, False])
+        self.assertEqual(limiter.limited_count, 1)
+        self.assertEqual(limiter.key_count, 1)
+
+    def test_refill(self):
+        limiter = RateLimiter(default=RateLimit(rate=2.0, burst=2))
+        self.assertTrue(limiter.allow(self.event))
+        self.assertTrue(limiter.allow(self.event))
+        self.assertFalse(limiter.allow(self.event))
+
+        self.now += 0.25
+        self.assertFalse(limiter.allow(self.event))
+        self.now += 0.25
+        self.assertTrue(limiter.allow(self.event))
+        self.assertFalse(limiter.allow(self.event))
+
+        # the bucket does not fill past the burst
+        self.now += 60.0
+        self.assertEqual([limiter.allow(self.event) for _ in range(3)], [True, True, False])
+
+    def test_buckets_per_user(self):
+        limiter = RateLimiter(default=RateLimit(rate=1.0, burst=1))
+        other = self.create_event('other-user')
+        self.assertTrue(limiter.allow(self.event))
+        self.assertFalse(limiter.allow(self.event))
+        self.assertTrue(limiter.allow(other))
+        self.assertEqual(limiter.key_count, 2)
+
+    def test_request_type_limits(self):
+        request_type = self.event.request.request_type
+        limiter = RateLimiter(limits={request_type: RateLimit(rate=1.0, burst=1)})
+        self.assertTrue(limiter.allow(self.event))
+        self.assertFalse(limiter.allow(self.event))
+
+        limiter = RateLimiter(limits={'LaunchRequest': RateLimit(rate=1.0, burst=1)})
+        self.assertEqual([limiter.allow(self.event) for _ in range(3)], [True, True, True])
+
+    def test_evicted_bucket_is_full(self):
+        limiter = RateLimiter(default=RateLimit(rate=1.0, burst=1), max_keys=1)
+        self.assertTrue(limiter.allow(self.event))
+        self.assertTrue(limiter.allow(self.create_event('other-user')))
+        self.assertTrue(limiter.allow(self.event))
+
+        limiter.clear()
+        self.assertEqual(limiter.key_count, 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from askalexa import replay
+from askalexa.corpus import CorpusGenerator
+from askalexa.dispatcher import RequestDispatcher
+
+class LoadCorpusTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'corpus.jsonl')
+        self.generator = CorpusGenerator(None, seed=1)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_load_corpus(self):
+        launch = self.generator.generate_one('LaunchRequest')
+        intent = self.generator.generate_one('IntentRequest')
+        lines = [
+            json.dumps(launch),
+            '',
+            json.dumps({'sequence': 1, 'request': json.dumps(intent), 'response': '{}'}),
+            'not json',
+            json.dumps({'sequence': 2, 'request': 'not json', 'response': '{}'}),
+            json.dumps({'request': {'no': 'type'}}),
+            json.dumps([1, 2]),
+        ]
+        with open(self.path, 'w') as corpus_file:
+            corpus_file.write('\n'.join(lines) + '\n')
+
+        corpus, skipped = replay.load_corpus(self.path)
+        self.assertEqual(corpus, [launch, intent])
+        self.assertEqual(skipped, 4)
+
+    def test_request_key(self):
+        intent = self.generator.generate_one('IntentRequest')
+        self.assertEqual(replay.request_key(intent), ('IntentRequest', 'AMAZON.HelpIntent'))
+        launch = self.generator.generate_one('LaunchRequest')
+        self.assertEqual(replay.request_key(launch), ('LaunchRequest', None))
+
+class SummarizeTest(unittest.TestCase):
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(replay.percentile(values, 0.5), 50)
+        self.assertEqual(replay.percentile(values, 0.99), 99)
+        self.assertEqual(replay.percentile(values, 0.999), 100)
+        self.assertEqual(replay.percentile([7], 0.5), 7)
+        self.assertIsNone(replay.percentile([], 0.5))
+
+    def test_summarize(self):
+        results = [
+            {'latencies': {('LaunchRequest', None): [0.002, 0.001]},
+             'errors': {'ValueError': 1}, 'elapsed': 2.0, 'count': 2},
+            {'latencies': {('LaunchRequest', None): [0.003],
+                           ('IntentRequest', 'PlayIntent'): [0.004]},
+             'errors': {'ValueError': 2, 'KeyError': 1}, 'elapsed': 1.0, 'count': 2},
+        ]
+        latencies, errors, elapsed, count = replay.merge_results(results)
+        self.assertEqual(sorted(latencies[('LaunchRequest', None)]), [0.001, 0.002, 0.003])
+        self.assertEqual(dict(errors), {'ValueError': 3, 'KeyError': 1})
+        self.assertEqual((elapsed, count), (2.0, 4))
+
+        report = replay.summarize(results)
+        self.assertEqual(report['throughput'], 2.0)
+        self.assertEqual([(group['request_type'], group['count']) for group in report['groups']],
+                         [('IntentRequest', 1), ('LaunchRequest', 3)])
+        self.assertEqual(report['groups'][1]['p50'], 0.002)
+        self.assertEqual(report['groups'][1]['p99'], 0.003)
+        self.assertIn('ValueError=3', replay.format_report(report))
+
+    def test_summarize_nothing(self):
+        report = replay.summarize([])
+        self.assertEqual((report['count'], report['throughput'], report['groups']), (0, 0.0, []))
+
+class ReplayTest(unittest.TestCase):
+
+    def setUp(self):
+        generator = CorpusGenerator(None, seed=1, attribute_size=128, mix={
+            'LaunchRequest': 1, 'IntentRequest': 2, 'SessionEndedRequest': 1})
+        self.corpus = list(generator.generate(20))
+        self.application_id = generator.application_id
+
+    def tearDown(self):
+        for skill in list(RequestDispatcher.list_skills()):
+            if skill.application_id == self.application_id:
+                RequestDispatcher.remove_skill(skill)
+
+    def test_replay_with_echo_skills(self):
+        report = replay.replay(self.corpus, iterations=1)
+        self.assertEqual(report['count'], 20)
+        self.assertEqual(report['errors'], {})
+        self.assertEqual(sum(group['count'] for group in report['groups']), 20)
+        self.assertEqual(set(group['request_type'] for group in report['groups']),
+                         set(request_json['request']['type'] for request_json in self.corpus))
+        self.assertEqual(len([skill for skill in RequestDispatcher.list_skills()
+                              if skill.application_id == self.application_id]), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from askalexa.corpus import CorpusGenerator
+from askalexa.model import InteractionModel, SlotTypeValue
+from askalexa.request.event import AlexaEvent
+from askalexa.resolution import SlotResolver, SlotTypeIndex, get_trigrams, normalize
+
+MODEL_JSON = {
+    'interactionModel': {
+        'languageModel': {
+            'invocationName': 'radio',
+            'intents': [
+                {'name': 'PlayStationIntent',
+                 'slots': [{'name': 'Station', 'type': 'STATION'},
+                           {'name': 'Date', 'type': 'AMAZON.DATE'}]},
+            ],
+            'types': [
+                {'name': 'STATION',
+                 'values': [
+                     {'id': 'jazz', 'name': {'value': 'Jazz FM', 'synonyms': ['smooth jazz']}},
+                     {'id': 'news', 'name': {'value': 'News Radio'}},
+                     {'name': {'value': u'Caf\xe9 Classics'}},
+                 ]},
+            ],
+        },
+    },
+}
+
+class NormalizeTest(unittest.TestCase):
+
+    def test_normalize(self):
+        self.assertEqual(normalize(u'  Caf\xe9-Classics!  '), u'cafe classics')
+        self.assertEqual(normalize(u'JAZZ   fm'), u'jazz fm')
+
+    def test_trigrams(self):
+        self.assertEqual(get_trigrams(u'fm'), set([u' fm', u'fm ']))
+
+class SlotTypeIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        model = InteractionModel.create_from_json(MODEL_JSON)
+        self.index = SlotTypeIndex(model.slot_types['STATION'])
+
+    def test_exact(self):
+        resolution = self.index.lookup('jazz fm')
+        self.assertEqual((resolution.value, resolution.value_id), ('Jazz FM', 'jazz'))
+        self.assertTrue(resolution.is_exact)
+        self.assertEqual(len(self.index), 4)
+
+    def test_synonym(self):
+        resolution = self.index.lookup('Smooth Jazz')
+        self.assertEqual(resolution.value_id, 'jazz')
+        self.assertTrue(resolution.is_exact)
+
+    def test_value_without_id(self):
+        resolution = self.index.lookup('cafe classics')
+        self.assertEqual(resolution.value_id, u'Caf\xe9 Classics')
+
+    def test_fuzzy(self):
+        resolution = self.index.lookup('news radios')
+        self.assertEqual(resolution.value_id, 'news')
+        self.assertFalse(resolution.is_exact)
+        self.assertTrue(0.5 <= resolution.score < 1.0)
+        self.assertIs(self.index.lookup('news radios'), resolution)
+
+    def test_no_match(self):
+        self.assertIsNone(self.index.lookup('heavy metal'))
+        self.assertIsNone(self.index.lookup('!!!'))
+
+    def test_min_score(self):
+        index = SlotTypeIndex([SlotTypeValue('news radio')], min_score=0.99)
+        self.assertIsNone(index.lookup('news radios'))
+
+class SlotResolverTest(unittest.TestCase):
+
+    def setUp(self):
+        self.resolver = SlotResolver([InteractionModel.create_from_json(MODEL_JSON)])
+        self.request_json = CorpusGenerator(None, seed=1).generate_one('IntentRequest')
+
+    def create_event(self, slots, locale='en-US'):
+        request = self.request_json['request']
+        request['locale'] = locale
+        request['intent'] = {
+            'name': 'PlayStationIntent', 'confirmationStatus': 'NONE',
+            'slots': dict((name, {'name': name, 'value': value, 'confirmationStatus': 'NONE'})
+                          for name, value in slots.items())}
+        return AlexaEvent.create_from_json(self.request_json)
+
+    def test_resolve(self):
+        event = self.create_event({'Station': 'smooth jazz', 'Date': '2018-01-01'})
+        self.resolver.resolve(event)
+
+        slots = event.request.intent.slots
+        self.assertEqual(slots['Station'].canonical_id, 'jazz')
+        self.assertIsNone(slots['Date'].resolution)
+
+    def test_other_locale(self):
+        event = self.create_event({'Station': 'smooth jazz'}, locale='de-DE')
+        self.resolver.resolve(event)
+        self.assertIsNone(event.request.intent.slots['Station'].resolution)
+
+    def test_get_index(self):
+        self.assertEqual(self.resolver.locales, ['en-US'])
+        self.assertIsNotNone(self.resolver.get_index('en-US', 'STATION'))
+        self.assertIsNone(self.resolver.get_index('en-US', 'AMAZON.DATE'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,27 @@
+import json
+import unittest
+
+from askalexa.exceptions import InvalidResponseError
+from askalexa.response import ResponseBuilder
+from askalexa.response.main import FrozenResponse
+
+class FrozenResponseTest(unittest.TestCase):
+
+    def setUp(self):
+        self.builder = ResponseBuilder().add_speech('Hello')
+        self.response = FrozenResponse(self.builder._response)
+
+    def test_json(self):
+        self.assertEqual(self.response.get_json_data(), self.builder._response.get_json_data())
+        self.assertEqual(json.loads(self.response.json_text), self.response.get_json_data())
+
+    def test_read_only(self):
+        json_text = self.response.json_text
+        builder = ResponseBuilder(self.response)
+        self.assertRaises(InvalidResponseError, builder.add_speech, 'Goodbye')
+        self.assertRaises(InvalidResponseError, builder.add_simple_card, 'Title', 'Content')
+        self.assertRaises(InvalidResponseError, builder.stop_audio)
+        self.assertEqual(self.response.json_text, json_text)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import json
+import unittest
+
+from askalexa.corpus import CorpusGenerator
+from askalexa.dispatcher import RequestDispatcher
+from askalexa.exceptions import UnknownRequestType
+from askalexa.response.builder import ResponseBuilder
+from askalexa.serverless import handle_event
+from askalexa.skill import Skill
+
+class HandleEventTest(unittest.TestCase):
+
+    def setUp(self):
+        self.generator = CorpusGenerator(None, seed=1)
+        self.skill = Skill(self.generator.application_id)
+
+    def tearDown(self):
+        RequestDispatcher.remove_skill(self.skill)
+
+    def test_event(self):
+        def launch(event):
+            event.session.attributes['visits'] = 1
+            return ResponseBuilder().add_speech('Hello')
+        self.skill.on_launch(launch)
+
+        event = self.generator.generate_one('LaunchRequest')
+        response_data = json.loads(json.dumps(handle_event(event, context=object())))
+        self.assertEqual(response_data['version'], '1.0')
+        self.assertEqual(response_data['response']['outputSpeech'],
+                         {'type': 'PlainText', 'text': 'Hello'})
+        self.assertEqual(response_data['sessionAttributes'], {'visits': 1})
+
+    def test_malformed_event(self):
+        self.assertRaises(KeyError, handle_event, {})
+        event = self.generator.generate_one('LaunchRequest')
+        event['request']['type'] = 'Unknown.Request'
+        self.assertRaises(UnknownRequestType, handle_event, event)
+
+    def test_handler_error(self):
+        def launch(event):
+            raise RuntimeError('handler failed')
+        self.skill.on_launch(launch)
+
+        event = self.generator.generate_one('LaunchRequest')
+        with self.assertRaises(RuntimeError) as context:
+            handle_event(event)
+        self.assertEqual(str(context.exception), 'handler failed')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import json
+import unittest
+
+from askalexa.store import AttributesBackend, UserAttributesStore
+
+class MemoryBackend(AttributesBackend):
+
+    def __init__(self):
+        self.records = {}
+
+    def load(self, user_id):
+        return self.records.get(user_id)
+
+    def save_many(self, records):
+        self.records.update(records)
+
+class UserAttributesStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = MemoryBackend()
+        self.store = UserAttributesStore(self.backend, cache_size=1, flush_interval=60)
+
+    def tearDown(self):
+        self.store.close()
+
+    def load(self, user_id):
+        return json.loads(self.backend.records[user_id])
+
+    def test_commit_and_flush(self):
+        self.store.get('user-1')['visits'] = 1
+        self.store.commit('user-1')
+        self.store.flush()
+        self.assertEqual(self.load('user-1'), {'visits': 1})
+
+    def test_unchanged_attributes_are_not_written(self):
+        self.store.get('user-1')
+        self.store.commit('user-1')
+        self.store.flush()
+        self.assertNotIn('user-1', self.backend.records)
+
+    def test_commit_after_eviction(self):
+        attributes = self.store.get('user-1')
+        self.store.get('user-2')
+        attributes['visits'] = 1
+        self.store.commit('user-1', attributes)
+        self.store.flush()
+        self.assertEqual(self.load('user-1'), {'visits': 1})
+
+    def test_changes_are_queued_on_eviction(self):
+        self.store.get('user-1')['visits'] = 2
+        self.store.get('user-2')
+        self.store.flush()
+        self.assertEqual(self.load('user-1'), {'visits': 2})
+
+    def test_queued_changes_are_loaded_before_they_are_written(self):
+        self.store.get('user-1')['visits'] = 3
+        self.store.get('user-2')
+        self.assertEqual(self.store.get('user-1')['visits'], 3)
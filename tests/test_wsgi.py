@@ -0,0 +1,60 @@
+import io
+import json
+import logging
+import unittest
+
+from askalexa.corpus import CorpusGenerator
+from askalexa.dispatcher import RequestDispatcher
+from askalexa.response.builder import ResponseBuilder
+from askalexa.skill import Skill
+from askalexa.wsgi import WSGIApplication
+
+class WSGIApplicationTest(unittest.TestCase):
+
+    def setUp(self):
+        self.generator = CorpusGenerator(None, seed=1)
+        self.skill = Skill(self.generator.application_id)
+        self.application = WSGIApplication(validate=False)
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+        RequestDispatcher.remove_skill(self.skill)
+
+    def post(self, body):
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode('utf-8')
+        environ = {'REQUEST_METHOD': 'POST', 'CONTENT_LENGTH': str(len(body)),
+                   'wsgi.input': io.BytesIO(body)}
+        return self.application.handle(environ)
+
+    def test_response(self):
+        self.skill.on_launch(lambda event: ResponseBuilder().add_speech('Hello'))
+        status, body = self.post(self.generator.generate_one('LaunchRequest'))
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body.decode('utf-8'))['response']['outputSpeech']['text'],
+                         'Hello')
+
+    def test_malformed_request(self):
+        status, _ = self.post(b'{"version": "1.0"}')
+        self.assertEqual(status, 400)
+
+    def test_unknown_skill(self):
+        request_json = self.generator.generate_one('LaunchRequest')
+        request_json['session']['application']['applicationId'] = 'unknown'
+        request_json['context']['System']['application']['applicationId'] = 'unknown'
+        status, _ = self.post(request_json)
+        self.assertEqual(status, 400)
+
+    def test_handler_errors_are_server_errors(self):
+        def launch(event):
+            return {}['missing']
+
+        self.skill.on_launch(launch)
+        status, body = self.post(self.generator.generate_one('LaunchRequest'))
+        self.assertEqual(status, 500)
+
+    def test_invalid_response(self):
+        self.skill.on_launch(lambda event: 'not a response')
+        status, _ = self.post(self.generator.generate_one('LaunchRequest'))
+        self.assertEqual(status, 500)